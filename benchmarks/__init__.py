@@ -0,0 +1,6 @@
+"""
+Performance benchmarks for the inference client.
+
+The suite spins up the `DummyExecutor` from `tests/executor.py` in a local Flow and measures the throughput and
+latency of every task method. Run it from the repository root with ``python -m benchmarks --help``.
+"""
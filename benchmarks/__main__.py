@@ -0,0 +1,179 @@
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+
+from .compare import compare_results
+from .compression import COMPRESSION_TASKS, run_compression_benchmark
+from .suite import PAYLOADS, TASKS, run_suite
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def _run(args):
+    def _print(result):
+        print(
+            f"{result['key']:<60} {result['throughput']:>10.1f} items/s "
+            f"p50={result['latency']['p50'] * 1000:.1f}ms p95={result['latency']['p95'] * 1000:.1f}ms",
+            file=sys.stderr,
+        )
+
+    results = run_suite(
+        host=args.host,
+        tasks=args.tasks,
+        payloads=args.payloads,
+        batch_sizes=args.batch_sizes,
+        prefetches=args.prefetch,
+        concurrencies=args.concurrency,
+        num_items=args.num_items,
+        calls=args.calls,
+        warmup=args.warmup,
+        on_result=_print,
+        record=args.record,
+        replay=args.replay,
+        replay_latency_scale=args.replay_latency_scale,
+    )
+    report = dict(
+        commit=_git_commit(),
+        created_at=datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        python=platform.python_version(),
+        platform=platform.platform(),
+        config=dict(num_items=args.num_items, calls=args.calls, warmup=args.warmup),
+        results=results,
+    )
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Wrote {len(results)} results to {args.output}', file=sys.stderr)
+
+
+def _compression(args):
+    def _print(result):
+        print(
+            f"{result['key']:<40} {result['throughput']:>8.1f} items/s "
+            f"{result['bytes_up_per_item'] / 1000:>8.1f} kB/item up",
+            file=sys.stderr,
+        )
+
+    results = run_compression_benchmark(
+        compressions=[None if c == 'none' else c for c in args.compressions],
+        tasks=args.tasks,
+        bytes_per_second=args.bandwidth,
+        num_items=args.num_items,
+        calls=args.calls,
+        on_result=_print,
+    )
+    report = dict(
+        commit=_git_commit(),
+        created_at=datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        config=dict(
+            bandwidth=args.bandwidth, num_items=args.num_items, calls=args.calls
+        ),
+        results=results,
+    )
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Wrote {len(results)} results to {args.output}', file=sys.stderr)
+
+
+def _compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    rows = compare_results(baseline, current, threshold=args.threshold)
+    for row in rows:
+        print(
+            f"{'REGRESSION' if row['regression'] else 'ok':<10} {row['key']:<60} "
+            f"throughput {row['throughput_change']:+.1%} latency {row['latency_change']:+.1%}"
+        )
+    if any(row['regression'] for row in rows):
+        sys.exit(1)
+
+
+def main(argv=None):
+    """
+    Entry point of ``python -m benchmarks``.
+
+    :param argv: the command line arguments, defaults to `sys.argv`.
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='Benchmark the inference client against a local DummyExecutor.',
+    )
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run = sub.add_parser('run', help='run the benchmark suite')
+    run.add_argument('--host', help='benchmark an already running Flow instead')
+    run.add_argument('--tasks', nargs='+', choices=TASKS, default=list(TASKS))
+    run.add_argument('--payloads', nargs='+', choices=PAYLOADS, default=list(PAYLOADS))
+    run.add_argument('--batch-sizes', nargs='+', type=int, default=[1, 8, 32])
+    run.add_argument('--prefetch', nargs='+', type=int, default=[1, 10, 100])
+    run.add_argument('--concurrency', nargs='+', type=int, default=[1, 4])
+    run.add_argument(
+        '--num-items', type=int, default=64, help='inputs per call for list tasks'
+    )
+    run.add_argument(
+        '--calls', type=int, default=8, help='timed calls per concurrent caller'
+    )
+    run.add_argument('--warmup', type=int, default=1)
+    run.add_argument('--output', default='benchmark.json')
+    run.add_argument('--record', help='record the requests to this directory')
+    run.add_argument(
+        '--replay',
+        help='replay the requests recorded in this directory, without any Flow',
+    )
+    run.add_argument(
+        '--replay-latency-scale',
+        type=float,
+        default=1.0,
+        help='factor applied to the replayed latencies',
+    )
+    run.set_defaults(func=_run)
+
+    compression = sub.add_parser(
+        'compression',
+        help='measure bytes on the wire and throughput of compressed image uploads over a slow link',
+    )
+    compression.add_argument(
+        '--compressions',
+        nargs='+',
+        choices=['none', 'gzip', 'deflate'],
+        default=['none', 'gzip', 'deflate'],
+    )
+    compression.add_argument(
+        '--tasks', nargs='+', choices=COMPRESSION_TASKS, default=list(COMPRESSION_TASKS)
+    )
+    compression.add_argument(
+        '--bandwidth', type=float, default=1_000_000, help='link bandwidth in bytes/s'
+    )
+    compression.add_argument(
+        '--num-items', type=int, default=16, help='images per encode call'
+    )
+    compression.add_argument('--calls', type=int, default=4)
+    compression.add_argument('--output', default='compression.json')
+    compression.set_defaults(func=_compression)
+
+    compare = sub.add_parser('compare', help='compare two benchmark reports')
+    compare.add_argument('baseline')
+    compare.add_argument('current')
+    compare.add_argument(
+        '--threshold', type=float, default=0.1, help='tolerated relative change'
+    )
+    compare.set_defaults(func=_compare)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+from typing import Dict, List
+
+
+def compare_results(
+    baseline: Dict, current: Dict, threshold: float = 0.1
+) -> List[Dict]:
+    """
+    Compare two benchmark reports case by case.
+
+    A case is flagged as a regression if its throughput dropped, or its median latency grew, by more than the
+    threshold relative to the baseline.
+
+    :param baseline: the baseline report, as written by ``python -m benchmarks run``.
+    :param current: the report to check against the baseline.
+    :param threshold: the tolerated relative change, e.g. `0.1` for 10%.
+    :return: one entry per case present in both reports.
+    """
+    baseline_cases = {r['key']: r for r in baseline['results']}
+    rows = []
+    for result in current['results']:
+        base = baseline_cases.get(result['key'])
+        if base is None:
+            continue
+        throughput = result['throughput'] / base['throughput'] - 1
+        latency = result['latency']['p50'] / base['latency']['p50'] - 1
+        rows.append(
+            dict(
+                key=result['key'],
+                throughput_change=throughput,
+                latency_change=latency,
+                regression=throughput < -threshold or latency > threshold,
+            )
+        )
+    return rows
@@ -0,0 +1,166 @@
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .suite import make_item
+
+COMPRESSION_TASKS = ('encode', 'upscale', 'image_to_image')
+
+
+class ThrottledProxy:
+    """
+    A local TCP proxy that forwards traffic to a target port at a limited bandwidth in each direction, and counts the
+    bytes sent each way. It simulates a slow link between the client and the model.
+    """
+
+    def __init__(self, target_port: int, bytes_per_second: float, chunk_size=16384):
+        """
+        Initializes the proxy.
+
+        :param target_port: the local port to forward the traffic to.
+        :param bytes_per_second: the bandwidth of the link in each direction.
+        :param chunk_size: the maximum number of bytes forwarded at once.
+        """
+        self.target_port = target_port
+        self.bytes_per_second = bytes_per_second
+        self.chunk_size = chunk_size
+        self.port: Optional[int] = None
+        self.bytes_up = 0
+        self.bytes_down = 0
+        self._loop = asyncio.new_event_loop()
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def reset(self):
+        """
+        Reset the byte counters.
+        """
+        self.bytes_up = self.bytes_down = 0
+
+    async def _pipe(self, reader, writer, upstream: bool):
+        try:
+            while data := await reader.read(self.chunk_size):
+                await asyncio.sleep(len(data) / self.bytes_per_second)
+                if upstream:
+                    self.bytes_up += len(data)
+                else:
+                    self.bytes_down += len(data)
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _handle(self, client_reader, client_writer):
+        target_reader, target_writer = await asyncio.open_connection(
+            '127.0.0.1', self.target_port
+        )
+        await asyncio.gather(
+            self._pipe(client_reader, target_writer, upstream=True),
+            self._pipe(target_reader, client_writer, upstream=False),
+        )
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, '127.0.0.1', 0)
+        )
+        self.port = server.sockets[0].getsockname()[1]
+        self._started.set()
+        self._loop.run_forever()
+
+    def __enter__(self):
+        self._thread.start()
+        self._started.wait()
+        return self
+
+    def __exit__(self, *args):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+def make_compression_call(model, task: str, num_items: int) -> Callable[[], object]:
+    """
+    Build a zero-argument callable that uploads ndarray images with the given task.
+
+    :param model: the model to benchmark.
+    :param task: one of `encode`, `upscale` or `image_to_image`.
+    :param num_items: the number of images per `encode` call.
+    :return: the callable.
+    """
+    image = make_item('ndarray')
+    if task == 'encode':
+        images = [image] * num_items
+        return lambda: model.encode(image=images, batch_size=8)
+    elif task == 'upscale':
+        return lambda: model.upscale(image=image)
+    elif task == 'image_to_image':
+        return lambda: model.image_to_image(prompt='a painting', image=image)
+    else:
+        raise ValueError(f'Unknown task `{task}`.')
+
+
+def run_compression_benchmark(
+    compressions: Iterable[Optional[str]] = (None, 'gzip', 'deflate'),
+    tasks: Iterable[str] = COMPRESSION_TASKS,
+    bytes_per_second: float = 1_000_000,
+    num_items: int = 16,
+    calls: int = 4,
+    on_result: Optional[Callable[[Dict], None]] = None,
+) -> List[Dict]:
+    """
+    Measure the bytes on the wire and the throughput of image uploads with each compression setting, through a
+    bandwidth-limited proxy in front of a local Flow serving the `DummyExecutor`.
+
+    :param compressions: the compression settings of the model, None for no compression.
+    :param tasks: the task methods.
+    :param bytes_per_second: the bandwidth of the link in each direction.
+    :param num_items: the number of images per `encode` call.
+    :param calls: the number of timed calls per case.
+    :param on_result: an optional function called with each case result as soon as it is available.
+    :return: the list of case results.
+    """
+    from jina import Flow, helper
+
+    from inference_client.model import Model
+    from tests.executor import DummyExecutor
+
+    results = []
+    port = helper.random_port()
+    with Flow(port=port).add(name='dummy', uses=DummyExecutor), ThrottledProxy(
+        port, bytes_per_second
+    ) as proxy:
+        for task in tasks:
+            for compression in compressions:
+                model = Model(
+                    model_name='dummy-model',
+                    token='benchmark',
+                    host=f'grpc://127.0.0.1:{proxy.port}',
+                    compression=compression,
+                )
+                call = make_compression_call(model, task, num_items)
+                call()
+                proxy.reset()
+                start = time.perf_counter()
+                for _ in range(calls):
+                    call()
+                elapsed = time.perf_counter() - start
+
+                items = calls * (num_items if task == 'encode' else 1)
+                result = dict(
+                    key=f'{task}/compression={compression}',
+                    task=task,
+                    compression=compression,
+                    items=items,
+                    elapsed=elapsed,
+                    throughput=items / elapsed,
+                    bytes_up=proxy.bytes_up,
+                    bytes_down=proxy.bytes_down,
+                    bytes_up_per_item=proxy.bytes_up / items,
+                )
+                if on_result:
+                    on_result(result)
+                results.append(result)
+    return results
@@ -0,0 +1,287 @@
+import itertools
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+from docarray import Document
+
+TEST_IMAGE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'test.jpeg'
+)
+
+TASKS = (
+    'encode',
+    'caption',
+    'vqa',
+    'rank',
+    'upscale',
+    'text_to_image',
+    'image_to_image',
+    'generate',
+)
+PAYLOADS = ('text', 'bytes', 'ndarray', 'uri')
+
+# tasks that take a list of inputs, hence are swept over `batch_size` and `prefetch`
+LIST_TASKS = ('encode',)
+# payload types supported by each task
+TASK_PAYLOADS = {
+    'encode': ('text', 'bytes', 'ndarray', 'uri'),
+    'caption': ('bytes', 'ndarray', 'uri'),
+    'vqa': ('bytes', 'ndarray', 'uri'),
+    'rank': ('text', 'bytes', 'ndarray', 'uri'),
+    'upscale': ('bytes', 'ndarray', 'uri'),
+    'text_to_image': ('text',),
+    'image_to_image': ('bytes', 'ndarray', 'uri'),
+    'generate': ('text',),
+}
+
+
+def make_item(payload: str):
+    """
+    Create a single input item of the given payload type.
+
+    :param payload: one of `text`, `bytes`, `ndarray` or `uri`.
+    :return: the input item.
+    """
+    if payload == 'text':
+        return 'a photo of a cat sitting on a sofa'
+    elif payload == 'uri':
+        return TEST_IMAGE
+    elif payload == 'bytes':
+        return Document(uri=TEST_IMAGE).load_uri_to_blob().blob
+    elif payload == 'ndarray':
+        return Document(uri=TEST_IMAGE).load_uri_to_image_tensor().tensor
+    else:
+        raise ValueError(f'Unknown payload type `{payload}`.')
+
+
+def make_call(
+    model, task: str, payload: str, num_items: int, batch_size: int, prefetch: int
+) -> Callable[[], object]:
+    """
+    Build a zero-argument callable that performs one task call against the model.
+
+    :param model: the model to benchmark.
+    :param task: the task method to call.
+    :param payload: the payload type.
+    :param num_items: the number of inputs per call for list tasks.
+    :param batch_size: the request size for list tasks.
+    :param prefetch: the number of in-flight requests for list tasks.
+    :return: the callable.
+    """
+    item = make_item(payload)
+
+    if task == 'encode':
+        key = 'text' if payload == 'text' else 'image'
+        inputs = [item] * num_items
+        return lambda: model.encode(
+            **{key: inputs}, batch_size=batch_size, prefetch=prefetch
+        )
+    elif task == 'caption':
+        return lambda: model.caption(image=item)
+    elif task == 'vqa':
+        return lambda: model.vqa(image=item, question='Is there a cat?')
+    elif task == 'rank':
+        candidates = [item] * 4
+        if payload == 'text':
+            return lambda: model.rank(text=item, candidates=candidates)
+        return lambda: model.rank(image=item, candidates=candidates)
+    elif task == 'upscale':
+        return lambda: model.upscale(image=item)
+    elif task == 'text_to_image':
+        return lambda: model.text_to_image(prompt=item)
+    elif task == 'image_to_image':
+        return lambda: model.image_to_image(prompt='a painting', image=item)
+    elif task == 'generate':
+        return lambda: model.generate(prompt=item)
+    else:
+        raise ValueError(f'Unknown task `{task}`.')
+
+
+def iter_cases(
+    tasks: Iterable[str],
+    payloads: Iterable[str],
+    batch_sizes: Iterable[int],
+    prefetches: Iterable[int],
+    concurrencies: Iterable[int],
+) -> Iterable[Dict]:
+    """
+    Enumerate the benchmark cases as the product of all given dimensions.
+
+    Single-item tasks ignore `batch_size` and `prefetch`, so they are only swept over payload and concurrency.
+
+    :param tasks: the task methods.
+    :param payloads: the payload types.
+    :param batch_sizes: the request sizes.
+    :param prefetches: the prefetch values.
+    :param concurrencies: the number of concurrent callers.
+    :yield: a case description.
+    """
+    for task in tasks:
+        for payload in payloads:
+            if payload not in TASK_PAYLOADS[task]:
+                continue
+            if task in LIST_TASKS:
+                grid = itertools.product(batch_sizes, prefetches, concurrencies)
+            else:
+                grid = ((None, None, c) for c in concurrencies)
+            for batch_size, prefetch, concurrency in grid:
+                yield dict(
+                    task=task,
+                    payload=payload,
+                    batch_size=batch_size,
+                    prefetch=prefetch,
+                    concurrency=concurrency,
+                )
+
+
+def case_key(case: Dict) -> str:
+    """
+    Build a stable identifier of a case to match results across runs.
+
+    :param case: the case description.
+    :return: the identifier.
+    """
+    return (
+        f"{case['task']}/{case['payload']}/bs={case['batch_size']}"
+        f"/prefetch={case['prefetch']}/concurrency={case['concurrency']}"
+    )
+
+
+def _percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    k = (len(values) - 1) * q
+    lo, hi = int(k), min(int(k) + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def run_case(
+    model,
+    case: Dict,
+    num_items: int = 64,
+    calls: int = 8,
+    warmup: int = 1,
+) -> Dict:
+    """
+    Run a single benchmark case and collect its latency and throughput.
+
+    :param model: the model to benchmark.
+    :param case: the case description.
+    :param num_items: the number of inputs per call for list tasks.
+    :param calls: the number of calls per concurrent caller.
+    :param warmup: the number of untimed calls made before measuring.
+    :return: the case description extended with the measurements.
+    """
+    call = make_call(
+        model,
+        case['task'],
+        case['payload'],
+        num_items=num_items,
+        batch_size=case['batch_size'] or 1,
+        prefetch=case['prefetch'] or 1,
+    )
+    items_per_call = num_items if case['task'] in LIST_TASKS else 1
+
+    for _ in range(warmup):
+        call()
+
+    def _timed():
+        latencies = []
+        for _ in range(calls):
+            start = time.perf_counter()
+            call()
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    concurrency = case['concurrency']
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(_timed) for _ in range(concurrency)]
+        latencies = [t for f in futures for t in f.result()]
+    elapsed = time.perf_counter() - start
+
+    return dict(
+        case,
+        key=case_key(case),
+        calls=len(latencies),
+        items=len(latencies) * items_per_call,
+        elapsed=elapsed,
+        throughput=len(latencies) * items_per_call / elapsed,
+        latency=dict(
+            mean=statistics.fmean(latencies),
+            p50=_percentile(latencies, 0.5),
+            p95=_percentile(latencies, 0.95),
+            p99=_percentile(latencies, 0.99),
+            max=max(latencies),
+        ),
+    )
+
+
+def run_suite(
+    host: Optional[str] = None,
+    tasks: Iterable[str] = TASKS,
+    payloads: Iterable[str] = PAYLOADS,
+    batch_sizes: Iterable[int] = (1, 8, 32),
+    prefetches: Iterable[int] = (1, 10, 100),
+    concurrencies: Iterable[int] = (1, 4),
+    num_items: int = 64,
+    calls: int = 8,
+    warmup: int = 1,
+    on_result: Optional[Callable[[Dict], None]] = None,
+    record: Optional[str] = None,
+    replay: Optional[str] = None,
+    replay_latency_scale: float = 1.0,
+) -> List[Dict]:
+    """
+    Run the benchmark suite. If no host is given, a local Flow serving the `DummyExecutor` is started, unless the
+    requests are replayed from a recording.
+
+    :param host: the address of an already running Flow to benchmark against.
+    :param tasks: the task methods.
+    :param payloads: the payload types.
+    :param batch_sizes: the request sizes.
+    :param prefetches: the prefetch values.
+    :param concurrencies: the number of concurrent callers.
+    :param num_items: the number of inputs per call for list tasks.
+    :param calls: the number of calls per concurrent caller.
+    :param warmup: the number of untimed calls made before measuring each case.
+    :param on_result: an optional function called with each case result as soon as it is available.
+    :param record: if set, the requests, their results and latencies are recorded to this directory.
+    :param replay: if set, the requests are answered from the recording in this directory instead of a Flow.
+    :param replay_latency_scale: the factor applied to the replayed latencies.
+    :return: the list of case results.
+    """
+    from inference_client.model import Model
+
+    cases = list(iter_cases(tasks, payloads, batch_sizes, prefetches, concurrencies))
+
+    def _run(address):
+        model = Model(
+            model_name='dummy-model',
+            token='benchmark',
+            host=address,
+            record=record,
+            replay=replay,
+            replay_latency_scale=replay_latency_scale,
+        )
+        results = []
+        for case in cases:
+            result = run_case(
+                model, case, num_items=num_items, calls=calls, warmup=warmup
+            )
+            if on_result:
+                on_result(result)
+            results.append(result)
+        return results
+
+    if host or replay:
+        return _run(host or 'replay')
+
+    from jina import Flow, helper
+
+    from tests.executor import DummyExecutor
+
+    with Flow(port=helper.random_port()).add(name='dummy', uses=DummyExecutor) as f:
+        return _run(f'grpc://0.0.0.0:{f.port}')
@@ -1,9 +1,19 @@
 import os
 
 from .__version__ import __version__
+from .cache import ImageCache, ResponseCache
 from .client import Client
+from .index import EmbeddingIndex
+from .throttle import RateLimiter
 
-__all__ = ["__version__", "Client"]
+__all__ = [
+    "__version__",
+    "Client",
+    "EmbeddingIndex",
+    "ImageCache",
+    "RateLimiter",
+    "ResponseCache",
+]
 
 if 'NO_VERSION_CHECK' not in os.environ:
     from .__version__ import is_latest_version
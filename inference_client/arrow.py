@@ -0,0 +1,133 @@
+from typing import TYPE_CHECKING, Optional, Sequence, Union
+
+import numpy
+
+from .embeddings import QuantizedEmbeddings
+
+if TYPE_CHECKING:
+    import pyarrow
+
+
+def import_pyarrow():
+    """
+    Import pyarrow, which is an optional dependency.
+
+    :return: the `pyarrow` module, with `pyarrow.parquet` loaded.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise ImportError(
+            'Arrow and Parquet outputs require pyarrow, install it with `pip install "inference-client[parquet]"`.'
+        ) from None
+    return pyarrow
+
+
+def embedding_array(embeddings: numpy.ndarray) -> 'pyarrow.FixedSizeListArray':
+    """
+    Wrap a matrix of embeddings into an Arrow array of fixed-size lists, one list per row. The values buffer of a
+    contiguous matrix is shared with Arrow rather than copied.
+
+    :param embeddings: the embeddings, one per row. A matrix without columns, e.g. of an empty result, gives lists of
+        size 0.
+    :return: the Arrow array.
+    """
+    pa = import_pyarrow()
+    embeddings = numpy.ascontiguousarray(embeddings)
+    if embeddings.shape[1] == 0:
+        return pa.array(
+            [[]] * len(embeddings),
+            type=pa.list_(pa.from_numpy_dtype(embeddings.dtype), 0),
+        )
+    return pa.FixedSizeListArray.from_arrays(
+        pa.array(embeddings.reshape(-1)), embeddings.shape[1]
+    )
+
+
+def embeddings_to_record_batch(
+    embeddings: Union[numpy.ndarray, QuantizedEmbeddings],
+    ids: Optional[Union[numpy.ndarray, Sequence[str]]] = None,
+) -> 'pyarrow.RecordBatch':
+    """
+    Build a record batch with an `id` column, if ids are given, and an `embedding` column of fixed-size lists. The
+    scale factors of quantized embeddings are stored in a `scale` column.
+
+    :param embeddings: the embeddings, one per row.
+    :param ids: the id of each embedding, e.g. the input positions or the document ids.
+    :return: the record batch.
+    """
+    pa = import_pyarrow()
+    columns, names = [], []
+    if ids is not None:
+        columns.append(pa.array(ids))
+        names.append('id')
+    if isinstance(embeddings, QuantizedEmbeddings):
+        columns += [embedding_array(embeddings.codes), pa.array(embeddings.scales)]
+        names += ['embedding', 'scale']
+    else:
+        columns.append(embedding_array(embeddings))
+        names.append('embedding')
+    return pa.RecordBatch.from_arrays(columns, names=names)
+
+
+class ParquetWriter:
+    """
+    Appends Arrow tables or record batches, e.g. the results of `encode(..., output='arrow')`, to a Parquet file.
+
+    Example:
+
+    ```python
+    with ParquetWriter('embeddings.parquet') as writer:
+        for texts in chunks:
+            writer.write(model.encode(text=texts, output='arrow'))
+    ```
+    """
+
+    def __init__(self, path: str, **kwargs):
+        """
+        :param path: the path of the Parquet file, it is created, or overwritten, on the first write.
+        :param kwargs: additional arguments of `pyarrow.parquet.ParquetWriter`, e.g. `compression`.
+        """
+        self._pa = import_pyarrow()
+        self.path = path
+        self.kwargs = kwargs
+        self.rows = 0
+        self._writer = None
+
+    def write(
+        self,
+        data: Union[
+            'pyarrow.Table', 'pyarrow.RecordBatch', 'pyarrow.RecordBatchReader'
+        ],
+    ):
+        """
+        Append rows to the file. All the writes should have the same schema.
+
+        :param data: the rows to append. The batches of a reader, e.g. of `encode(..., output='arrow_stream')`, are
+            written as they are read.
+        """
+        if isinstance(data, self._pa.RecordBatchReader):
+            for batch in data:
+                self.write(batch)
+            return
+        if isinstance(data, self._pa.RecordBatch):
+            data = self._pa.Table.from_batches([data])
+        if self._writer is None:
+            self._writer = self._pa.parquet.ParquetWriter(
+                self.path, data.schema, **self.kwargs
+            )
+        self._writer.write_table(data)
+        self.rows += data.num_rows
+
+    def close(self):
+        """Write the footer and close the file."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,277 @@
+import asyncio
+import inspect
+import random
+import threading
+import time
+from typing import List, Optional, Sequence
+
+import grpc
+from docarray import DocumentArray
+from jina import Client
+from jina.excepts import BadServerFlow
+
+from .compression import CompressionClients
+from .protocol import adapt_payload, get_protocol
+
+# the failures of a replica, as opposed to the errors of the executor, after which a batch is sent to another replica
+FAILOVER_ERRORS = (
+    ConnectionError,
+    asyncio.TimeoutError,
+    grpc.aio.AioRpcError,
+    BadServerFlow,
+)
+
+
+class Replica:
+    """
+    A replica of a model behind the load balancer, with its latency estimate, health and statistics.
+    """
+
+    def __init__(self, host: str):
+        """
+        Initializes the replica.
+
+        :param host: the endpoint of the replica.
+        """
+        self.host = host
+        self.protocol = get_protocol(host)
+        self.client = (
+            CompressionClients(host, asyncio=True)
+            if self.protocol == 'grpc'
+            else Client(host=host, asyncio=True)
+        )
+        self.latency: Optional[float] = None
+        self.in_flight = 0
+        self.requests = 0
+        self.docs = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.ejected_until = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        """
+        Whether the replica is not currently ejected.
+
+        :return: True if requests can be sent to the replica.
+        """
+        return time.monotonic() >= self.ejected_until
+
+    def load(self):
+        """
+        The expected cost of sending a request to the replica, used to compare replicas.
+
+        :return: the latency estimate scaled by the number of requests in flight, then the number of requests in
+            flight to break ties between replicas without a latency estimate.
+        """
+        return (self.latency or 0.0) * (self.in_flight + 1), self.in_flight
+
+
+class LoadBalancer:
+    """
+    Spreads the requests of a single logical model across several replicas.
+
+    Each batch is sent to the less loaded of two replicas picked at random (power of two choices), where the load is
+    an exponentially weighted moving average (EWMA) of the replica's latency scaled by its requests in flight.
+    Replicas with `max_in_flight_per_replica` requests in flight are not picked until one of them completes.
+    Replicas that fail several times in a row, e.g. to connect or on a timeout, are ejected for a while, and their
+    batches are retried on other replicas.
+
+    The load balancer has the same `post` interface as `jina.Client`, so it can be used in its place.
+    """
+
+    def __init__(
+        self,
+        hosts: Sequence[str],
+        *,
+        max_in_flight_per_replica: int = 2,
+        max_failures: int = 3,
+        eject_seconds: float = 30.0,
+        decay: float = 0.3,
+    ):
+        """
+        Initializes the load balancer.
+
+        :param hosts: the endpoints of the replicas.
+        :param max_in_flight_per_replica: the maximum number of requests in flight per replica, across all the
+            calls sharing the load balancer.
+        :param max_failures: the number of consecutive failures after which a replica is ejected.
+        :param eject_seconds: the number of seconds an ejected replica receives no requests.
+        :param decay: the weight of the latest latency in the moving average, between 0 and 1.
+        """
+        if not hosts:
+            raise ValueError('Please provide at least one endpoint.')
+        self.replicas = [Replica(host) for host in hosts]
+        self.max_in_flight_per_replica = max_in_flight_per_replica
+        self.max_failures = max_failures
+        self.eject_seconds = eject_seconds
+        self.decay = decay
+        self._lock = threading.Lock()
+
+    def stats(self) -> List[dict]:
+        """
+        Get the statistics of each replica.
+
+        :return: a list with the host, number of requests, documents and errors, latency estimate in seconds, requests
+            in flight and health of each replica.
+        """
+        with self._lock:
+            return [
+                dict(
+                    host=r.host,
+                    requests=r.requests,
+                    docs=r.docs,
+                    errors=r.errors,
+                    latency=r.latency,
+                    in_flight=r.in_flight,
+                    healthy=r.healthy,
+                )
+                for r in self.replicas
+            ]
+
+    def _choose(self, exclude: Sequence[Replica] = ()) -> Optional[Replica]:
+        candidates = [r for r in self.replicas if r not in exclude]
+        # if every replica is ejected, trying one of them beats failing right away
+        candidates = [r for r in candidates if r.healthy] or candidates or self.replicas
+        candidates = [
+            r for r in candidates if r.in_flight < self.max_in_flight_per_replica
+        ]
+        if not candidates:
+            return None
+        if len(candidates) > 2:
+            candidates = random.sample(candidates, 2)
+        return min(candidates, key=Replica.load)
+
+    async def _acquire(self, exclude: Sequence[Replica]) -> Replica:
+        while True:
+            # the calls of other threads share the replicas
+            with self._lock:
+                replica = self._choose(exclude=exclude)
+                if replica is not None:
+                    replica.in_flight += 1
+                    return replica
+            # polling keeps the event loop free to process the responses that free the replicas
+            await asyncio.sleep(0.005)
+
+    def _record_success(self, replica: Replica, latency: float, docs: int):
+        # the replicas are shared by the calls of other threads, which read the latency to choose among them
+        with self._lock:
+            replica.requests += 1
+            replica.docs += docs
+            replica.consecutive_errors = 0
+            replica.latency = (
+                latency
+                if replica.latency is None
+                else self.decay * latency + (1 - self.decay) * replica.latency
+            )
+
+    def _record_failure(self, replica: Replica):
+        with self._lock:
+            replica.errors += 1
+            replica.consecutive_errors += 1
+            if replica.consecutive_errors >= self.max_failures:
+                replica.ejected_until = time.monotonic() + self.eject_seconds
+                replica.consecutive_errors = 0
+
+    def post(self, **payload):
+        """
+        Split the inputs into batches of `request_size` documents and send them across the replicas.
+
+        :param payload: the arguments of `jina.Client.post`.
+        :return: the resulting documents in input order, or None if callbacks are given.
+        """
+        from jina.helper import run_async
+
+        return run_async(self._post, **payload)
+
+    async def _post(self, inputs=None, request_size: int = 1, **payload):
+        # the batches are reassembled in order here, and the concurrency is set per replica
+        payload.pop('results_in_order', None)
+        payload.pop('prefetch', None)
+        payload.pop('total_docs', None)
+        streaming = any(payload.get(k) for k in ('on_done', 'on_error', 'on_always'))
+
+        batches = self._iter_batches(inputs, request_size)
+        lock = asyncio.Lock()
+        results = {}
+
+        async def _worker():
+            while True:
+                async with lock:
+                    try:
+                        i, batch = await batches.__anext__()
+                    except StopAsyncIteration:
+                        return
+                results[i] = await self._send(batch, **payload)
+
+        workers = [
+            asyncio.create_task(_worker())
+            for _ in range(len(self.replicas) * self.max_in_flight_per_replica)
+        ]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for w in workers:
+                w.cancel()
+
+        if streaming:
+            return None
+        return DocumentArray(d for i in sorted(results) for d in results[i])
+
+    @staticmethod
+    async def _iter_batches(inputs, request_size: int):
+        if inputs is None:
+            yield 0, None
+            return
+        if isinstance(inputs, DocumentArray) and request_size <= 0:
+            yield 0, inputs
+            return
+
+        batch, i = DocumentArray(), 0
+
+        def _full():
+            return 0 < request_size <= len(batch)
+
+        if inspect.isasyncgen(inputs):
+            async for doc in inputs:
+                batch.append(doc)
+                if _full():
+                    yield i, batch
+                    batch, i = DocumentArray(), i + 1
+        else:
+            for doc in inputs:
+                batch.append(doc)
+                if _full():
+                    yield i, batch
+                    batch, i = DocumentArray(), i + 1
+        if batch:
+            yield i, batch
+
+    async def _send(self, batch: Optional['DocumentArray'], **payload):
+        tried = []
+        while True:
+            replica = await self._acquire(tried)
+            tried.append(replica)
+            start = time.perf_counter()
+            try:
+                responses = [
+                    response
+                    async for response in replica.client.post(
+                        inputs=batch,
+                        request_size=len(batch) if batch else 1,
+                        return_responses=True,
+                        **adapt_payload(replica.protocol, dict(payload)),
+                    )
+                ]
+            except FAILOVER_ERRORS:
+                self._record_failure(replica)
+                if len(tried) >= len(self.replicas):
+                    raise
+                continue
+            finally:
+                with self._lock:
+                    replica.in_flight -= 1
+            self._record_success(
+                replica, time.perf_counter() - start, len(batch) if batch else 0
+            )
+            return DocumentArray(d for response in responses for d in response.docs)
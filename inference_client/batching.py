@@ -0,0 +1,97 @@
+import json
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Tuple
+
+from docarray import Document, DocumentArray
+
+from .tasks.helper import _json_default
+
+
+class _Batch:
+    def __init__(self, payload: dict):
+        self.payload = payload
+        self.docs: List['Document'] = []
+        self.full = threading.Event()
+        self.future = Future()
+
+
+class MicroBatcher:
+    """
+    Merges concurrent single-document requests into one request, the client-side equivalent of dynamic batching.
+
+    The first caller of a batch waits up to `max_wait` seconds, or until `max_batch_size` documents were collected,
+    then sends all of them in one request and fans the results back out to the other callers. Only requests to the
+    same endpoint with the same parameters are merged.
+    """
+
+    def __init__(
+        self,
+        send: Callable[..., 'DocumentArray'],
+        max_batch_size: int = 32,
+        max_wait: float = 0.005,
+    ):
+        """
+        Initializes the batcher.
+
+        :param send: the function sending a merged payload, it takes the arguments of `jina.Client.post`.
+        :param max_batch_size: the maximum number of documents merged into one request.
+        :param max_wait: the maximum number of seconds the first caller of a batch waits for others to join.
+        """
+        self._send = send
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[str, str], _Batch] = {}
+        self.batches = 0
+        self.items = 0
+
+    def submit(self, **payload) -> 'DocumentArray':
+        """
+        Add the single input document of the payload to a batch and wait for its result.
+
+        :param payload: the arguments of `jina.Client.post`, with a single document as inputs.
+        :return: a DocumentArray holding the result document.
+        """
+        doc = payload['inputs'][0]
+        key = (
+            payload.get('on', ''),
+            # array parameters, e.g. latents, are keyed by content like in `get_payload_fingerprint`
+            json.dumps(
+                payload.get('parameters', {}), sort_keys=True, default=_json_default
+            ),
+        )
+
+        with self._lock:
+            batch = self._pending.get(key)
+            leader = batch is None
+            if leader:
+                batch = self._pending[key] = _Batch(payload)
+            batch.docs.append(doc)
+            if len(batch.docs) >= self.max_batch_size:
+                del self._pending[key]
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(timeout=self.max_wait)
+            with self._lock:
+                if self._pending.get(key) is batch:
+                    del self._pending[key]
+                self.batches += 1
+                self.items += len(batch.docs)
+            docs = DocumentArray(batch.docs)
+            try:
+                result = self._send(
+                    **dict(
+                        batch.payload,
+                        inputs=docs,
+                        request_size=len(docs),
+                        total_docs=len(docs),
+                    )
+                )
+            except BaseException as e:
+                batch.future.set_exception(e)
+                raise
+            batch.future.set_result(result)
+
+        return DocumentArray([batch.future.result()[doc.id]])
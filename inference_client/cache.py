@@ -0,0 +1,371 @@
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from docarray import DocumentArray
+
+from .tasks.helper import get_payload_fingerprint
+
+IMAGE_ENDPOINTS = ('/text-to-image', '/image-to-image')
+DETERMINISTIC_PARAMETERS = ('seed', 'latents')
+TEXT_ENDPOINTS = ('/caption', '/vqa', '/generate')
+
+_SUFFIX = '.da'
+
+
+def is_deterministic(parameters: Optional[dict]) -> bool:
+    """
+    Whether an image generation request always produces the same images, i.e. its random state is given by a seed or
+    by the initial latents.
+
+    :param parameters: the parameters of the request.
+    :return: True if the request is deterministic.
+    """
+    return any(
+        (parameters or {}).get(name) is not None for name in DETERMINISTIC_PARAMETERS
+    )
+
+
+def is_greedy(endpoint: str, parameters: Optional[dict]) -> bool:
+    """
+    Whether a text generation request always produces the same text, i.e. it does not sample.
+
+    :param endpoint: the endpoint of the request.
+    :param parameters: the parameters of the request.
+    :return: True if `do_sample` is not set for `/caption` and `/vqa`, and if it is explicitly False for `/generate`,
+        as the default generation config of a language model may sample.
+    """
+    do_sample = (parameters or {}).get('do_sample')
+    if endpoint == '/generate':
+        return do_sample is False
+    return not do_sample
+
+
+def is_repeatable(endpoint: str, parameters: Optional[dict]) -> bool:
+    """
+    Whether identical inputs of a request produce identical results, so that they only need to be sent once.
+
+    :param endpoint: the endpoint of the request.
+    :param parameters: the parameters of the request.
+    :return: False for image generation requests that are not deterministic and for text generation requests that may
+        sample, see `is_deterministic` and `is_greedy`, True otherwise.
+    """
+    if endpoint in IMAGE_ENDPOINTS:
+        return is_deterministic(parameters)
+    if endpoint in TEXT_ENDPOINTS:
+        return is_greedy(endpoint, parameters)
+    return True
+
+
+def _cache_key(model: str, fingerprint: str) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    h.update(model.encode('utf-8') + b'\0' + fingerprint.encode())
+    return h.hexdigest()
+
+
+class ImageCache:
+    """
+    A content-addressed on-disk cache of generated images.
+
+    The results of deterministic `text_to_image` and `image_to_image` calls are stored in a directory, one file per
+    request named after the hash of the model, the inputs and the parameters. When the files exceed `max_bytes`, the
+    least recently used ones are evicted.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 1 << 30):
+        """
+        :param path: the directory of the cache, created if it does not exist. It can be shared by several processes.
+        :param max_bytes: the maximum total size of the cached files.
+        """
+        if max_bytes <= 0:
+            raise ValueError('The maximum size of the cache should be positive.')
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+        self._sizes: Dict[str, int] = {
+            entry.name[: -len(_SUFFIX)]: entry.stat().st_size
+            for entry in os.scandir(path)
+            if entry.is_file() and entry.name.endswith(_SUFFIX)
+        }
+
+    @property
+    def size(self) -> int:
+        """The total size in bytes of the cached files."""
+        return sum(self._sizes.values())
+
+    def stats(self) -> dict:
+        """
+        Get the metrics of the cache.
+
+        :return: the number of hits, misses, evictions and entries, the hit rate and the total size in bytes.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return dict(
+                hits=self.hits,
+                misses=self.misses,
+                hit_rate=self.hits / lookups if lookups else 0.0,
+                evictions=self.evictions,
+                entries=len(self._sizes),
+                bytes=self.size,
+            )
+
+    def key(self, model: str, payload: dict) -> Optional[str]:
+        """
+        Compute the cache key of a request.
+
+        :param model: the name or the endpoint of the model.
+        :param payload: the payload built by one of the task methods.
+        :return: the key, or None if the request cannot be cached, i.e. it is not a deterministic image generation
+            request with materialized inputs.
+        """
+        if payload.get('on') not in IMAGE_ENDPOINTS or not is_deterministic(
+            payload.get('parameters')
+        ):
+            return None
+        if (fingerprint := get_payload_fingerprint(payload)) is None:
+            return None
+        return _cache_key(model, fingerprint)
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, key + _SUFFIX)
+
+    def get(self, key: str) -> Optional['DocumentArray']:
+        """
+        Load the cached result of a request.
+
+        :param key: the key of the request.
+        :return: the cached documents, or None on a miss.
+        """
+        file = self._file(key)
+        try:
+            with open(file, 'rb') as f:
+                data = f.read()
+            # the access time is not updated on every file system, the modification time tracks the recency instead
+            os.utime(file)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+                self._sizes.pop(key, None)
+            return None
+        with self._lock:
+            self.hits += 1
+            self._sizes[key] = len(data)
+        return DocumentArray.from_bytes(data, protocol='protobuf', compress=None)
+
+    def put(self, key: str, docs: 'DocumentArray'):
+        """
+        Store the result of a request, evicting the least recently used entries if the cache becomes too large.
+
+        :param key: the key of the request.
+        :param docs: the resulting documents.
+        """
+        data = docs.to_bytes(protocol='protobuf', compress=None)
+        if len(data) > self.max_bytes:
+            return
+        # written to a temporary file first so that concurrent readers never see a partial entry
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, self._file(key))
+        with self._lock:
+            self._sizes[key] = len(data)
+            if self.size > self.max_bytes:
+                self._evict(key)
+
+    def _evict(self, keep: str):
+        def _mtime(key):
+            try:
+                return os.stat(self._file(key)).st_mtime
+            except OSError:
+                return 0.0
+
+        for key in sorted(self._sizes, key=_mtime):
+            if self.size <= self.max_bytes:
+                return
+            if key == keep:
+                continue
+            try:
+                os.remove(self._file(key))
+            except OSError:
+                pass
+            del self._sizes[key]
+            self.evictions += 1
+
+    def clear(self):
+        """Remove all the cached files."""
+        with self._lock:
+            for key in list(self._sizes):
+                try:
+                    os.remove(self._file(key))
+                except OSError:
+                    pass
+            self._sizes.clear()
+
+
+class ResponseCache:
+    """
+    A cache of the responses of deterministic text generation requests, i.e. `caption`, `vqa` and `generate` calls
+    that do not sample.
+
+    Responses are kept in an in-memory LRU of `max_entries` requests, backed by an optional SQLite database that
+    survives restarts and can be shared by several processes. The same cache can be shared by several models, as
+    requests are keyed by the model, the endpoint, the hash of the inputs and the parameters.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Optional[float] = None,
+        path: Optional[str] = None,
+    ):
+        """
+        :param max_entries: the maximum number of responses kept in memory.
+        :param ttl: if set, responses expire this many seconds after they were received.
+        :param path: if set, the path of a SQLite database in which the responses are also stored.
+        """
+        if max_entries <= 0:
+            raise ValueError('The maximum number of entries should be positive.')
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._memory: 'OrderedDict[str, Tuple[Optional[float], DocumentArray]]' = (
+            OrderedDict()
+        )
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            with self._db:
+                self._db.execute(
+                    'CREATE TABLE IF NOT EXISTS responses '
+                    '(key TEXT PRIMARY KEY, expires_at REAL, value BLOB NOT NULL)'
+                )
+
+    def stats(self) -> dict:
+        """
+        Get the metrics of the cache.
+
+        :return: the number of hits, of which answered from disk, and misses, the hit rate and the number of responses
+            in memory.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return dict(
+                hits=self.hits,
+                disk_hits=self.disk_hits,
+                misses=self.misses,
+                hit_rate=self.hits / lookups if lookups else 0.0,
+                entries=len(self._memory),
+            )
+
+    def key(self, model: str, payload: dict) -> Optional[str]:
+        """
+        Compute the cache key of a request.
+
+        :param model: the name or the endpoint of the model.
+        :param payload: the payload built by one of the task methods.
+        :return: the key, or None if the request cannot be cached, i.e. it is not a text generation request, it samples,
+            or its inputs are not materialized.
+        """
+        endpoint = payload.get('on')
+        if endpoint not in TEXT_ENDPOINTS or not is_greedy(
+            endpoint, payload.get('parameters')
+        ):
+            return None
+        if (fingerprint := get_payload_fingerprint(payload)) is None:
+            return None
+        return _cache_key(model, fingerprint)
+
+    def get(self, key: str) -> Optional['DocumentArray']:
+        """
+        Get the cached response of a request.
+
+        :param key: the key of the request.
+        :return: a copy of the cached documents, or None on a miss.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > now):
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return DocumentArray(entry[1], copy=True)
+
+            loaded = self._load(key, now) if self._db is not None else None
+            if loaded is None:
+                self._memory.pop(key, None)
+                self.misses += 1
+                return None
+            expires_at, docs = loaded
+            self.hits += 1
+            self.disk_hits += 1
+            # the response keeps the expiry it was stored with
+            self._remember(key, expires_at, docs)
+            return DocumentArray(docs, copy=True)
+
+    def put(self, key: str, docs: 'DocumentArray'):
+        """
+        Store the response of a request.
+
+        :param key: the key of the request.
+        :param docs: the resulting documents.
+        """
+        expires_at = self._expiry(time.time())
+        with self._lock:
+            self._remember(key, expires_at, DocumentArray(docs, copy=True))
+            if self._db is not None:
+                with self._db:
+                    self._db.execute(
+                        'INSERT OR REPLACE INTO responses VALUES (?, ?, ?)',
+                        (
+                            key,
+                            expires_at,
+                            docs.to_bytes(protocol='protobuf', compress=None),
+                        ),
+                    )
+
+    def _expiry(self, now: float) -> Optional[float]:
+        return now + self.ttl if self.ttl is not None else None
+
+    def _remember(self, key: str, expires_at: Optional[float], docs: 'DocumentArray'):
+        self._memory[key] = (expires_at, docs)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _load(
+        self, key: str, now: float
+    ) -> Optional[Tuple[Optional[float], 'DocumentArray']]:
+        row = self._db.execute(
+            'SELECT expires_at, value FROM responses WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[0] is not None and row[0] <= now:
+            with self._db:
+                self._db.execute('DELETE FROM responses WHERE key = ?', (key,))
+            return None
+        return row[0], DocumentArray.from_bytes(
+            row[1], protocol='protobuf', compress=None
+        )
+
+    def clear(self):
+        """Remove all the cached responses, in memory and on disk."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                with self._db:
+                    self._db.execute('DELETE FROM responses')
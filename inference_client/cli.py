@@ -0,0 +1,448 @@
+import argparse
+import collections
+import csv
+import itertools
+import json
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, TYPE_CHECKING, Iterator, List, Optional
+
+import numpy
+from docarray import Document, DocumentArray
+
+from .arrow import ParquetWriter, embedding_array, import_pyarrow
+from .client import Client
+from .protocol import PROTOCOLS
+from .tasks.helper import load_plain_into_document
+
+if TYPE_CHECKING:
+    import pyarrow
+
+TASKS = ('encode', 'caption', 'vqa', 'rank', 'upscale', 'generate')
+INPUT_FORMATS = ('jsonl', 'csv', 'parquet')
+OUTPUT_FORMATS = ('jsonl', 'npy', 'parquet')
+
+
+def _format_of(path: Optional[str], formats, default: str) -> str:
+    if path is None or path == '-':
+        return default
+    ext = os.path.splitext(path)[1].lstrip('.').lower()
+    ext = {'json': 'jsonl', 'ndjson': 'jsonl', 'pq': 'parquet'}.get(ext, ext)
+    return ext if ext in formats else default
+
+
+def read_records(
+    path: str, input_format: str, chunk_size: int, stdin: Optional[IO] = None
+) -> Iterator[List[dict]]:
+    """
+    Read the input records lazily, in chunks.
+
+    :param path: the path of the input file, or `-` for the standard input.
+    :param input_format: `jsonl`, `csv` or `parquet`. Parquet files cannot be read from the standard input.
+    :param chunk_size: the number of records of a chunk.
+    :param stdin: the standard input, defaults to `sys.stdin`.
+    :yield: the chunks of records, as dicts.
+    """
+    if input_format == 'parquet':
+        if path == '-':
+            raise ValueError('Parquet input cannot be read from the standard input.')
+        parquet_file = import_pyarrow().parquet.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            yield batch.to_pylist()
+        return
+
+    f = (stdin or sys.stdin) if path == '-' else open(path, newline='')
+    try:
+        if input_format == 'csv':
+            records = csv.DictReader(f)
+        else:
+            records = (json.loads(line) for line in f if line.strip())
+        while chunk := list(itertools.islice(records, chunk_size)):
+            yield chunk
+    finally:
+        if f is not sys.stdin and f is not stdin:
+            f.close()
+
+
+def _field(record: dict, name: str, index: int):
+    value = record.get(name)
+    if value is None or value == '':
+        raise ValueError(f'Record {index} has no `{name}` field.')
+    return value
+
+
+def _to_doc(task: str, record: dict, index: int) -> 'Document':
+    if task == 'vqa':
+        return Document(
+            uri=_field(record, 'image', index),
+            tags={'prompt': _field(record, 'question', index)},
+        )
+    if task in ('caption', 'upscale'):
+        return Document(uri=_field(record, 'image', index))
+
+    # encode and rank take either a text or an image
+    if record.get('text') not in (None, ''):
+        doc = Document(text=record['text'])
+    else:
+        doc = Document(uri=_field(record, 'image', index))
+    if task == 'rank':
+        candidates = _field(record, 'candidates', index)
+        if isinstance(candidates, str):
+            # CSV cells hold the candidates as a JSON list
+            candidates = json.loads(candidates)
+        doc.matches = DocumentArray([load_plain_into_document(c) for c in candidates])
+    return doc
+
+
+def run_task(model, task: str, records: List[dict], offset: int, args) -> list:
+    """
+    Run a task on a chunk of records.
+
+    :param model: the model.
+    :param task: the task.
+    :param records: the input records.
+    :param offset: the index of the first record in the input.
+    :param args: the parsed command line arguments.
+    :return: the output of each record, an embedding, a text, a ranking or an image path.
+    """
+    parameters = dict(args.param)
+    if task == 'generate':
+        prompts = [_field(r, 'prompt', offset + i) for i, r in enumerate(records)]
+        output = model.generate(prompts, **parameters)
+        return [output] if isinstance(output, str) else output
+
+    docs = DocumentArray([_to_doc(task, r, offset + i) for i, r in enumerate(records)])
+    ids = docs[:, 'id']
+    if task == 'encode':
+        result = model.encode(docs=docs, batch_size=args.batch_size, **parameters)
+    else:
+        result = getattr(model, task)(
+            docs=docs, request_size=args.batch_size, **parameters
+        )
+    result = result[ids]
+
+    if task == 'encode':
+        return list(result.embeddings)
+    if task in ('caption', 'vqa'):
+        return result[:, 'tags__response']
+    if task == 'rank':
+        return [
+            [
+                dict(
+                    candidate=m.text or m.uri,
+                    scores={name: s.value for name, s in m.scores.items()},
+                )
+                for m in doc.matches
+            ]
+            for doc in result
+        ]
+
+    image_format = parameters.get('image_format', 'png')
+    paths = []
+    for i, doc in enumerate(result):
+        path = os.path.join(args.image_dir, f'{offset + i:08d}.{image_format}')
+        with open(path, 'wb') as f:
+            f.write(doc.blob)
+        paths.append(path)
+    return paths
+
+
+class JsonlWriter:
+    """Writes one JSON line per record, with the id of the record if any and its output."""
+
+    def __init__(self, f: IO, key: str, id_field: str, close: bool = True):
+        """
+        :param f: the text file to write to.
+        :param key: the key of the outputs.
+        :param id_field: the field of the records copied to the output lines.
+        :param close: whether to close the file when done, False for the standard output.
+        """
+        self.f = f
+        self.key = key
+        self.id_field = id_field
+        self._close = close
+
+    def write(self, records: List[dict], outputs: list):
+        """
+        Append the outputs of a chunk of records.
+
+        :param records: the input records.
+        :param outputs: the output of each record.
+        """
+        for record, output in zip(records, outputs):
+            line = {}
+            if self.id_field in record:
+                line[self.id_field] = record[self.id_field]
+            if isinstance(output, numpy.ndarray):
+                output = output.tolist()
+            line[self.key] = output
+            self.f.write(json.dumps(line) + '\n')
+        self.f.flush()
+
+    def close(self):
+        """Close the file, unless it is the standard output."""
+        if self._close:
+            self.f.close()
+
+
+class NpyWriter:
+    """
+    Writes embeddings to a `.npy` file as they come. The header, which holds the number of rows, is written when the
+    file is closed.
+    """
+
+    _HEADER_SIZE = 128
+
+    def __init__(self, path: str):
+        """
+        :param path: the path of the `.npy` file.
+        """
+        self.f = open(path, 'wb')
+        self.f.write(b'\0' * self._HEADER_SIZE)
+        self.rows = 0
+        self.dim = 0
+        self.dtype = numpy.dtype(numpy.float32)
+
+    def write(self, records: List[dict], outputs: list):
+        """
+        Append the embeddings of a chunk of records.
+
+        :param records: the input records.
+        :param outputs: the embedding of each record.
+        """
+        if not outputs:
+            return
+        embeddings = numpy.ascontiguousarray(numpy.stack(outputs))
+        if self.rows == 0:
+            self.dim, self.dtype = embeddings.shape[1], embeddings.dtype
+        elif embeddings.shape[1] != self.dim or embeddings.dtype != self.dtype:
+            raise ValueError('All the embeddings should have the same shape and dtype.')
+        self.f.write(embeddings.tobytes())
+        self.rows += len(embeddings)
+
+    def close(self):
+        """Write the header and close the file."""
+        header = repr(
+            {
+                'descr': numpy.lib.format.dtype_to_descr(self.dtype),
+                'fortran_order': False,
+                'shape': (self.rows, self.dim),
+            }
+        ).encode('latin1')
+        # magic string, version 1.0, header length, header padded with spaces and ended by a newline
+        header_len = self._HEADER_SIZE - 10
+        header = header.ljust(header_len - 1) + b'\n'
+        self.f.seek(0)
+        self.f.write(b'\x93NUMPY\x01\x00' + struct.pack('<H', header_len) + header)
+        self.f.close()
+
+
+def outputs_table(
+    records: List[dict], outputs: list, key: str, id_field: str
+) -> 'pyarrow.Table':
+    """
+    Build the Arrow table of the outputs of a chunk of records, e.g. to append it to a Parquet file with
+    :class:`~inference_client.arrow.ParquetWriter`.
+
+    :param records: the input records.
+    :param outputs: the output of each record. Embeddings are stored as fixed-size lists, rankings as JSON strings.
+    :param key: the column of the outputs.
+    :param id_field: the field of the records copied to a column, if any.
+    :return: the table.
+    """
+    pa = import_pyarrow()
+    columns = {}
+    if records and id_field in records[0]:
+        columns[id_field] = pa.array([r.get(id_field) for r in records])
+    if outputs and isinstance(outputs[0], numpy.ndarray):
+        columns[key] = embedding_array(numpy.stack(outputs))
+    else:
+        columns[key] = pa.array(
+            [json.dumps(o) if isinstance(o, list) else o for o in outputs]
+        )
+    return pa.table(columns)
+
+
+_OUTPUT_KEYS = dict(
+    encode='embedding',
+    caption='response',
+    vqa='response',
+    generate='response',
+    rank='matches',
+    upscale='path',
+)
+
+
+def _make_writer(args, stdout: Optional[IO] = None):
+    # returns the writer, to be closed when done, and the function writing the outputs of a chunk of records
+    key = _OUTPUT_KEYS[args.task]
+    output_format = args.output_format or _format_of(
+        args.output, OUTPUT_FORMATS, 'jsonl'
+    )
+    if output_format == 'npy':
+        if args.task != 'encode' or args.output in (None, '-'):
+            raise ValueError('The npy output is only supported for encode to a file.')
+        writer = NpyWriter(args.output)
+    elif output_format == 'parquet':
+        if args.output in (None, '-'):
+            raise ValueError('The parquet output is only supported to a file.')
+        writer = ParquetWriter(args.output)
+        return writer, lambda records, outputs: writer.write(
+            outputs_table(records, outputs, key, args.id_field)
+        )
+    elif args.output in (None, '-'):
+        writer = JsonlWriter(stdout or sys.stdout, key, args.id_field, close=False)
+    else:
+        writer = JsonlWriter(open(args.output, 'w'), key, args.id_field)
+    return writer, writer.write
+
+
+def _parse_param(value: str):
+    name, sep, raw = value.partition('=')
+    if not sep or not name:
+        raise argparse.ArgumentTypeError(f'Expected NAME=VALUE, got `{value}`.')
+    try:
+        return name, json.loads(raw)
+    except json.JSONDecodeError:
+        return name, raw
+
+
+def run(args, model=None, stdin: Optional[IO] = None, stdout: Optional[IO] = None):
+    """
+    Run a task on all the input records and write the outputs in input order.
+
+    Chunks of `chunk_size` records are processed by up to `concurrency` threads, each chunk is one call of the task
+    method, streamed to the model in batches of `batch_size` documents. The outputs are only written to the given
+    files, the jina client may still print to `sys.stdout`, e.g. its progress bar, see :func:`main`.
+
+    :param args: the parsed command line arguments.
+    :param model: the model, created from the arguments if not given.
+    :param stdin: the standard input, defaults to `sys.stdin`.
+    :param stdout: the standard output, defaults to `sys.stdout`.
+    :return: the number of records and the elapsed seconds.
+    """
+    if args.task == 'upscale':
+        if not args.image_dir:
+            raise ValueError('Upscaled images are written to `--image-dir`.')
+        os.makedirs(args.image_dir, exist_ok=True)
+    if model is None:
+        token = args.token or os.environ.get('JINA_AUTH_TOKEN')
+        model = Client(token=token).get_model(
+            args.model, protocol=args.protocol, compression=args.compression
+        )
+    input_format = args.input_format or _format_of(args.input, INPUT_FORMATS, 'jsonl')
+    chunks = read_records(args.input, input_format, args.chunk_size, stdin=stdin)
+    writer, write = _make_writer(args, stdout=stdout)
+
+    start = time.perf_counter()
+    total = 0
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            pending = collections.deque()
+            offset = 0
+            for records in itertools.chain(chunks, [None]):
+                if records is not None:
+                    pending.append(
+                        (
+                            records,
+                            pool.submit(
+                                run_task, model, args.task, records, offset, args
+                            ),
+                        )
+                    )
+                    offset += len(records)
+                # the outputs are written in input order, as soon as the oldest chunk is done
+                while pending and (
+                    records is None
+                    or pending[0][1].done()
+                    or len(pending) > 2 * args.concurrency
+                ):
+                    done_records, future = pending.popleft()
+                    write(done_records, future.result())
+                    total += len(done_records)
+    finally:
+        writer.close()
+    return total, time.perf_counter() - start
+
+
+def main(argv=None):
+    """
+    Entry point of the ``inference-client`` command.
+
+    :param argv: the command line arguments, defaults to `sys.argv`.
+    """
+    parser = argparse.ArgumentParser(
+        prog='inference-client',
+        description='Run a task of a model on all the records of a JSONL, CSV or Parquet file.',
+        epilog='Records hold the inputs in the `text`, `image` (a path or URI), `question`, `candidates` or `prompt` '
+        'fields, depending on the task.',
+    )
+    parser.add_argument('task', choices=TASKS)
+    parser.add_argument(
+        '--model', required=True, help='the name or the endpoint of the model'
+    )
+    parser.add_argument(
+        '--token', help='the auth token, defaults to the JINA_AUTH_TOKEN variable'
+    )
+    parser.add_argument('--protocol', choices=PROTOCOLS + ('auto',), default='grpc')
+    parser.add_argument('--compression', choices=['gzip', 'deflate'])
+    parser.add_argument(
+        '-i', '--input', default='-', help='the input file, `-` for stdin'
+    )
+    parser.add_argument(
+        '--input-format',
+        choices=INPUT_FORMATS,
+        help='defaults to the file extension, or jsonl',
+    )
+    parser.add_argument(
+        '-o', '--output', default='-', help='the output file, `-` for stdout'
+    )
+    parser.add_argument(
+        '--output-format',
+        choices=OUTPUT_FORMATS,
+        help='defaults to the file extension, or jsonl',
+    )
+    parser.add_argument(
+        '--id-field', default='id', help='the field copied from the inputs'
+    )
+    parser.add_argument('--image-dir', help='the directory of the upscaled images')
+    parser.add_argument(
+        '--batch-size', type=int, default=8, help='documents per request'
+    )
+    parser.add_argument(
+        '--chunk-size', type=int, default=256, help='records per call of the task'
+    )
+    parser.add_argument(
+        '--concurrency', type=int, default=2, help='chunks processed at once'
+    )
+    parser.add_argument(
+        '-p',
+        '--param',
+        type=_parse_param,
+        action='append',
+        default=[],
+        metavar='NAME=VALUE',
+        help='an argument of the task, the value is parsed as JSON if possible',
+    )
+
+    args = parser.parse_args(argv)
+    # the outputs are written to the standard output given to `run`, while anything else printed there by the jina
+    # client, e.g. its progress bar with `-p show_progress=true`, goes to the standard error of the command
+    stdout, sys.stdout = sys.stdout, sys.stderr
+    try:
+        total, elapsed = run(args, stdout=stdout)
+    except (ValueError, ImportError) as e:
+        parser.exit(2, f'inference-client: error: {e}\n')
+    finally:
+        sys.stdout = stdout
+    print(
+        f'{total} records in {elapsed:.2f}s ({total / max(elapsed, 1e-9):.1f} records/s)',
+        file=sys.stderr,
+    )
+
+
+if __name__ == '__main__':
+    main()
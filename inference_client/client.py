@@ -1,8 +1,15 @@
 from functools import lru_cache
-from typing import Optional
+from typing import TYPE_CHECKING, Optional, Sequence
 
 from .helper import get_model_spec, login
 from .model import Model
+from .protocol import PROTOCOLS
+
+if TYPE_CHECKING:
+    from jina import Executor
+
+    from .cache import ImageCache, ResponseCache
+    from .throttle import RateLimiter
 
 
 class Client:
@@ -14,12 +21,17 @@ class Client:
         self,
         *,
         token: Optional[str] = None,
+        rate_limiter: Optional['RateLimiter'] = None,
     ):
         """
         Initializes the client with the desired model and user token.
 
         :param token: An optional user token for authentication.
+        :param rate_limiter: An optional rate limiter shared by all the models returned by `get_model`. The requests of
+            models running an executor in-process or replaying a recording are not sent over the network, and not
+            throttled.
         """
+        self.rate_limiter = rate_limiter
 
         try:
             self._auth_token = login(token) if token else None
@@ -28,9 +40,28 @@ class Client:
                 f'Invalid or expired auth token. Please re-enter your token and try again.'
             ) from None
 
-    @lru_cache(maxsize=10)
     def get_model(
-        self, model_name: Optional[str] = None, endpoint: Optional[str] = None
+        self,
+        model_name: Optional[str] = None,
+        endpoint: Optional[str] = None,
+        coalesce: bool = False,
+        max_batch_size: Optional[int] = None,
+        max_batch_wait: float = 0.005,
+        endpoints: Optional[Sequence[str]] = None,
+        max_in_flight_per_replica: int = 2,
+        protocol: str = 'grpc',
+        compression: Optional[str] = None,
+        compression_threshold: int = 1024,
+        max_request_bytes: Optional[int] = None,
+        image_cache: Optional['ImageCache'] = None,
+        response_cache: Optional['ResponseCache'] = None,
+        deduplicate: bool = False,
+        near_duplicate_threshold: Optional[int] = None,
+        perceptual_hash: str = 'phash',
+        record: Optional[str] = None,
+        replay: Optional[str] = None,
+        replay_latency_scale: float = 1.0,
+        executor: Optional['Executor'] = None,
     ):
         """
         Get a model by name or endpoint. Returns a cached model if it exists.
@@ -47,30 +78,150 @@ class Client:
 
         # or get model by endpoint
         model = client.get_model('grpc://localhost:12345')
+
+        # or spread the requests across several replicas of the model
+        model = client.get_model(endpoints=['grpc://host-1:12345', 'grpc://host-2:12345'])
         ```
 
         :param model_name: The name of the model.
         :param endpoint: The endpoint of the model.
+        :param coalesce: Whether concurrent identical calls to the model should share a single request.
+        :param max_batch_size: If set, concurrent single-item calls are merged into requests of up to this many items.
+        :param max_batch_wait: The maximum number of seconds a single-item call waits for others to be merged with.
+        :param endpoints: The endpoints of several replicas of the model. If given, the requests are load balanced
+            across them and `model_name` and `endpoint` are ignored.
+        :param max_in_flight_per_replica: The maximum number of requests in flight to each of the `endpoints`, across
+            all the calls to the model.
+        :param protocol: The protocol used to connect to a model given by name, one of `grpc`, `http`, `websocket`,
+            or `auto` to probe the endpoints of the model and use the fastest, falling back to the others if it becomes
+            unreachable. Ignored if the model is given by endpoint.
+        :param compression: If set to `gzip` or `deflate`, requests are compressed at the gRPC layer, and 8-bit image
+            tensors are encoded losslessly as PNG.
+        :param compression_threshold: The minimum number of bytes of a request, or of a tensor, to be compressed.
+        :param max_request_bytes: If set, the documents are packed into requests of at most `batch_size` documents
+            whose estimated size fits this many bytes, e.g. below the gRPC maximum message size.
+        :param image_cache: If set, the images generated by `text_to_image` and `image_to_image` calls with an
+            explicit `seed` or `latents` are stored in this cache, and identical calls are answered from it.
+        :param response_cache: If set, the responses of `caption`, `vqa` and `generate` calls that do not sample are
+            stored in this cache, and identical calls are answered from it. The cache can be shared by several models.
+        :param deduplicate: If set, identical inputs of a call are sent only once, their result being copied to all of
+            them. Every input is hashed to find them, so it is worth it for data with many duplicates. Calls that sample, i.e. `text_to_image` and `image_to_image` without a `seed` or `latents`, and
+            `caption`, `vqa` and `generate` unless they decode greedily, are never deduplicated.
+        :param near_duplicate_threshold: If set, the images of `encode`, `caption` and `vqa` calls whose perceptual
+            hashes differ by at most this many bits out of 64 are sent only once, their result being copied to all of
+            them. Images are only grouped with others of equal text and tags, e.g. the same question.
+        :param perceptual_hash: The perceptual hash of the images, `phash` or the faster but less robust `ahash`.
+        :param record: If set, the requests sent to the model, their results and latencies are recorded to this
+            directory.
+        :param replay: If set, the requests are answered from the recording in this directory, after their recorded
+            latencies, instead of being sent to the model. The model name or endpoint is then only used as a label.
+        :param replay_latency_scale: The factor applied to the replayed latencies, e.g. `0` to replay without delay.
+        :param executor: If set, the requests are run on this executor, or an instance of this executor class, in the
+            same process instead of being sent to the model. The model name or endpoint is then only used as a label.
         :return: The model.
         """
+        if protocol not in PROTOCOLS + ('auto',):
+            raise ValueError(
+                f'Protocol should be one of {", ".join(PROTOCOLS)} or auto, got `{protocol}`.'
+            )
+        return self._get_model(
+            model_name=model_name,
+            endpoint=endpoint,
+            coalesce=coalesce,
+            max_batch_size=max_batch_size,
+            max_batch_wait=max_batch_wait,
+            endpoints=tuple(endpoints) if endpoints else None,
+            max_in_flight_per_replica=max_in_flight_per_replica,
+            protocol=protocol,
+            compression=compression,
+            compression_threshold=compression_threshold,
+            max_request_bytes=max_request_bytes,
+            image_cache=image_cache,
+            response_cache=response_cache,
+            deduplicate=deduplicate,
+            near_duplicate_threshold=near_duplicate_threshold,
+            perceptual_hash=perceptual_hash,
+            record=record,
+            replay=replay,
+            replay_latency_scale=replay_latency_scale,
+            executor=executor,
+        )
 
-        if not model_name and not endpoint:
+    @lru_cache(maxsize=10)
+    def _get_model(
+        self,
+        model_name: Optional[str],
+        endpoint: Optional[str],
+        coalesce: bool,
+        max_batch_size: Optional[int],
+        max_batch_wait: float,
+        endpoints: Optional[Sequence[str]],
+        max_in_flight_per_replica: int,
+        protocol: str,
+        compression: Optional[str],
+        compression_threshold: int,
+        max_request_bytes: Optional[int],
+        image_cache: Optional['ImageCache'],
+        response_cache: Optional['ResponseCache'],
+        deduplicate: bool,
+        near_duplicate_threshold: Optional[int],
+        perceptual_hash: str,
+        record: Optional[str],
+        replay: Optional[str],
+        replay_latency_scale: float,
+        executor: Optional['Executor'],
+    ):
+        if not model_name and not endpoint and not endpoints and executor is None:
             raise ValueError(
                 'Please provide either a model name or endpoint to get a model.'
             )
 
         from urllib.parse import urlparse
 
+        protocols = None
+
+        # Note: a replayed or in-process model is never connected to, its name or endpoint is only used as a label
+        if replay or executor is not None:
+            endpoint = endpoint or model_name or (endpoints or ('local',))[0]
+        # Note: if endpoints are provided, model_name and endpoint are ignored
+        elif endpoints:
+            endpoint = endpoints[0]
         # Note: if endpoint is provided, model_name is ignored
-        o = urlparse(endpoint or model_name)
-        if o.scheme and o.netloc:
+        elif (o := urlparse(endpoint or model_name)).scheme and o.netloc:
             endpoint = endpoint or model_name
         elif model_name:
             spec = get_model_spec(model_name, self._auth_token)
-            endpoint = spec['endpoints']['grpc']
+            if protocol == 'auto':
+                protocols = tuple(
+                    (p, e) for p, e in spec['endpoints'].items() if p in PROTOCOLS and e
+                )
+                endpoint = spec['endpoints'].get('grpc')
+            elif not (endpoint := spec['endpoints'].get(protocol)):
+                raise ValueError(
+                    f'The model `{model_name}` has no {protocol} endpoint.'
+                )
 
         return Model(
             model_name=model_name,
             token=self._auth_token,
             host=endpoint,
+            rate_limiter=self.rate_limiter,
+            coalesce=coalesce,
+            max_batch_size=max_batch_size,
+            max_batch_wait=max_batch_wait,
+            endpoints=endpoints,
+            max_in_flight_per_replica=max_in_flight_per_replica,
+            protocols=protocols,
+            compression=compression,
+            compression_threshold=compression_threshold,
+            max_request_bytes=max_request_bytes,
+            image_cache=image_cache,
+            response_cache=response_cache,
+            deduplicate=deduplicate,
+            near_duplicate_threshold=near_duplicate_threshold,
+            perceptual_hash=perceptual_hash,
+            record=record,
+            replay=replay,
+            replay_latency_scale=replay_latency_scale,
+            executor=executor,
         )
@@ -0,0 +1,181 @@
+import itertools
+import threading
+from typing import Optional
+
+import numpy
+from docarray import Document, DocumentArray
+from jina import Client
+
+# the names of the gRPC compression algorithms used by `jina.Client.post`
+COMPRESSIONS = {'gzip': 'Gzip', 'deflate': 'Deflate'}
+# the default request size of `jina.Client.post`
+DEFAULT_REQUEST_SIZE = 100
+
+
+def _approx_size(doc: 'Document') -> int:
+    size = len(doc.text.encode('utf-8')) + len(doc.blob) + len(doc.uri)
+    for array in (doc.tensor, doc.embedding):
+        if array is not None:
+            size += getattr(array, 'nbytes', 0)
+    return (
+        size
+        + sum(_approx_size(c) for c in doc.chunks)
+        + sum(_approx_size(m) for m in doc.matches)
+    )
+
+
+def is_image_tensor(tensor) -> bool:
+    """
+    Check if a tensor is an 8-bit image that can be encoded losslessly as PNG.
+
+    :param tensor: the tensor to check.
+    :return: True if the tensor is a `uint8` ndarray of shape `(H, W)`, `(H, W, 3)` or `(H, W, 4)`.
+    """
+    return (
+        isinstance(tensor, numpy.ndarray)
+        and tensor.dtype == numpy.uint8
+        and (tensor.ndim == 2 or (tensor.ndim == 3 and tensor.shape[-1] in (3, 4)))
+    )
+
+
+def compress_tensor(doc: 'Document', threshold: int = 0) -> 'Document':
+    """
+    Replace a large 8-bit image tensor by its lossless PNG encoding. Other documents are returned unchanged.
+
+    :param doc: the document to compress.
+    :param threshold: the minimum number of tensor bytes for the tensor to be encoded.
+    :return: a copy of the document with the PNG image as blob, or the document itself.
+    """
+    if (
+        doc.blob
+        or not is_image_tensor(doc.tensor)
+        or doc.tensor.nbytes < max(threshold, 1)
+    ):
+        return doc
+    compressed = Document(doc, copy=True)
+    compressed.convert_image_tensor_to_blob(image_format='png')
+    compressed.tensor = None
+    return compressed
+
+
+class CompressionClients:
+    """
+    The jina clients of an endpoint, one per gRPC compression algorithm, which send the calls of their algorithm.
+
+    A jina client keeps the compression of the call it sends on the instance, where it is read back once connected,
+    so concurrent calls of different algorithms, e.g. requests above and below the compression threshold, must not
+    share a client.
+    """
+
+    def __init__(self, host: str, **kwargs):
+        """
+        Initializes the clients.
+
+        :param host: the endpoint.
+        :param kwargs: additional arguments of `jina.Client`, e.g. `asyncio`.
+        """
+        self.host = host
+        self.kwargs = kwargs
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def get(self, compression: Optional[str] = None) -> 'Client':
+        """
+        Get the client of a compression, created on first use.
+
+        :param compression: the gRPC compression algorithm, as a name of `grpc.Compression`, or None.
+        :return: the jina client.
+        """
+        with self._lock:
+            if compression not in self._clients:
+                self._clients[compression] = Client(host=self.host, **self.kwargs)
+            return self._clients[compression]
+
+    def post(self, compression: Optional[str] = None, **kwargs):
+        """
+        Send a call with the client of its compression.
+
+        :param compression: the gRPC compression algorithm of the call, as a name of `grpc.Compression`, or None.
+        :param kwargs: the other arguments of `jina.Client.post`.
+        :return: the result of `jina.Client.post`.
+        """
+        return self.get(compression).post(compression=compression, **kwargs)
+
+    def is_flow_ready(self, **kwargs) -> bool:
+        """
+        Check if the endpoint is ready, see `jina.Client.is_flow_ready`.
+
+        :param kwargs: the arguments of `jina.Client.is_flow_ready`.
+        :return: True if the endpoint is ready.
+        """
+        return self.get().is_flow_ready(**kwargs)
+
+
+class Compressor:
+    """
+    Compresses the request payloads of a model.
+
+    Large 8-bit image tensors are encoded losslessly as PNG, and requests are compressed at the gRPC layer with gzip or
+    deflate. Requests smaller than the threshold are sent as they are, so that small text requests do not pay for the
+    compression. The compression applies to all the requests of a call, so for streamed inputs, e.g. `docs`, it is
+    decided from the size of the first request.
+    """
+
+    def __init__(
+        self,
+        compression: Optional[str] = None,
+        threshold: int = 1024,
+        compress_tensors: bool = True,
+    ):
+        """
+        Initializes the compressor.
+
+        :param compression: the gRPC compression algorithm, `gzip` or `deflate`. If None, only the tensors are
+            compressed.
+        :param threshold: the minimum number of bytes of a request, or of a tensor, for it to be compressed.
+        :param compress_tensors: whether to encode 8-bit image tensors as PNG.
+        """
+        if compression is not None and compression not in COMPRESSIONS:
+            raise ValueError(
+                f'Compression should be one of {", ".join(COMPRESSIONS)}, got `{compression}`.'
+            )
+        self.compression = compression
+        self.threshold = threshold
+        self.compress_tensors = compress_tensors
+
+    def apply(self, **payload) -> dict:
+        """
+        Compress a payload.
+
+        :param payload: the arguments of `jina.Client.post`.
+        :return: the arguments of `jina.Client.post` with the compressed inputs, and the gRPC compression algorithm if
+            the request is large enough.
+        """
+        inputs = payload.get('inputs')
+        if inputs is None:
+            return payload
+
+        if isinstance(inputs, DocumentArray):
+            if self.compress_tensors:
+                inputs = DocumentArray(
+                    compress_tensor(doc, self.threshold) for doc in inputs
+                )
+            large = sum(_approx_size(doc) for doc in inputs) >= self.threshold
+        elif hasattr(inputs, '__iter__'):
+            if self.compress_tensors:
+                inputs = (compress_tensor(doc, self.threshold) for doc in inputs)
+            # the size of streamed inputs is estimated from their first request, which is sent as it is read
+            inputs = iter(inputs)
+            request_size = payload.get('request_size', DEFAULT_REQUEST_SIZE)
+            first = list(
+                itertools.islice(inputs, request_size if request_size > 0 else None)
+            )
+            large = sum(_approx_size(doc) for doc in first) >= self.threshold
+            inputs = itertools.chain(first, inputs)
+        else:
+            large = True
+
+        payload = dict(payload, inputs=inputs)
+        if self.compression is not None and large:
+            payload['compression'] = COMPRESSIONS[self.compression]
+        return payload
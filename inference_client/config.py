@@ -1,6 +1,6 @@
 import os
 
-from pydantic import BaseSettings
+from pydantic import BaseSettings, Field
 
 # logging
 DEFAULT_LOGGING_LEVEL = 'INFO'
@@ -23,6 +23,9 @@ class Settings(BaseSettings):
 
     api_endpoint: str = DEFAULT_API_ENDPOINT
 
+    # profile every task call and log the reports, see `Model.profile`
+    profile: bool = Field(False, env='INFERENCE_CLIENT_PROFILE')
+
     class Config:
         env_file = os.environ.get('CLIENT_ENV_FILE', '.env')
 
@@ -0,0 +1,207 @@
+import io
+import itertools
+import json
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy
+from docarray import Document, DocumentArray
+
+from .tasks.helper import get_doc_fingerprint
+
+PERCEPTUAL_HASHES = ('ahash', 'phash')
+PERCEPTUAL_ENDPOINTS = ('/encode', '/caption', '/vqa')
+
+_HASH_SIZE = 8
+_PHASH_SIZE = 32
+
+
+def _dct_matrix(size: int) -> numpy.ndarray:
+    n = numpy.arange(size)
+    return numpy.cos(numpy.pi * (2 * n[None, :] + 1) * n[:, None] / (2 * size))
+
+
+_DCT = _dct_matrix(_PHASH_SIZE).astype(numpy.float32)
+
+
+def perceptual_hashes(images: numpy.ndarray, method: str = 'phash') -> numpy.ndarray:
+    """
+    Compute the perceptual hashes of a batch of grayscale images, which differ by few bits for images that look
+    alike, e.g. a resized or re-encoded copy.
+
+    `ahash` sets the bits of the 8x8 downscaled pixels brighter than the mean, `phash` the bits of the 8x8 lowest
+    frequencies of the 32x32 downscaled image above their median, which is more robust to brightness and contrast
+    changes.
+
+    :param images: the images of shape `(N, 8, 8)` for `ahash`, or `(N, 32, 32)` for `phash`.
+    :param method: `ahash` or `phash`.
+    :return: the 64-bit hashes as an `uint8` array of shape `(N, 8)`.
+    """
+    images = images.astype(numpy.float32).reshape(len(images), -1)
+    if method == 'phash':
+        images = images.reshape(-1, _PHASH_SIZE, _PHASH_SIZE)
+        frequencies = numpy.einsum('ij,njk,lk->nil', _DCT, images, _DCT)
+        values = frequencies[:, :_HASH_SIZE, :_HASH_SIZE].reshape(len(images), -1)
+        bits = values > numpy.median(values, axis=1, keepdims=True)
+    else:
+        bits = images > images.mean(axis=1, keepdims=True)
+    return numpy.packbits(bits, axis=1)
+
+
+def hamming_distances(hashes: numpy.ndarray, h: numpy.ndarray) -> numpy.ndarray:
+    """
+    Count the differing bits between hashes and a hash.
+
+    :param hashes: the hashes as an `uint8` array of shape `(N, 8)`.
+    :param h: the hash as an `uint8` array of shape `(8,)`.
+    :return: the distances of shape `(N,)`.
+    """
+    return numpy.unpackbits(hashes ^ h, axis=1).sum(axis=1)
+
+
+class Deduplicator:
+    """
+    Removes the exact duplicates from the inputs of a request, and scatters the result of each unique input back to
+    all its copies.
+
+    Documents are duplicates if their content, i.e. their text, blob, tensor, uri, tags, chunks and matches, is
+    equal, whatever their id.
+    """
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.sources: Dict[str, str] = {}
+        self._seen: Dict[str, str] = {}
+        self._unique = 0
+
+    @property
+    def duplicates(self) -> int:
+        """The number of inputs that were not sent, as they duplicate a previous one."""
+        return len(self.ids) - self._unique
+
+    def filter(self, docs: Iterable['Document']) -> Iterator['Document']:
+        """
+        Iterate over the first occurrence of each input. The inputs are consumed lazily.
+
+        :param docs: the inputs of the request.
+        :yield: the unique inputs.
+        """
+        for doc, source in self._sources(docs):
+            self.ids.append(doc.id)
+            if source is None:
+                self._unique += 1
+                yield doc
+            elif source != doc.id:
+                self.sources[doc.id] = source
+
+    def _sources(
+        self, docs: Iterable['Document']
+    ) -> Iterator[Tuple['Document', Optional[str]]]:
+        # yields each input with the id of the previous input it duplicates, if any
+        for doc in docs:
+            yield doc, self._exact_source(doc)
+
+    def _exact_source(self, doc: 'Document') -> Optional[str]:
+        key = get_doc_fingerprint(doc)
+        if (source := self._seen.get(key)) is None:
+            self._seen[key] = doc.id
+        return source
+
+    def scatter(self, result: 'DocumentArray') -> 'DocumentArray':
+        """
+        Expand the result of the unique inputs to all the inputs.
+
+        :param result: the result of the request sent with the unique inputs.
+        :return: the result of every input in input order, the duplicates get a copy of the result of their first
+            occurrence with their own id. The result is returned unchanged if there was no duplicate.
+        """
+        if result is None or not self.duplicates:
+            return result
+        by_id = {doc.id: doc for doc in result}
+        output = DocumentArray()
+        used = set()
+        for id_ in self.ids:
+            doc = by_id.get(self.sources.get(id_, id_))
+            if doc is None:
+                continue
+            if doc.id != id_ or id_ in used:
+                doc = Document(doc, copy=True)
+                doc.id = id_
+            used.add(id_)
+            output.append(doc)
+        return output
+
+
+def _load_gray(doc: 'Document', size: int) -> Optional[numpy.ndarray]:
+    from PIL import Image
+
+    if doc.chunks or doc.matches:
+        return None
+    try:
+        if doc.tensor is not None:
+            array = numpy.asarray(doc.tensor)
+            if array.ndim == 3 and array.shape[-1] == 1:
+                array = array[..., 0]
+            image = Image.fromarray(array.astype(numpy.uint8))
+        elif doc.blob:
+            image = Image.open(io.BytesIO(doc.blob))
+        else:
+            return None
+        return numpy.asarray(image.convert('L').resize((size, size), Image.BOX))
+    except Exception:
+        return None
+
+
+class PerceptualDeduplicator(Deduplicator):
+    """
+    Collapses near-duplicate images, e.g. resized or re-encoded copies, on top of the exact deduplication of
+    `Deduplicator`.
+
+    Images whose perceptual hashes differ by at most `threshold` bits are near-duplicates if the rest of their
+    documents, i.e. their text and tags such as a question, are equal. Only the first image of a group of
+    near-duplicates is sent, and its result is returned for every member. The documents that are not images are
+    deduplicated exactly.
+    """
+
+    def __init__(self, threshold: int = 4, method: str = 'phash', chunk_size: int = 64):
+        """
+        :param threshold: the maximum number of differing bits out of 64 between the hashes of near-duplicates.
+        :param method: the perceptual hash, `ahash` or `phash`.
+        :param chunk_size: the number of inputs hashed at once.
+        """
+        super().__init__()
+        if method not in PERCEPTUAL_HASHES:
+            raise ValueError(
+                f'Perceptual hash should be one of {", ".join(PERCEPTUAL_HASHES)}, got `{method}`.'
+            )
+        self.threshold = threshold
+        self.method = method
+        self.chunk_size = chunk_size
+        self._groups: Dict[str, Tuple[List[numpy.ndarray], List[str]]] = {}
+
+    def _sources(
+        self, docs: Iterable['Document']
+    ) -> Iterator[Tuple['Document', Optional[str]]]:
+        size = _PHASH_SIZE if self.method == 'phash' else _HASH_SIZE
+        it = iter(docs)
+        while chunk := list(itertools.islice(it, self.chunk_size)):
+            images = [_load_gray(doc, size) for doc in chunk]
+            loaded = [image for image in images if image is not None]
+            hashes = iter(
+                perceptual_hashes(numpy.stack(loaded), self.method) if loaded else []
+            )
+            for doc, image in zip(chunk, images):
+                if image is None:
+                    yield doc, self._exact_source(doc)
+                else:
+                    yield doc, self._near_source(doc, next(hashes))
+
+    def _near_source(self, doc: 'Document', h: numpy.ndarray) -> Optional[str]:
+        context = json.dumps([doc.text, doc.tags], sort_keys=True, default=str)
+        hashes, ids = self._groups.setdefault(context, ([], []))
+        if hashes:
+            distances = hamming_distances(numpy.stack(hashes), h)
+            if distances.min() <= self.threshold:
+                return ids[int(distances.argmin())]
+        hashes.append(h)
+        ids.append(doc.id)
+        return None
@@ -0,0 +1,125 @@
+from typing import Iterable, NamedTuple, Optional, Tuple, Union
+
+import numpy
+
+OUTPUT_DTYPES = ('float32', 'float16', 'int8')
+
+
+class QuantizedEmbeddings(NamedTuple):
+    """
+    Embeddings quantized to int8 with one scale factor per vector, such that `embedding ~= codes * scale`.
+    """
+
+    codes: numpy.ndarray
+    scales: numpy.ndarray
+
+    def dequantize(self) -> numpy.ndarray:
+        """
+        Restore float32 embeddings from the codes and scales.
+
+        :return: the approximated embeddings.
+        """
+        return self.codes.astype(numpy.float32) * numpy.expand_dims(self.scales, -1)
+
+
+def check_output_dtype(output_dtype: Optional[str]):
+    """
+    Check an output dtype of the embeddings.
+
+    :param output_dtype: the dtype, one of `OUTPUT_DTYPES` or None.
+    """
+    if output_dtype is not None and output_dtype not in OUTPUT_DTYPES:
+        raise ValueError(
+            f'Output dtype should be one of {", ".join(OUTPUT_DTYPES)}, got `{output_dtype}`.'
+        )
+
+
+def convert_embeddings(
+    embeddings: numpy.ndarray,
+    output_dtype: Optional[str] = None,
+    normalize: bool = False,
+):
+    """
+    Normalize and convert a single embedding or a matrix of embeddings to a compact dtype.
+
+    The conversion is vectorized over the whole matrix and done in place on a single copy, so the given embeddings
+    are left unchanged and no extra copy of a large result matrix is made besides the converted output.
+
+    :param embeddings: a single embedding, or a matrix with one embedding per row.
+    :param output_dtype: `float32`, `float16` or `int8`. If `int8`, the embeddings are quantized symmetrically with a
+        scale factor per vector. If None, the dtype is kept.
+    :param normalize: whether to scale the embeddings to unit L2 norm.
+    :return: the converted embeddings, or :class:`QuantizedEmbeddings` if `output_dtype` is `int8`.
+    """
+    check_output_dtype(output_dtype)
+    x = numpy.asarray(embeddings)
+    if output_dtype is None and not normalize:
+        return x
+
+    dtype = numpy.float32
+    if numpy.issubdtype(x.dtype, numpy.floating) and output_dtype is None:
+        dtype = x.dtype
+    # the embeddings of the caller, e.g. of a result shared with other calls, are converted on a copy of their own
+    x = x.astype(dtype, copy=normalize or output_dtype == 'int8')
+    single = x.ndim == 1
+    x = numpy.atleast_2d(x)
+
+    if normalize:
+        norms = numpy.linalg.norm(x, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        x /= norms
+
+    if output_dtype == 'int8':
+        scales = numpy.abs(x).max(axis=1, initial=0) / 127
+        scales[scales == 0] = 1
+        x /= scales[:, None]
+        numpy.rint(x, out=x)
+        codes = x.astype(numpy.int8)
+        scales = scales.astype(numpy.float32)
+        return QuantizedEmbeddings(
+            codes[0] if single else codes, scales[0] if single else scales
+        )
+
+    if output_dtype is not None:
+        x = x.astype(output_dtype, copy=False)
+    return x[0] if single else x
+
+
+def assemble_embeddings(
+    batches: Iterable[Tuple[numpy.ndarray, Union[numpy.ndarray, QuantizedEmbeddings]]],
+    total: Optional[int] = None,
+    out: Optional[Union[numpy.ndarray, QuantizedEmbeddings]] = None,
+):
+    """
+    Write batches of embeddings tagged with their input indices, e.g. the results of `encode_unordered`, into a
+    preallocated matrix, in input order. Each batch is written as soon as it arrives, so no batch waits for the ones
+    before it and none is kept besides the output.
+
+    :param batches: the batches, pairs of the input indices and the embeddings of a response.
+    :param total: the number of inputs, used to allocate the output on the first batch, with its dtype and dimension.
+    :param out: the output to write into, instead of allocating it, e.g. a memory-mapped array. Quantized embeddings
+        are written into a :class:`QuantizedEmbeddings` of codes and scales.
+    :return: the output.
+    """
+    if out is None and total is None:
+        raise ValueError('Please provide either the number of inputs or the output.')
+    for indices, embeddings in batches:
+        if out is None:
+            if isinstance(embeddings, QuantizedEmbeddings):
+                out = QuantizedEmbeddings(
+                    numpy.zeros((total,) + embeddings.codes.shape[1:], numpy.int8),
+                    numpy.ones(total, numpy.float32),
+                )
+            else:
+                out = numpy.zeros(
+                    (total,) + embeddings.shape[1:], dtype=embeddings.dtype
+                )
+        if isinstance(out, QuantizedEmbeddings):
+            out.codes[indices] = embeddings.codes
+            out.scales[indices] = embeddings.scales
+        else:
+            out[indices] = embeddings
+    if out is None:
+        # nothing was encoded, the dimension is unknown
+        return numpy.zeros((total, 0), dtype=numpy.float32)
+    return out
@@ -0,0 +1,162 @@
+import json
+import os
+from typing import Any, List, Optional, Sequence, Tuple, Union
+
+import numpy
+
+from .embeddings import QuantizedEmbeddings, convert_embeddings
+
+
+class EmbeddingIndex:
+    """
+    A local brute-force cosine similarity index over embeddings returned by `encode`.
+
+    Searching multiplies the queries with the candidate matrix chunk by chunk and keeps the top-k of each chunk with
+    `argpartition`, so repeated retrieval against a fixed set of candidates runs locally and only the queries need to
+    be encoded by the model.
+
+    Example:
+
+    ```python
+    index = EmbeddingIndex(model.encode(image=images), ids=images)
+    index.search(model.encode(text='a photo of a cat'), top_k=5)
+    ```
+    """
+
+    def __init__(
+        self,
+        embeddings: Union[numpy.ndarray, QuantizedEmbeddings],
+        ids: Optional[Sequence[Any]] = None,
+        chunk_size: int = 65536,
+    ):
+        """
+        Initializes the index. The embeddings are normalized to unit length, unless they are int8 quantized.
+
+        :param embeddings: a matrix with one embedding per row, as returned by `encode`. Quantized int8 embeddings are
+            searched without being dequantized.
+        :param ids: the identifiers returned for each row, e.g. the inputs passed to `encode`. Default: the row indices.
+        :param chunk_size: the number of rows multiplied with the queries at once, to bound the memory of the score
+            matrix.
+        """
+        if isinstance(embeddings, QuantizedEmbeddings):
+            self._embeddings = embeddings.codes
+            # the quantized vectors are normalized at search time through their scales
+            norms = numpy.linalg.norm(embeddings.dequantize(), axis=1)
+            norms[norms == 0] = 1
+            self._scales = (embeddings.scales / norms).astype(numpy.float32)
+        else:
+            self._embeddings = convert_embeddings(
+                embeddings, output_dtype='float32', normalize=True
+            )
+            self._scales = None
+        if self._embeddings.ndim != 2:
+            raise ValueError(
+                'Embeddings should be a matrix with one embedding per row.'
+            )
+        if ids is not None and len(ids) != len(self._embeddings):
+            raise ValueError('The number of ids should match the number of embeddings.')
+        self.ids = list(ids) if ids is not None else None
+        self.chunk_size = chunk_size
+
+    def __len__(self):
+        return len(self._embeddings)
+
+    def top_k(
+        self, queries: numpy.ndarray, top_k: int = 10
+    ) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Find the rows with the highest cosine similarity to each query.
+
+        :param queries: a single query embedding or a matrix with one query per row.
+        :param top_k: the number of rows returned per query.
+        :return: the similarity scores and the row indices, both of shape `(num_queries, top_k)` sorted by decreasing
+            score.
+        """
+        if top_k < 1:
+            raise ValueError(f'Top k should be at least 1, got `{top_k}`.')
+        queries = convert_embeddings(
+            numpy.atleast_2d(queries), output_dtype='float32', normalize=True
+        )
+        top_k = min(top_k, len(self))
+        best_scores = numpy.empty((len(queries), 0), dtype=numpy.float32)
+        best_indices = numpy.empty((len(queries), 0), dtype=numpy.int64)
+
+        for start in range(0, len(self), self.chunk_size):
+            chunk = self._embeddings[start : start + self.chunk_size]
+            scores = queries @ chunk.T.astype(numpy.float32, copy=False)
+            if self._scales is not None:
+                scores *= self._scales[start : start + self.chunk_size]
+            k = min(top_k, scores.shape[1])
+            candidates = numpy.argpartition(-scores, k - 1, axis=1)[:, :k]
+            scores = numpy.concatenate(
+                [best_scores, numpy.take_along_axis(scores, candidates, axis=1)],
+                axis=1,
+            )
+            indices = numpy.concatenate([best_indices, candidates + start], axis=1)
+            k = min(top_k, scores.shape[1])
+            keep = numpy.argpartition(-scores, k - 1, axis=1)[:, :k]
+            best_scores = numpy.take_along_axis(scores, keep, axis=1)
+            best_indices = numpy.take_along_axis(indices, keep, axis=1)
+
+        order = numpy.argsort(-best_scores, axis=1)
+        return (
+            numpy.take_along_axis(best_scores, order, axis=1),
+            numpy.take_along_axis(best_indices, order, axis=1),
+        )
+
+    def search(
+        self, query: numpy.ndarray, top_k: int = 10
+    ) -> Union[List[Tuple[Any, float]], List[List[Tuple[Any, float]]]]:
+        """
+        Find the candidates with the highest cosine similarity to the query.
+
+        :param query: a single query embedding or a matrix with one query per row.
+        :param top_k: the number of candidates returned per query.
+        :return: a list of `(id, score)` tuples sorted by decreasing score, or one such list per query if a matrix of
+            queries is given.
+        """
+        scores, indices = self.top_k(query, top_k=top_k)
+        results = [
+            [
+                (self.ids[i] if self.ids is not None else int(i), float(s))
+                for i, s in zip(row_indices, row_scores)
+            ]
+            for row_indices, row_scores in zip(indices, scores)
+        ]
+        return results[0] if numpy.ndim(query) == 1 else results
+
+    def save(self, path: str):
+        """
+        Save the index to a directory, from which it can be loaded memory-mapped. The ids must be JSON serializable.
+
+        :param path: the directory to write the index to.
+        """
+        os.makedirs(path, exist_ok=True)
+        numpy.save(os.path.join(path, 'embeddings.npy'), self._embeddings)
+        if self._scales is not None:
+            numpy.save(os.path.join(path, 'scales.npy'), self._scales)
+        with open(os.path.join(path, 'ids.json'), 'w') as f:
+            json.dump(self.ids, f)
+
+    @classmethod
+    def load(
+        cls, path: str, mmap: bool = True, chunk_size: int = 65536
+    ) -> 'EmbeddingIndex':
+        """
+        Load an index saved with :meth:`save`.
+
+        :param path: the directory the index was saved to.
+        :param mmap: whether to memory-map the embeddings instead of reading them into memory.
+        :param chunk_size: the number of rows multiplied with the queries at once.
+        :return: the index.
+        """
+        index = cls.__new__(cls)
+        index._embeddings = numpy.load(
+            os.path.join(path, 'embeddings.npy'), mmap_mode='r' if mmap else None
+        )
+        scales_path = os.path.join(path, 'scales.npy')
+        index._scales = numpy.load(scales_path) if os.path.exists(scales_path) else None
+        with open(os.path.join(path, 'ids.json')) as f:
+            index.ids = json.load(f)
+        index.chunk_size = chunk_size
+        return index
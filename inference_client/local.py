@@ -0,0 +1,108 @@
+import asyncio
+import inspect
+import itertools
+import threading
+from typing import TYPE_CHECKING, Iterable, Type, Union
+
+from docarray import Document, DocumentArray
+
+if TYPE_CHECKING:
+    from jina import Executor
+
+# the default request size of `jina.Client.post`
+DEFAULT_REQUEST_SIZE = 100
+# the endpoint of the functions decorated with `@requests` without `on`
+DEFAULT_ENDPOINT = '/default'
+
+
+def _batches(inputs: Iterable[Document], request_size: int):
+    it = iter(inputs)
+    size = request_size if request_size > 0 else None
+    while batch := list(itertools.islice(it, size)):
+        yield batch
+
+
+class LocalTransport:
+    """
+    Runs the requests of a model on an executor in the same process, instead of sending them to a Flow. The
+    documents are passed to the endpoint functions of the executor directly, without being serialized.
+
+    The input documents are copied before being processed, so that executors modifying them in place, e.g. dropping
+    the image content of the results, behave as they do behind a Flow.
+    """
+
+    def __init__(self, executor: Union['Executor', Type['Executor']]):
+        """
+        :param executor: the executor, or an executor class instantiated without arguments.
+        """
+        self.executor = executor() if isinstance(executor, type) else executor
+        # executors are not expected to be thread-safe, a Flow also runs their requests one at a time
+        self._lock = threading.Lock()
+
+    def _call(self, on: str, docs: DocumentArray, parameters: dict) -> DocumentArray:
+        requests = self.executor.requests
+        endpoint = on if on in requests else DEFAULT_ENDPOINT
+        if endpoint not in requests:
+            raise ValueError(
+                f'The executor `{type(self.executor).__name__}` has no `{on}` endpoint.'
+            )
+        # the endpoint method is called directly, as in the unit tests of executors
+        fn = getattr(requests[endpoint], 'fn', requests[endpoint])
+        method = getattr(self.executor, fn.__name__)
+
+        with self._lock:
+            result = method(docs=docs, parameters=parameters)
+            if inspect.isawaitable(result):
+                result = asyncio.run(result)
+            elif inspect.isgenerator(result) or inspect.isasyncgen(result):
+                raise ValueError(
+                    f'The streaming endpoint `{on}` cannot be run in-process.'
+                )
+        # like a Flow, a returned dict updates the parameters and leaves the documents modified in place
+        return result if isinstance(result, DocumentArray) else docs
+
+    def post(self, **payload):
+        """
+        Run the payload on the executor, in batches of `request_size` documents.
+
+        :param payload: the arguments of `jina.Client.post`.
+        :return: the results, or None if callbacks are given, in which case they are called with the response of each
+            batch.
+        """
+        from jina.types.request.data import DataRequest
+
+        on = payload.get('on', '/')
+        parameters = payload.get('parameters') or {}
+        inputs = payload.get('inputs')
+        on_done = payload.get('on_done')
+        on_error = payload.get('on_error')
+        on_always = payload.get('on_always')
+        streaming = on_done is not None or on_error is not None or on_always is not None
+
+        results = DocumentArray()
+        batches = _batches(
+            inputs if inputs is not None else [Document()],
+            payload.get('request_size', DEFAULT_REQUEST_SIZE),
+        )
+        for batch in batches:
+            docs = DocumentArray(Document(doc, copy=True) for doc in batch)
+            if not streaming:
+                results.extend(self._call(on, docs, dict(parameters)))
+                continue
+
+            response = DataRequest()
+            response.header.exec_endpoint = on
+            try:
+                response.data.docs = self._call(on, docs, dict(parameters))
+            except Exception as ex:
+                if on_error is None:
+                    raise
+                response.data.docs = docs
+                response.add_exception(ex, self.executor)
+                on_error(response)
+            else:
+                if on_done is not None:
+                    on_done(response)
+            if on_always is not None:
+                on_always(response)
+        return None if streaming else results
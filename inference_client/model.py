@@ -1,13 +1,48 @@
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Optional, Sequence
+
+from docarray import DocumentArray
 from jina import Client
 
+from .balancer import LoadBalancer
+from .batching import MicroBatcher
+from .cache import is_repeatable
+from .coalesce import SingleFlight
+from .compression import CompressionClients, Compressor
+from .config import settings
+from .dedup import (
+    PERCEPTUAL_ENDPOINTS,
+    PERCEPTUAL_HASHES,
+    Deduplicator,
+    PerceptualDeduplicator,
+)
+from .local import LocalTransport
+from .profiling import Profiler
+from .protocol import ProtocolSelector, adapt_payload, get_protocol
+from .replay import RecordingTransport, ReplayTransport
+from .splitting import post_within_budget
 from .tasks.caption import CaptionMixin
 from .tasks.encode import EncodeMixin
 from .tasks.generate import GenerationMixin
+from .tasks.helper import get_payload_fingerprint
 from .tasks.image_to_image import ImageToImageMixin
 from .tasks.rank import RankMixin
 from .tasks.text_to_image import TextToImageMixin
 from .tasks.upscale import UpscaleMixin
 from .tasks.vqa import VQAMixin
+from .tracing import count_docs, docs_size, inject_trace_context, set_attributes, span
+
+if TYPE_CHECKING:
+    from jina import Executor
+
+    from .cache import ImageCache, ResponseCache
+    from .throttle import RateLimiter
+
+
+def _record_ids(docs, ids: list):
+    for doc in docs:
+        ids.append(doc.id)
+        yield doc
 
 
 class Model(
@@ -24,8 +59,242 @@ class Model(
     The model to be used for inference.
     """
 
-    def __init__(self, model_name: str, token: str, host: str, **kwargs):
+    def __init__(
+        self,
+        model_name: str,
+        token: str,
+        host: str,
+        rate_limiter: Optional['RateLimiter'] = None,
+        coalesce: bool = False,
+        max_batch_size: Optional[int] = None,
+        max_batch_wait: float = 0.005,
+        endpoints: Optional[Sequence[str]] = None,
+        max_in_flight_per_replica: int = 2,
+        protocols: Optional[Dict[str, str]] = None,
+        compression: Optional[str] = None,
+        compression_threshold: int = 1024,
+        max_request_bytes: Optional[int] = None,
+        image_cache: Optional['ImageCache'] = None,
+        response_cache: Optional['ResponseCache'] = None,
+        deduplicate: bool = False,
+        near_duplicate_threshold: Optional[int] = None,
+        perceptual_hash: str = 'phash',
+        record: Optional[str] = None,
+        replay: Optional[str] = None,
+        replay_latency_scale: float = 1.0,
+        executor: Optional['Executor'] = None,
+        **kwargs,
+    ):
         self.model_name = model_name
         self.token = token
         self.host = host
-        self.client = Client(host=self.host)
+        # the protocol of a plain jina client, the other transports adapt the payload to their endpoints themselves
+        self._protocol = 'grpc'
+        if replay:
+            self.client = ReplayTransport(replay, latency_scale=replay_latency_scale)
+        elif executor is not None:
+            self.client = LocalTransport(executor)
+        elif endpoints:
+            self.client = LoadBalancer(
+                endpoints, max_in_flight_per_replica=max_in_flight_per_replica
+            )
+        elif protocols:
+            self.client = ProtocolSelector(dict(protocols))
+        else:
+            self._protocol = get_protocol(self.host)
+            self.client = (
+                CompressionClients(self.host)
+                if compression and self._protocol == 'grpc'
+                else Client(host=self.host)
+            )
+        # the requests of in-process and replayed models are not sent over the network, so they are not throttled
+        self.rate_limiter = (
+            rate_limiter if replay is None and executor is None else None
+        )
+        if record:
+            # the recorder throttles the requests it sends itself, once it has materialized their inputs
+            self.client = RecordingTransport(
+                self.client, record, rate_limiter=self.rate_limiter
+            )
+        self._compressor = (
+            Compressor(
+                # only gRPC supports compressed messages, the image tensors are compressed for every protocol
+                compression if self._protocol == 'grpc' else None,
+                threshold=compression_threshold,
+            )
+            # nothing is sent over the network to an in-process executor
+            if compression and executor is None
+            else None
+        )
+        self.max_request_bytes = max_request_bytes
+        self.image_cache = image_cache
+        self.response_cache = response_cache
+        self.deduplicate = deduplicate
+        if perceptual_hash not in PERCEPTUAL_HASHES:
+            raise ValueError(
+                f'Perceptual hash should be one of {", ".join(PERCEPTUAL_HASHES)}, got `{perceptual_hash}`.'
+            )
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self.perceptual_hash = perceptual_hash
+        self._single_flight = SingleFlight() if coalesce else None
+        self._micro_batcher = (
+            MicroBatcher(
+                self._send, max_batch_size=max_batch_size, max_wait=max_batch_wait
+            )
+            if max_batch_size
+            else None
+        )
+        self._profiler = Profiler(log=True) if settings.profile else None
+
+    @contextmanager
+    def profile(self, top: int = 10):
+        """
+        Profile the task calls made to the model within the context, from any thread, e.g.
+
+        ```python
+        with model.profile() as profiler:
+            model.caption(image='https://picsum.photos/200')
+        print(profiler.report())
+        ```
+
+        Set the `INFERENCE_CLIENT_PROFILE` environment variable to profile all the task calls and log their reports.
+
+        :param top: the number of hot spots and allocation sites reported per call.
+        :yield: the profiler, whose `calls` hold the profile of each call: its wall and CPU time, peak and retained
+            memory, the CPU time spent loading inputs, constructing documents, serializing them and unboxing results,
+            and the top functions and allocation sites.
+        """
+        previous = self._profiler
+        self._profiler = profiler = Profiler(top=top)
+        try:
+            yield profiler
+        finally:
+            self._profiler = previous
+
+    def _post(self, **payload):
+        """
+        Send the payload to the model. All task methods send their requests through here.
+
+        :param payload: the arguments of `jina.Client.post`.
+        :return: the result of `jina.Client.post`.
+        """
+        with span('send', endpoint=payload.get('on')) as current:
+            if not current.is_recording():
+                return self._fetch(**payload)
+
+            inputs = payload.get('inputs')
+            counts = [0, 0]
+            if isinstance(inputs, DocumentArray):
+                counts = [len(inputs), docs_size(inputs)]
+            elif inputs is not None:
+                payload['inputs'] = count_docs(inputs, counts)
+            payload['metadata'] = inject_trace_context(payload.get('metadata', ()))
+            result = self._fetch(**payload)
+            set_attributes(
+                current,
+                docs=counts[0],
+                request_bytes=counts[1],
+                response_docs=len(result) if result is not None else None,
+                response_bytes=docs_size(result) if result is not None else None,
+            )
+            return result
+
+    def _fetch(self, **payload):
+        for cache in (self.image_cache, self.response_cache):
+            if cache is not None and (
+                key := cache.key(self.model_name or self.host, payload)
+            ):
+                if (result := cache.get(key)) is None:
+                    result = self._deduplicate(**payload)
+                    if result is not None:
+                        cache.put(key, result)
+                return result
+        return self._deduplicate(**payload)
+
+    def _deduplicate(self, **payload):
+        inputs = payload.get('inputs')
+        streaming = any(payload.get(k) for k in ('on_done', 'on_error', 'on_always'))
+        if (
+            self.near_duplicate_threshold is not None
+            and payload.get('on') in PERCEPTUAL_ENDPOINTS
+        ):
+            deduplicator = PerceptualDeduplicator(
+                self.near_duplicate_threshold, method=self.perceptual_hash
+            )
+        elif self.deduplicate:
+            deduplicator = Deduplicator()
+        else:
+            deduplicator = None
+        if (
+            deduplicator is None
+            or streaming
+            # the copies of a sampled input are independent samples, not duplicates
+            or not is_repeatable(payload.get('on'), payload.get('parameters'))
+            or inputs is None
+            or (isinstance(inputs, DocumentArray) and len(inputs) < 2)
+        ):
+            return self._coalesce(**payload)
+
+        if isinstance(inputs, DocumentArray):
+            unique = DocumentArray(deduplicator.filter(inputs))
+            if not deduplicator.duplicates:
+                return self._coalesce(**payload)
+            payload.update(inputs=unique, total_docs=len(unique))
+        else:
+            payload.update(inputs=deduplicator.filter(inputs))
+        return deduplicator.scatter(self._coalesce(**payload))
+
+    def _coalesce(self, **payload):
+        streaming = any(payload.get(k) for k in ('on_done', 'on_error', 'on_always'))
+
+        if (
+            self._single_flight is not None
+            and not streaming
+            and (key := get_payload_fingerprint(payload)) is not None
+        ):
+            result, leader = self._single_flight.do(
+                key, lambda: self._submit(streaming, **payload)
+            )
+            # the callers that joined an in-flight call get their own copy to mutate
+            return result if leader else DocumentArray(result, copy=True)
+        return self._submit(streaming, **payload)
+
+    def _submit(self, streaming: bool, **payload):
+        inputs = payload.get('inputs')
+        if (
+            self._micro_batcher is not None
+            and not streaming
+            and isinstance(inputs, DocumentArray)
+            and len(inputs) == 1
+        ):
+            return self._micro_batcher.submit(**payload)
+        return self._send(**payload)
+
+    def _send(self, **payload):
+        if self._compressor is not None:
+            payload = self._compressor.apply(**payload)
+        if self.max_request_bytes:
+            return post_within_budget(self._transmit, self.max_request_bytes, **payload)
+        return self._transmit(**payload)
+
+    def _transmit(self, **payload):
+        # the gateway may never close the stream of concurrent calls that ask to keep the results in order, so the
+        # results are reordered here instead
+        inputs = payload.get('inputs')
+        if payload.pop('results_in_order', False) and inputs is not None:
+            ids = []
+            if isinstance(inputs, DocumentArray):
+                ids = inputs[:, 'id']
+            else:
+                payload['inputs'] = _record_ids(inputs, ids)
+            result = self._post_unordered(**payload)
+            return result[ids] if result is not None and ids else result
+        return self._post_unordered(**payload)
+
+    def _post_unordered(self, **payload):
+        payload = adapt_payload(self._protocol, payload)
+        if self.rate_limiter is not None and not isinstance(
+            self.client, RecordingTransport
+        ):
+            return self.rate_limiter.post(self.client, **payload)
+        return self.client.post(**payload)
@@ -0,0 +1,255 @@
+import cProfile
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, List, Optional, Tuple
+
+# client-side costs attributed in the reports, matched on the names of the profiled functions
+CATEGORIES: Tuple[Tuple[str, Callable[[str, str], bool]], ...] = (
+    (
+        'input loading',
+        lambda file, name: name
+        in ('iter_doc', 'load_plain_into_document', 'load_uri_to_blob')
+        or name.startswith('load_uri_to_'),
+    ),
+    (
+        'document construction',
+        lambda file, name: name == '__init__' and 'docarray' in file,
+    ),
+    (
+        'serialization',
+        lambda file, name: any(
+            s in name
+            for s in (
+                'to_protobuf',
+                'from_protobuf',
+                'SerializeToString',
+                'ParseFromString',
+            )
+        ),
+    ),
+    ('result unboxing', lambda file, name: name.startswith('_unbox_')),
+)
+
+_tracemalloc_lock = threading.Lock()
+# only one cProfile profiler can be active at a time since Python 3.12, the calls of other threads are not profiled
+_cprofile_lock = threading.Lock()
+_tracemalloc_users = 0
+
+
+def _start_tracemalloc():
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_users = 1
+        elif _tracemalloc_users:
+            _tracemalloc_users += 1
+
+
+def _stop_tracemalloc():
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users:
+            _tracemalloc_users -= 1
+            if _tracemalloc_users == 0:
+                tracemalloc.stop()
+
+
+def _category(func: Tuple[str, int, str]) -> Optional[str]:
+    file, _, name = func
+    for category, matches in CATEGORIES:
+        if matches(file, name):
+            return category
+    return None
+
+
+def _function_name(func: Tuple[str, int, str]) -> str:
+    file, line, name = func
+    return name if file == '~' else f'{name} ({file}:{line})'
+
+
+def _categorize(stats: dict) -> Dict[str, float]:
+    seconds = {category: 0.0 for category, _ in CATEGORIES}
+    for func, (_, _, _, _, callers) in stats.items():
+        category = _category(func)
+        if category is None:
+            continue
+        # only the time spent under a function called from outside of its category is counted, e.g. the
+        # serialization of a document array and not again the one of each of its documents
+        for caller, (_, _, _, cumulative) in callers.items():
+            if _category(caller) != category:
+                seconds[category] += cumulative
+    return seconds
+
+
+class Profiler:
+    """
+    Profiles task calls with `cProfile` and `tracemalloc`, and attributes their client-side CPU time to the loading
+    of the inputs, the construction of documents, their serialization and the unboxing of the results.
+
+    Only the thread making the call is profiled, and the CPU time of only one call at a time is profiled with
+    `cProfile`: a call made while a call of another thread is profiled only gets its times and memory, and
+    `cpu_profiled` False. The peak memory is the one of the whole process during the call, so it is only attributable
+    to the call if no other call runs concurrently.
+    """
+
+    def __init__(self, top: int = 10, log: bool = False):
+        """
+        :param top: the number of hot spots and allocation sites reported per call.
+        :param log: whether the report of each call is logged as soon as the call finishes.
+        """
+        self.top = top
+        self.log = log
+        self.calls: List[dict] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def call(self, task: str):
+        """
+        Profile a task call. Task calls made while profiling another one in the same thread are part of it.
+
+        :param task: the name of the task.
+        :yield: nothing.
+        """
+        if getattr(self._local, 'active', False):
+            yield
+            return
+        self._local.active = True
+        _start_tracemalloc()
+        if hasattr(tracemalloc, 'reset_peak'):
+            # before Python 3.9, the peak is the one since tracing started
+            tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        memory, _ = tracemalloc.get_traced_memory()
+        profile = cProfile.Profile() if _cprofile_lock.acquire(blocking=False) else None
+        wall, cpu = time.perf_counter(), time.thread_time()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+                _cprofile_lock.release()
+            wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+            current, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot()
+            _stop_tracemalloc()
+            self._local.active = False
+            self._record(
+                task, wall, cpu, peak - memory, current - memory, profile, before, after
+            )
+
+    def _record(
+        self,
+        task: str,
+        wall: float,
+        cpu: float,
+        peak: int,
+        allocated: int,
+        profile: Optional[cProfile.Profile],
+        before: tracemalloc.Snapshot,
+        after: tracemalloc.Snapshot,
+    ):
+        stats = pstats.Stats(profile).stats if profile is not None else {}
+        hot_spots = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)
+        call = dict(
+            task=task,
+            wall_time=wall,
+            cpu_time=cpu,
+            peak_memory=peak,
+            allocated_memory=allocated,
+            cpu_profiled=profile is not None,
+            categories=_categorize(stats),
+            hot_spots=[
+                dict(
+                    function=_function_name(func),
+                    calls=calls,
+                    own_time=own,
+                    cumulative_time=cumulative,
+                )
+                for func, (_, calls, own, cumulative, _) in hot_spots[: self.top]
+            ],
+        )
+        # the allocations of the profiler itself are left out
+        filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+            tracemalloc.Filter(False, pstats.__file__),
+        ]
+        diff = after.filter_traces(filters).compare_to(
+            before.filter_traces(filters), 'lineno'
+        )
+        call['allocations'] = [
+            dict(
+                location=f'{stat.traceback[0].filename}:{stat.traceback[0].lineno}',
+                size=stat.size_diff,
+                count=stat.count_diff,
+            )
+            for stat in diff[: self.top]
+            if stat.size_diff > 0
+        ]
+        with self._lock:
+            self.calls.append(call)
+        if self.log:
+            from .logging import logger
+
+            logger.info(format_call(call))
+
+    def report(self) -> str:
+        """
+        Format the profiles of all the calls.
+
+        :return: the report.
+        """
+        with self._lock:
+            calls = list(self.calls)
+        return '\n\n'.join(format_call(call) for call in calls)
+
+
+def format_call(call: dict) -> str:
+    """
+    Format the profile of a call.
+
+    :param call: the profile, as recorded in `Profiler.calls`.
+    :return: the report of the call.
+    """
+    lines = [
+        f'{call["task"]}: {call["wall_time"] * 1000:.1f} ms wall, {call["cpu_time"] * 1000:.1f} ms CPU, '
+        f'{call["peak_memory"] / 1e6:.1f} MB peak, {call["allocated_memory"] / 1e6:.1f} MB retained'
+    ]
+    if not call.get('cpu_profiled', True):
+        lines.append('  no CPU profile, a call of another thread was being profiled')
+    lines += [
+        f'  {category:<24}{seconds * 1000:>10.1f} ms'
+        for category, seconds in call['categories'].items()
+    ]
+    lines.append(f'  {"own ms":>10}{"cum ms":>10}{"calls":>8}  function')
+    lines += [
+        f'  {s["own_time"] * 1000:>10.1f}{s["cumulative_time"] * 1000:>10.1f}{s["calls"]:>8}  {s["function"]}'
+        for s in call['hot_spots']
+    ]
+    if call.get('allocations'):
+        lines.append(f'  {"kB":>10}{"blocks":>10}  allocated at')
+        lines += [
+            f'  {a["size"] / 1000:>10.1f}{a["count"]:>10}  {a["location"]}'
+            for a in call['allocations']
+        ]
+    return '\n'.join(lines)
+
+
+def profile_call(model, task: str):
+    """
+    Profile a task call of a model if it is being profiled, see `Model.profile`.
+
+    :param model: the model.
+    :param task: the name of the task.
+    :return: a context manager around the call.
+    """
+    profiler = getattr(model, '_profiler', None)
+    return profiler.call(task) if profiler is not None else nullcontext()
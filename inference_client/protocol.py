@@ -0,0 +1,160 @@
+import statistics
+import threading
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from jina import Client
+
+from .compression import CompressionClients
+
+PROTOCOLS = ('grpc', 'http', 'websocket')
+# the URL schemes of the endpoints jina connects to with HTTP and WebSocket, the others use gRPC
+SCHEMES = {
+    'http': 'http',
+    'https': 'http',
+    'websocket': 'websocket',
+    'ws': 'websocket',
+    'wss': 'websocket',
+}
+
+
+def get_protocol(host: Optional[str]) -> str:
+    """
+    Get the protocol `jina.Client` connects to an endpoint with.
+
+    :param host: the endpoint, e.g. `grpcs://...` or `https://...`.
+    :return: one of `grpc`, `http` and `websocket`.
+    """
+    return SCHEMES.get(urlparse(host or '').scheme, 'grpc')
+
+
+def adapt_payload(protocol: str, payload: dict) -> dict:
+    """
+    Adapt the arguments of `jina.Client.post` to a protocol. HTTP and WebSocket clients send the authorization as
+    headers instead of gRPC metadata, and do not compress messages.
+
+    :param protocol: the protocol the payload is sent with.
+    :param payload: the arguments of `jina.Client.post`, updated in place.
+    :return: the payload.
+    """
+    if protocol != 'grpc':
+        if 'metadata' in payload:
+            payload['headers'] = {
+                k: v for k, v in payload.pop('metadata') if v is not None
+            }
+        payload.pop('compression', None)
+    return payload
+
+
+class ProtocolSelector:
+    """
+    Picks the fastest of the gRPC, HTTP and WebSocket endpoints of a model, and falls back to the others if it
+    becomes unreachable.
+
+    The endpoints are probed with a dry run on the first request, or explicitly with :meth:`probe`. The protocol
+    selector has the same `post` interface as `jina.Client`, so it can be used in its place.
+    """
+
+    def __init__(self, endpoints: Dict[str, str], probes: int = 3):
+        """
+        Initializes the protocol selector.
+
+        :param endpoints: the endpoint of the model for each protocol, e.g. the `endpoints` of the model spec. Other
+            keys are ignored.
+        :param probes: the number of dry runs sent to each endpoint, the median of their latencies is kept.
+        """
+        self.endpoints = {p: endpoints[p] for p in PROTOCOLS if endpoints.get(p)}
+        if not self.endpoints:
+            raise ValueError(
+                f'Please provide an endpoint for at least one of {", ".join(PROTOCOLS)}.'
+            )
+        self.probes = probes
+        self.timings: Optional[Dict[str, Optional[float]]] = None
+        self.fallbacks = 0
+        self._order: List[str] = []
+        self._clients: Dict[str, Client] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def protocol(self) -> str:
+        """
+        The protocol requests are currently sent with, probing the endpoints if they were not yet.
+
+        :return: the name of the protocol.
+        """
+        if self.timings is None:
+            self.probe()
+        return self._order[0]
+
+    def _client(self, protocol: str):
+        if protocol not in self._clients:
+            self._clients[protocol] = (
+                CompressionClients(self.endpoints[protocol])
+                if protocol == 'grpc'
+                else Client(host=self.endpoints[protocol])
+            )
+        return self._clients[protocol]
+
+    def _measure(self, protocol: str) -> Optional[float]:
+        client = self._client(protocol)
+        latencies = []
+        for _ in range(self.probes):
+            start = time.perf_counter()
+            try:
+                ready = client.is_flow_ready()
+            except Exception:
+                ready = False
+            if not ready:
+                return None
+            latencies.append(time.perf_counter() - start)
+        return statistics.median(latencies)
+
+    def probe(self) -> Dict[str, Optional[float]]:
+        """
+        Measure the latency of a dry run on each endpoint and order the protocols by it.
+
+        :return: the median dry run latency in seconds of each protocol, or None if its endpoint is unreachable.
+        """
+        with self._lock:
+            timings = {p: self._measure(p) for p in self.endpoints}
+            # unreachable endpoints go last but stay available as a fallback
+            self._order = sorted(
+                self.endpoints,
+                key=lambda p: (timings[p] is None, timings[p] or 0.0),
+            )
+            self.timings = timings
+        return timings
+
+    def post(self, **payload):
+        """
+        Send the payload with the fastest protocol, falling back to the next one if its endpoint is unreachable.
+        Inputs given as a one-shot iterator, e.g. a generator, are not sent again after a failure.
+
+        :param payload: the arguments of `jina.Client.post`.
+        :return: the result of `jina.Client.post`.
+        """
+        if self.timings is None:
+            self.probe()
+
+        inputs = payload.get('inputs')
+        resendable = inputs is None or (
+            hasattr(inputs, '__iter__') and iter(inputs) is not inputs
+        )
+
+        error = None
+        for protocol in list(self._order):
+            try:
+                return self._post(protocol, **payload)
+            except ConnectionError as e:
+                if not resendable:
+                    raise
+                error = e
+                with self._lock:
+                    if self._order[0] == protocol:
+                        self._order.append(self._order.pop(0))
+                        self.fallbacks += 1
+        raise error
+
+    def _post(self, protocol: str, **payload):
+        return self._client(protocol).post(**adapt_payload(protocol, payload))
@@ -0,0 +1,226 @@
+import itertools
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from docarray import DocumentArray
+
+from .tasks.helper import get_payload_fingerprint
+
+if TYPE_CHECKING:
+    from .throttle import RateLimiter
+
+INDEX_FILE = 'index.jsonl'
+# the default request size of `jina.Client.post`
+DEFAULT_REQUEST_SIZE = 100
+
+
+def _num_requests(num_docs: int, request_size: int) -> int:
+    if request_size <= 0:
+        return 1
+    return max(1, math.ceil(num_docs / request_size))
+
+
+class RecordingTransport:
+    """
+    Wraps the client of a model and records every request sent through it, i.e. the fingerprint of the payload, the
+    result in input order and the latency, to a directory that a `ReplayTransport` answers the same requests from.
+
+    The inputs of each request are materialized into a `DocumentArray` before being sent, in order to fingerprint them.
+    """
+
+    def __init__(self, client, path: str, rate_limiter: Optional['RateLimiter'] = None):
+        """
+        :param client: the client sending the requests, i.e. anything with the `post` method of `jina.Client`.
+        :param path: the directory of the recording, created if it does not exist. Requests are appended to an
+            existing recording.
+        :param rate_limiter: an optional rate limiter the requests are sent through.
+        """
+        self.client = client
+        self.path = path
+        self.rate_limiter = rate_limiter
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def post(self, **payload):
+        """
+        Send the payload through the client and record the request.
+
+        :param payload: the arguments of `jina.Client.post`.
+        :return: the result of `jina.Client.post`.
+        """
+        inputs = payload.get('inputs')
+        if inputs is None:
+            return self._send(**payload)
+        if not isinstance(inputs, DocumentArray):
+            inputs = payload['inputs'] = DocumentArray(inputs)
+        key = get_payload_fingerprint(payload)
+
+        callbacks = {
+            name: payload.pop(name, None)
+            for name in ('on_done', 'on_error', 'on_always')
+        }
+        streaming = any(callbacks.values())
+        responses = DocumentArray()
+        failed = False
+
+        if streaming:
+
+            def _on_done(response):
+                responses.extend(response.docs)
+                if callbacks['on_done']:
+                    callbacks['on_done'](response)
+
+            def _on_error(response, *args):
+                nonlocal failed
+                failed = True
+                if callbacks['on_error']:
+                    callbacks['on_error'](response, *args)
+
+            payload.update(
+                on_done=_on_done, on_error=_on_error, on_always=callbacks['on_always']
+            )
+
+        start = time.perf_counter()
+        result = self._send(**payload)
+        latency = time.perf_counter() - start
+
+        if not streaming:
+            responses = result
+        if not failed and responses is not None:
+            self._write(key, payload, inputs, responses, latency)
+        return result
+
+    def _send(self, **payload):
+        if self.rate_limiter is not None:
+            return self.rate_limiter.post(self.client, **payload)
+        return self.client.post(**payload)
+
+    def _write(
+        self,
+        key: str,
+        payload: dict,
+        inputs: DocumentArray,
+        responses: DocumentArray,
+        latency: float,
+    ):
+        ids = inputs[:, 'id']
+        if len(responses) == len(ids) and all(i in responses for i in ids):
+            responses = responses[ids]
+        data = responses.to_bytes(protocol='protobuf', compress=None)
+        # written to a temporary file first so that a concurrent replay never reads a partial entry
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, os.path.join(self.path, f'{key}.da'))
+
+        entry = dict(
+            key=key,
+            on=payload.get('on', ''),
+            docs=len(inputs),
+            requests=_num_requests(
+                len(inputs), payload.get('request_size', DEFAULT_REQUEST_SIZE)
+            ),
+            latency=latency,
+        )
+        with self._lock, open(os.path.join(self.path, INDEX_FILE), 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+
+
+class ReplayTransport:
+    """
+    Answers requests from a recording made by a `RecordingTransport`, without any server. Each request is delayed by
+    its recorded latency, so that the client-side overhead, batching and concurrency can be benchmarked offline. The
+    latencies of a request recorded several times are replayed in turn.
+
+    Requests are matched by the fingerprint of their endpoint, parameters and input documents, the document ids are
+    ignored and the replayed results take the ids of the inputs.
+    """
+
+    def __init__(self, path: str, latency_scale: float = 1.0):
+        """
+        :param path: the directory of the recording.
+        :param latency_scale: the factor applied to the recorded latencies, e.g. `0` to replay without any delay or
+            `2` to simulate a server twice as slow.
+        """
+        if latency_scale < 0:
+            raise ValueError('Latency scale should be a non-negative number.')
+        index = os.path.join(path, INDEX_FILE)
+        if not os.path.isfile(index):
+            raise ValueError(f'No recording found in `{path}`.')
+        self.path = path
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+
+        entries: Dict[str, List[dict]] = {}
+        with open(index) as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    entries.setdefault(entry['key'], []).append(entry)
+        self._entries = {key: itertools.cycle(e) for key, e in entries.items()}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _next_entry(self, key: Optional[str]) -> Optional[dict]:
+        with self._lock:
+            entries = self._entries.get(key)
+            return next(entries) if entries is not None else None
+
+    def post(self, **payload):
+        """
+        Replay the recorded result of the payload after its recorded latency, scaled by `latency_scale`.
+
+        :param payload: the arguments of `jina.Client.post`.
+        :return: the recorded result, or None if callbacks are given, in which case they are called with one response
+            per request of `request_size` documents.
+        """
+        inputs = payload.get('inputs')
+        if inputs is None:
+            raise ValueError('Only requests with inputs can be replayed.')
+        if not isinstance(inputs, DocumentArray):
+            inputs = payload['inputs'] = DocumentArray(inputs)
+        entry = self._next_entry(get_payload_fingerprint(payload))
+        if entry is None:
+            raise ValueError(
+                f'No recorded response for a request to `{payload.get("on", "")}` with {len(inputs)} documents '
+                f'in `{self.path}`.'
+            )
+
+        with open(os.path.join(self.path, f'{entry["key"]}.da'), 'rb') as f:
+            result = DocumentArray.from_bytes(
+                f.read(), protocol='protobuf', compress=None
+            )
+        if len(result) == len(inputs):
+            docs = list(result)
+            for doc, input_doc in zip(docs, inputs):
+                doc.id = input_doc.id
+            # rebuilt rather than modified in place, as the id index of the array is not updated
+            result = DocumentArray(docs)
+
+        latency = entry['latency'] * self.latency_scale
+        on_done = payload.get('on_done')
+        on_always = payload.get('on_always')
+        if on_done is None and on_always is None and payload.get('on_error') is None:
+            time.sleep(latency)
+            return result
+
+        from jina.types.request.data import DataRequest
+
+        request_size = payload.get('request_size', DEFAULT_REQUEST_SIZE)
+        num_requests = _num_requests(len(result), request_size)
+        size = request_size if request_size > 0 else len(result)
+        for i in range(num_requests):
+            time.sleep(latency / num_requests)
+            response = DataRequest()
+            response.header.exec_endpoint = payload.get('on', '')
+            response.data.docs = result[i * size : (i + 1) * size]
+            if on_done:
+                on_done(response)
+            if on_always:
+                on_always(response)
@@ -0,0 +1,113 @@
+from collections import deque
+from typing import Callable, Deque, Iterable, Iterator, List, Tuple
+
+from docarray import Document, DocumentArray
+
+from .compression import _approx_size
+
+_SizedDoc = Tuple['Document', int]
+
+
+def pack_requests(
+    docs: Iterable[_SizedDoc], request_size: int, max_bytes: int
+) -> Iterator[List['Document']]:
+    """
+    Pack documents into consecutive requests of at most `request_size` documents and `max_bytes` bytes. Oversized
+    batches are split, and their remainders merged with the documents that follow. A document larger than the budget
+    is sent alone, as documents cannot be split.
+
+    :param docs: the documents with their size.
+    :param request_size: the maximum number of documents of a request, unlimited if not positive.
+    :param max_bytes: the byte budget of a request.
+    :yield: the documents of each request.
+    """
+    current, size = [], 0
+    for doc, doc_size in docs:
+        if current and (
+            size + doc_size > max_bytes or 0 < request_size <= len(current)
+        ):
+            yield current
+            current, size = [], 0
+        current.append(doc)
+        size += doc_size
+    if current:
+        yield current
+
+
+class _Packer:
+    # looks ahead at the documents of the next request to know how many of them fit the budget
+    def __init__(self, inputs: Iterable['Document'], request_size: int, max_bytes: int):
+        self._inputs = iter(inputs)
+        self._request_size = request_size
+        self._max_bytes = max_bytes
+        self._buffer: Deque[_SizedDoc] = deque()
+        self._exhausted = False
+
+    def __bool__(self):
+        self._fill()
+        return bool(self._buffer)
+
+    def _fill(self):
+        while not self._exhausted and (
+            self._request_size <= 0 or len(self._buffer) < self._request_size
+        ):
+            doc = next(self._inputs, None)
+            if doc is None:
+                self._exhausted = True
+            else:
+                # the contents are measured instead of serializing every document once more
+                self._buffer.append((doc, _approx_size(doc)))
+
+    def next_size(self) -> int:
+        self._fill()
+        request = next(
+            pack_requests(self._buffer, self._request_size, self._max_bytes), []
+        )
+        return len(request)
+
+    def run(self, size: int) -> Iterator['Document']:
+        # streams the requests of `size` documents, up to the first one of another size, except a last request
+        # smaller than the others, which jina sends as such
+        while self:
+            next_size = self.next_size()
+            last = self._exhausted and next_size == len(self._buffer)
+            if next_size != size and not (last and next_size < size):
+                return
+            for _ in range(next_size):
+                yield self._buffer.popleft()[0]
+
+
+def post_within_budget(send: Callable[..., 'DocumentArray'], max_bytes: int, **payload):
+    """
+    Send a payload in requests of at most `max_bytes` document bytes.
+
+    The documents are packed into requests of at most `request_size` documents that fit the budget, see
+    :func:`pack_requests`. As jina sends the requests of a call with the same number of documents, each run of
+    consecutive requests of the same size is streamed in a single call of `send`, so that inputs of similar sizes,
+    e.g. large images, keep the concurrency of `prefetch`. The results of the calls are concatenated in the order of
+    the calls, each of them ordered as `send` returns it.
+
+    The size of a document is estimated from its text, blob, tensor, embedding and uri, and those of its chunks and
+    matches, so the budget should leave some room below a hard limit such as the gRPC maximum message size.
+
+    :param send: the function sending a payload, it takes the arguments of `jina.Client.post`.
+    :param max_bytes: the byte budget of a request.
+    :param payload: the arguments of `jina.Client.post`.
+    :return: the resulting documents, or None if callbacks are given.
+    """
+    inputs = payload.pop('inputs', None)
+    if inputs is None:
+        return send(**payload)
+    request_size = payload.pop('request_size', 1)
+    payload.pop('total_docs', None)
+    streaming = any(payload.get(k) for k in ('on_done', 'on_error', 'on_always'))
+
+    packer = _Packer(inputs, request_size, max_bytes)
+    results = DocumentArray()
+    while packer:
+        size = packer.next_size()
+        result = send(inputs=packer.run(size), request_size=size, **payload)
+        if result is not None:
+            results.extend(result)
+
+    return None if streaming else results
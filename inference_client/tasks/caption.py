@@ -1,10 +1,17 @@
-from typing import TYPE_CHECKING, Iterable, Optional, Union, overload
+from concurrent.futures import Executor
+from typing import TYPE_CHECKING, Callable, Iterable, List, Optional, Union, overload
 
 import numpy
 from docarray import Document, DocumentArray
 from jina import Client
 
-from .helper import get_base_payload, iter_doc, load_plain_into_document
+from ..tracing import trace
+from .helper import (
+    get_base_payload,
+    iter_doc,
+    load_plain_into_document,
+    post_batches,
+)
 
 if TYPE_CHECKING:
     from docarray.typing import ArrayType
@@ -17,6 +24,7 @@ class CaptionMixin:
 
     token: str
     client: Client
+    _post: Callable
 
     @overload
     def caption(self, *, image: Union[str, bytes, 'ArrayType'], **kwargs):
@@ -29,11 +37,22 @@ class CaptionMixin:
         ...
 
     @overload
-    def caption(self, *, docs: Union[Iterable['Document'], 'DocumentArray'], **kwargs):
+    def caption(
+        self,
+        *,
+        docs: Union[Iterable['Document'], 'DocumentArray'],
+        on_captions: Optional[Callable[[numpy.ndarray, List[str]], None]] = None,
+        callback_executor: Optional[Executor] = None,
+        **kwargs,
+    ):
         """
         caption documents
 
         :param docs: the documents to caption
+        :param on_captions: the callback function executed as soon as each response arrives, with the positions of its
+            documents as an int64 array and their captions. Nothing is returned when it is set.
+        :param callback_executor: the executor running `on_captions`, so that a slow callback does not hold back the
+            responses. By default, the callbacks run one at a time in a thread of their own.
         :param kwargs: additional arguments to pass to the model
         """
         ...
@@ -44,6 +63,8 @@ class CaptionMixin:
         *,
         docs: Optional[Union[Iterable['Document'], 'DocumentArray']] = None,
         image: Optional[Union[str, bytes, 'ArrayType']] = None,
+        on_captions: Optional[Callable[[numpy.ndarray, List[str]], None]] = None,
+        callback_executor: Optional[Executor] = None,
         **kwargs,
     ):
         """
@@ -51,10 +72,15 @@ class CaptionMixin:
 
         :param docs: The documents to caption. Default: None.
         :param image: The image to caption, can be a `ndarray`, 'bytes' or uri of the image. Default: None.
+        :param on_captions: the callback function executed as soon as each response arrives, with the positions of its
+            documents as an int64 array and their captions. Nothing is returned when it is set.
+        :param callback_executor: the executor running `on_captions`, so that a slow callback does not hold back the
+            responses. By default, the callbacks run one at a time in a thread of their own.
         :param kwargs: Additional arguments to pass to the model.
         """
         ...
 
+    @trace('task')
     def caption(self, **kwargs):
         """
         Caption the documents using the model.
@@ -62,13 +88,24 @@ class CaptionMixin:
         :param kwargs: additional arguments to pass to the model.
         :return: captioned content.
         """
+        on_captions = kwargs.pop('on_captions', None)
+        callback_executor = kwargs.pop('callback_executor', None)
         payload, content_type = self._get_caption_payload(**kwargs)
-        result = self.client.post(**payload)
+        if on_captions is not None:
+            return post_batches(
+                self._post,
+                payload,
+                on_captions,
+                lambda docs: [doc.tags['response'] for doc in docs],
+                executor=callback_executor,
+            )
+        result = self._post(**payload)
         return self._unbox_caption_result(
             result=result,
             content_type=content_type,
         )
 
+    @trace('build_payload')
     def _get_caption_payload(self, **kwargs):
         payload = get_base_payload('/caption', self.token, **kwargs)
 
@@ -101,6 +138,7 @@ class CaptionMixin:
 
         return payload, content_type
 
+    @trace('unbox')
     def _unbox_caption_result(
         self,
         result: 'DocumentArray' = None,
@@ -0,0 +1,87 @@
+import re
+from typing import Iterable, List, Tuple
+
+import numpy
+
+POOLINGS = ('mean', 'max', 'weighted')
+
+_WORD = re.compile(r'\S+')
+
+
+def split_text(text: str, chunk_size: int, overlap: int = 0) -> List[Tuple[str, int]]:
+    """
+    Split a text into overlapping windows of words. The windows are slices of the text, so its whitespace is kept.
+
+    :param text: the text to split.
+    :param chunk_size: the maximum number of words of a window.
+    :param overlap: the number of words shared by consecutive windows.
+    :return: the windows with their number of words. A text of at most `chunk_size` words is a single window.
+    """
+    if chunk_size <= 0:
+        raise ValueError('Chunk size should be positive.')
+    if overlap < 0 or overlap >= chunk_size:
+        raise ValueError('Chunk overlap should be between 0 and the chunk size.')
+    spans = [m.span() for m in _WORD.finditer(text)]
+    if len(spans) <= chunk_size:
+        return [(text, len(spans))]
+    step = chunk_size - overlap
+    windows = []
+    for start in range(0, len(spans) - overlap, step):
+        end = min(start + chunk_size, len(spans))
+        windows.append((text[spans[start][0] : spans[end - 1][1]], end - start))
+        if end == len(spans):
+            break
+    return windows
+
+
+def chunk_texts(
+    texts: Iterable[str], chunk_size: int, overlap: int = 0
+) -> Tuple[List[str], numpy.ndarray, numpy.ndarray]:
+    """
+    Split texts into overlapping windows of words, see `split_text`.
+
+    :param texts: the texts to split.
+    :param chunk_size: the maximum number of words of a window.
+    :param overlap: the number of words shared by consecutive windows.
+    :return: the windows of all the texts in order, the index of the first window of each text, and the number of
+        words of each window.
+    """
+    windows, offsets, weights = [], [], []
+    for text in texts:
+        offsets.append(len(windows))
+        for window, num_words in split_text(text, chunk_size, overlap):
+            windows.append(window)
+            weights.append(num_words)
+    return windows, numpy.asarray(offsets, dtype=numpy.intp), numpy.asarray(weights)
+
+
+def pool_segments(
+    embeddings: numpy.ndarray,
+    offsets: numpy.ndarray,
+    weights: numpy.ndarray,
+    pooling: str = 'mean',
+) -> numpy.ndarray:
+    """
+    Pool the embeddings of the windows of each text into one embedding, with segment reductions over the
+    consecutive rows of each text.
+
+    :param embeddings: the embeddings of the windows, one per row.
+    :param offsets: the index of the first window of each text, every text has at least one window.
+    :param weights: the number of words of each window.
+    :param pooling: `mean`, `max`, or `weighted` for the mean weighted by the number of words of the windows.
+    :return: one embedding per text.
+    """
+    if pooling not in POOLINGS:
+        raise ValueError(
+            f'Pooling should be one of {", ".join(POOLINGS)}, got `{pooling}`.'
+        )
+    embeddings = numpy.asarray(embeddings, dtype=numpy.float32)
+    if pooling == 'max':
+        return numpy.maximum.reduceat(embeddings, offsets, axis=0)
+    if pooling == 'mean':
+        weights = numpy.ones(len(embeddings), dtype=numpy.float32)
+    else:
+        # a window without words, i.e. an empty text, still counts
+        weights = numpy.maximum(weights, 1).astype(numpy.float32)
+    sums = numpy.add.reduceat(embeddings * weights[:, None], offsets, axis=0)
+    return sums / numpy.add.reduceat(weights, offsets)[:, None]
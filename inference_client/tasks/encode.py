@@ -1,10 +1,34 @@
-from typing import TYPE_CHECKING, Iterable, Optional, Union, overload
+import contextvars
+import itertools
+import queue
+import threading
+from concurrent.futures import Executor
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+    Union,
+    overload,
+)
 
 import numpy
 from docarray import Document, DocumentArray
 from jina import Client
 
-from .helper import get_base_payload, iter_doc, load_plain_into_document
+from ..embeddings import QuantizedEmbeddings, check_output_dtype, convert_embeddings
+from ..tracing import trace
+from .chunking import POOLINGS, chunk_texts, pool_segments
+from .helper import (
+    get_base_payload,
+    get_positions,
+    iter_doc,
+    load_plain_into_document,
+    post_batches,
+    record_positions,
+)
 
 if TYPE_CHECKING:
     from docarray.typing import ArrayType
@@ -18,6 +42,7 @@ class EncodeMixin:
 
     token: str
     client: Client
+    _post: Callable
 
     @overload
     def encode(
@@ -27,9 +52,19 @@ class EncodeMixin:
         on_done: Optional['CallbackFnType'] = None,
         on_error: Optional['CallbackFnType'] = None,
         on_always: Optional['CallbackFnType'] = None,
+        on_embeddings: Optional[
+            Callable[[numpy.ndarray, Union[numpy.ndarray, QuantizedEmbeddings]], None]
+        ] = None,
+        callback_executor: Optional[Executor] = None,
         batch_size: Optional[int] = 8,
         prefetch: Optional[int] = 100,
         show_progress: Optional[bool] = False,
+        output_dtype: Optional[str] = None,
+        normalize: Optional[bool] = False,
+        chunk_size: Optional[int] = None,
+        chunk_overlap: Optional[int] = 0,
+        pooling: Optional[str] = 'mean',
+        output: Optional[str] = None,
         **kwargs,
     ):
         """
@@ -42,10 +77,30 @@ class EncodeMixin:
             It takes the response ``DataRequest`` as the only argument.
         :param on_always: the callback function executed while streaming, after completion of each request.
             It takes the response ``DataRequest`` as the only argument.
+        :param on_embeddings: the callback function executed as soon as each response arrives, with the positions of
+            its inputs as an int64 array and their embeddings, converted as per `output_dtype` and `normalize`. Nothing
+            is returned when it is set.
+        :param callback_executor: the executor running `on_embeddings`, so that a slow callback does not hold back
+            the responses. By default, the callbacks run one at a time in a thread of their own.
         :param batch_size: the number of elements in each request when sending a list of texts.
         :param prefetch: the number of in-flight batches made by the post() method. Use a lower value for expensive
             operations, and a higher value for faster response times.
         :param show_progress: if set, client will show a progress bar on receiving every request.
+        :param output_dtype: the dtype of the returned embeddings, `float32`, `float16` or `int8`. If `int8`, the
+            embeddings are quantized with one scale factor per vector and returned as ``QuantizedEmbeddings``.
+        :param normalize: if set, the returned embeddings are scaled to unit L2 norm.
+        :param chunk_size: if set, texts longer than this many words are split into windows of at most `chunk_size`
+            words, which are encoded in the same stream of batches and pooled back into one embedding per text.
+            Callbacks are not supported with chunking.
+        :param chunk_overlap: the number of words shared by consecutive windows.
+        :param pooling: how the embeddings of the windows of a text are pooled, `mean`, `max`, or `weighted` for the
+            mean weighted by the number of words of each window.
+        :param output: if `arrow`, the embeddings are returned as a ``pyarrow.Table`` with the position of each input
+            in an `id` column and the embeddings in an `embedding` column of fixed-size lists, and the scale factors in
+            a `scale` column if `output_dtype` is `int8`. A record batch is built from each response as it arrives.
+            Callbacks are not supported with it. If `arrow_stream`, the record batches are returned as a
+            ``pyarrow.RecordBatchReader`` as soon as the first response arrives, and yielded as the responses arrive,
+            out of order, in the way of `encode_unordered`.
         :param kwargs: additional arguments to pass to the model.
         """
         ...
@@ -65,9 +120,16 @@ class EncodeMixin:
         on_done: Optional['CallbackFnType'] = None,
         on_error: Optional['CallbackFnType'] = None,
         on_always: Optional['CallbackFnType'] = None,
+        on_embeddings: Optional[
+            Callable[[numpy.ndarray, Union[numpy.ndarray, QuantizedEmbeddings]], None]
+        ] = None,
+        callback_executor: Optional[Executor] = None,
         batch_size: Optional[int] = 8,
         prefetch: Optional[int] = 100,
         show_progress: Optional[bool] = False,
+        output_dtype: Optional[str] = None,
+        normalize: Optional[bool] = False,
+        output: Optional[str] = None,
         **kwargs,
     ):
         """
@@ -80,10 +142,24 @@ class EncodeMixin:
             It takes the response ``DataRequest`` as the only argument.
         :param on_always: the callback function executed while streaming, after completion of each request.
             It takes the response ``DataRequest`` as the only argument.
+        :param on_embeddings: the callback function executed as soon as each response arrives, with the positions of
+            its inputs as an int64 array and their embeddings, converted as per `output_dtype` and `normalize`. Nothing
+            is returned when it is set.
+        :param callback_executor: the executor running `on_embeddings`, so that a slow callback does not hold back
+            the responses. By default, the callbacks run one at a time in a thread of their own.
         :param batch_size: the number of elements in each request when sending a list of images.
         :param prefetch: the number of in-flight batches made by the post() method. Use a lower value for expensive
             operations, and a higher value for faster response times.
         :param show_progress: if set, client will show a progress bar on receiving every request.
+        :param output_dtype: the dtype of the returned embeddings, `float32`, `float16` or `int8`. If `int8`, the
+            embeddings are quantized with one scale factor per vector and returned as ``QuantizedEmbeddings``.
+        :param normalize: if set, the returned embeddings are scaled to unit L2 norm.
+        :param output: if `arrow`, the embeddings are returned as a ``pyarrow.Table`` with the position of each input
+            in an `id` column and the embeddings in an `embedding` column of fixed-size lists, and the scale factors in
+            a `scale` column if `output_dtype` is `int8`. A record batch is built from each response as it arrives.
+            Callbacks are not supported with it. If `arrow_stream`, the record batches are returned as a
+            ``pyarrow.RecordBatchReader`` as soon as the first response arrives, and yielded as the responses arrive,
+            out of order, in the way of `encode_unordered`.
         :param kwargs: additional arguments to pass to the model.
         """
         ...
@@ -96,9 +172,16 @@ class EncodeMixin:
         on_done: Optional['CallbackFnType'] = None,
         on_error: Optional['CallbackFnType'] = None,
         on_always: Optional['CallbackFnType'] = None,
+        on_embeddings: Optional[
+            Callable[[numpy.ndarray, Union[numpy.ndarray, QuantizedEmbeddings]], None]
+        ] = None,
+        callback_executor: Optional[Executor] = None,
         batch_size: Optional[int] = 8,
         prefetch: Optional[int] = 100,
         show_progress: Optional[bool] = False,
+        output_dtype: Optional[str] = None,
+        normalize: Optional[bool] = False,
+        output: Optional[str] = None,
         **kwargs,
     ):
         """
@@ -111,10 +194,21 @@ class EncodeMixin:
             It takes the response ``DataRequest`` as the only argument.
         :param on_always: the callback function executed while streaming, after completion of each request.
             It takes the response ``DataRequest`` as the only argument.
+        :param on_embeddings: the callback function executed as soon as each response arrives, with the positions of
+            its inputs as an int64 array and their embeddings, converted as per `output_dtype` and `normalize`. Nothing
+            is returned when it is set.
+        :param callback_executor: the executor running `on_embeddings`, so that a slow callback does not hold back
+            the responses. By default, the callbacks run one at a time in a thread of their own.
         :param batch_size: the number of elements in each request when sending a list of documents.
         :param prefetch: the number of in-flight batches made by the post() method. Use a lower value for expensive
             operations, and a higher value for faster response times.
         :param show_progress: if set, client will show a progress bar on receiving every request.
+        :param output_dtype: the dtype of the embeddings of the returned documents, `float32` or `float16`. `int8`
+            embeddings are only given to `on_embeddings` or with `output`, since documents cannot hold their scales.
+        :param normalize: if set, the embeddings of the returned documents are scaled to unit L2 norm.
+        :param output: if `arrow`, the embeddings are returned as a ``pyarrow.Table`` with the id of each document in
+            an `id` column and the embeddings in an `embedding` column of fixed-size lists. A record batch is built from
+            each response as it arrives. Callbacks are not supported with it.
         :param kwargs: additional arguments to pass to the model.
         """
         ...
@@ -138,9 +232,16 @@ class EncodeMixin:
         on_done: Optional['CallbackFnType'] = None,
         on_error: Optional['CallbackFnType'] = None,
         on_always: Optional['CallbackFnType'] = None,
+        on_embeddings: Optional[
+            Callable[[numpy.ndarray, Union[numpy.ndarray, QuantizedEmbeddings]], None]
+        ] = None,
+        callback_executor: Optional[Executor] = None,
         batch_size: Optional[int] = 8,
         prefetch: Optional[int] = 100,
         show_progress: Optional[bool] = False,
+        output_dtype: Optional[str] = None,
+        normalize: Optional[bool] = False,
+        output: Optional[str] = None,
         **kwargs,
     ):
         """
@@ -155,14 +256,29 @@ class EncodeMixin:
             It takes the response ``DataRequest`` as the only argument.
         :param on_always: the callback function executed while streaming, after completion of each request.
             It takes the response ``DataRequest`` as the only argument.
+        :param on_embeddings: the callback function executed as soon as each response arrives, with the positions of
+            its inputs as an int64 array and their embeddings, converted as per `output_dtype` and `normalize`. Nothing
+            is returned when it is set.
+        :param callback_executor: the executor running `on_embeddings`, so that a slow callback does not hold back
+            the responses. By default, the callbacks run one at a time in a thread of their own.
         :param batch_size: the number of elements in each request when sending a list of documents.
         :param prefetch: the number of in-flight batches made by the post() method. Use a lower value for expensive
             operations, and a higher value for faster response times.
         :param show_progress: if set, client will show a progress bar on receiving every request.
+        :param output_dtype: the dtype of the returned embeddings, `float32`, `float16` or `int8`. If `int8`, the
+            embeddings are quantized with one scale factor per vector and returned as ``QuantizedEmbeddings``.
+        :param normalize: if set, the returned embeddings are scaled to unit L2 norm.
+        :param output: if `arrow`, the embeddings are returned as a ``pyarrow.Table`` with the position of each input
+            in an `id` column and the embeddings in an `embedding` column of fixed-size lists, and the scale factors in
+            a `scale` column if `output_dtype` is `int8`. A record batch is built from each response as it arrives.
+            Callbacks are not supported with it. If `arrow_stream`, the record batches are returned as a
+            ``pyarrow.RecordBatchReader`` as soon as the first response arrives, and yielded as the responses arrive,
+            out of order, in the way of `encode_unordered`.
         :param kwargs: additional arguments to pass to the model.
         """
         ...
 
+    @trace('task')
     def encode(self, **kwargs):
         """
         Encode the documents using the model.
@@ -170,14 +286,271 @@ class EncodeMixin:
         :param kwargs: additional arguments to pass to the model.
         :return: encoded content.
         """
+        output_dtype = kwargs.pop('output_dtype', None)
+        check_output_dtype(output_dtype)
+        normalize = kwargs.pop('normalize', False)
+        output = kwargs.pop('output', None)
+        if output not in (None, 'arrow', 'arrow_stream'):
+            raise ValueError(
+                f'Output should be `arrow`, `arrow_stream` or None, got `{output}`.'
+            )
+
+        if (chunk_size := kwargs.pop('chunk_size', None)) is not None:
+            return self._encode_chunked(
+                chunk_size=chunk_size,
+                chunk_overlap=kwargs.pop('chunk_overlap', 0),
+                pooling=kwargs.pop('pooling', 'mean'),
+                output_dtype=output_dtype,
+                normalize=normalize,
+                output=output,
+                **kwargs,
+            )
+
+        if output in ('arrow', 'arrow_stream'):
+            return self._encode_arrow(
+                output_dtype=output_dtype,
+                normalize=normalize,
+                stream=output == 'arrow_stream',
+                **kwargs,
+            )
+
+        on_embeddings = kwargs.pop('on_embeddings', None)
+        callback_executor = kwargs.pop('callback_executor', None)
+        if output_dtype == 'int8' and 'docs' in kwargs and on_embeddings is None:
+            raise ValueError(
+                'Documents cannot hold the scale factors of int8 embeddings, use `on_embeddings` or `output=\'arrow\'`.'
+            )
         payload, content_type, is_list = self._get_enocde_payload(**kwargs)
-        result = self.client.post(**payload)
+        if on_embeddings is not None:
+            return post_batches(
+                self._post,
+                payload,
+                on_embeddings,
+                lambda docs: convert_embeddings(
+                    docs.embeddings, output_dtype=output_dtype, normalize=normalize
+                ),
+                executor=callback_executor,
+            )
+        result = self._post(**payload)
         return self._unbox_encode_result(
             result=result,
             content_type=content_type,
             is_list=is_list,
+            output_dtype=output_dtype,
+            normalize=normalize,
+        )
+
+    def _encode_chunked(
+        self,
+        chunk_size: int,
+        chunk_overlap: int,
+        pooling: str,
+        output_dtype: Optional[str],
+        normalize: bool,
+        output: Optional[str] = None,
+        **kwargs,
+    ):
+        if 'text' not in kwargs or 'image' in kwargs or 'docs' in kwargs:
+            raise ValueError('Only text input can be chunked.')
+        if any(
+            kwargs.get(k) for k in ('on_done', 'on_error', 'on_always', 'on_embeddings')
+        ):
+            raise ValueError('Chunked text input does not support callbacks.')
+        if pooling not in POOLINGS:
+            raise ValueError(
+                f'Pooling should be one of {", ".join(POOLINGS)}, got `{pooling}`.'
+            )
+
+        text = kwargs.pop('text')
+        single = isinstance(text, str)
+        windows, offsets, weights = chunk_texts(
+            [text] if single else text, chunk_size, chunk_overlap
+        )
+        # the windows of all the texts are sent in the same stream of batches
+        payload, _, _ = self._get_enocde_payload(text=windows, **kwargs)
+        result = self._post(**payload)
+        embeddings = pool_segments(result.embeddings, offsets, weights, pooling)
+        if output is not None:
+            from ..arrow import embeddings_to_record_batch, import_pyarrow
+
+            pa = import_pyarrow()
+            batch = embeddings_to_record_batch(
+                convert_embeddings(
+                    embeddings, output_dtype=output_dtype, normalize=normalize
+                ),
+                numpy.arange(len(embeddings)),
+            )
+            if output == 'arrow_stream':
+                return pa.RecordBatchReader.from_batches(batch.schema, [batch])
+            return pa.Table.from_batches([batch])
+        return convert_embeddings(
+            embeddings[0] if single else embeddings,
+            output_dtype=output_dtype,
+            normalize=normalize,
+        )
+
+    def _encode_arrow(
+        self, output_dtype: Optional[str], normalize: bool, stream: bool, **kwargs
+    ):
+        from ..arrow import embeddings_to_record_batch, import_pyarrow
+
+        pa = import_pyarrow()
+        if any(
+            kwargs.get(k) for k in ('on_done', 'on_error', 'on_always', 'on_embeddings')
+        ):
+            raise ValueError('Arrow output does not support callbacks.')
+        plain = 'docs' not in kwargs
+
+        def _to_batch(docs, index):
+            embeddings = convert_embeddings(
+                docs.embeddings, output_dtype=output_dtype, normalize=normalize
+            )
+            return index[0], embeddings_to_record_batch(
+                embeddings, index if plain else docs[:, 'id']
+            )
+
+        # the schema of a result without any embedding, whose dimension is unknown
+        empty = embeddings_to_record_batch(
+            convert_embeddings(
+                numpy.empty((0, 0), numpy.float32),
+                output_dtype=output_dtype,
+                normalize=normalize,
+            ),
+            numpy.empty(0, numpy.int64) if plain else pa.array([], pa.string()),
+        )
+
+        if stream:
+            batches = (batch for _, batch in self._stream_encoded(_to_batch, **kwargs))
+            first = next(batches, None)
+            if first is None:
+                return pa.RecordBatchReader.from_batches(empty.schema, [])
+            return pa.RecordBatchReader.from_batches(
+                first.schema, itertools.chain([first], batches)
+            )
+
+        payload, _, _ = self._get_enocde_payload(**kwargs)
+        positions = {}
+        batches = []
+
+        def _on_done(response):
+            docs = response.docs
+            if len(docs):
+                batches.append(_to_batch(docs, get_positions(docs, positions)))
+
+        payload.update(
+            inputs=record_positions(payload['inputs'], positions), on_done=_on_done
         )
+        self._post(**payload)
+
+        # the responses may arrive out of order, each of them holds consecutive inputs
+        batches.sort(key=lambda b: b[0])
+        if not batches:
+            return pa.Table.from_batches([empty])
+        return pa.Table.from_batches([batch for _, batch in batches])
+
+    @trace('task')
+    def encode_unordered(
+        self, **kwargs
+    ) -> Iterator[Tuple[numpy.ndarray, Union[numpy.ndarray, QuantizedEmbeddings]]]:
+        """
+        Encode text, images or documents, and yield the embeddings of each response as soon as it arrives, along with
+        the positions of their inputs. Unlike `encode`, a slow request does not hold back the results of the ones
+        after it, and the results are not buffered to be put back in order. Use `assemble_embeddings` to write them
+        into a preallocated matrix in input order:
+
+        ```python
+        from inference_client.embeddings import assemble_embeddings
+
+        embeddings = assemble_embeddings(model.encode_unordered(text=texts), total=len(texts))
+        ```
+
+        The requests are sent from a background thread, with an event loop of its own, which is paused while
+        `prefetch` responses are waiting for the consumer. Once the consumer stops early, no more requests are sent and
+        the responses of the requests in flight are dropped. Identical inputs are not deduplicated and the results are
+        not cached. The requests are traced as part of the call, and the profile of the call covers building them in
+        the calling thread, but not sending them.
+
+        :param kwargs: the arguments of `encode`, i.e. a list of `text`, `image` or `docs`, `batch_size`, `prefetch`,
+            `output_dtype`, `normalize` and `parameters`. Callbacks are not supported.
+        :return: an iterator of pairs of the positions of the inputs, as an int64 array, and their embeddings.
+        """
+        output_dtype = kwargs.pop('output_dtype', None)
+        normalize = kwargs.pop('normalize', False)
+        check_output_dtype(output_dtype)
+        if any(
+            kwargs.get(k) for k in ('on_done', 'on_error', 'on_always', 'on_embeddings')
+        ):
+            raise ValueError('Unordered encoding does not support callbacks.')
 
+        return self._stream_encoded(
+            lambda docs, index: (
+                index,
+                convert_embeddings(
+                    docs.embeddings, output_dtype=output_dtype, normalize=normalize
+                ),
+            ),
+            **kwargs,
+        )
+
+    def _stream_encoded(self, convert: Callable, **kwargs) -> Iterator:
+        # sends the requests from a background thread, and yields `convert(docs, positions)` for each response
+        payload, _, _ = self._get_enocde_payload(**kwargs)
+        payload.pop('results_in_order', None)
+        positions = {}
+        results = queue.Queue(maxsize=max(payload['prefetch'], 1))
+        closed = threading.Event()
+        done = object()
+
+        def _put(item):
+            # blocks the event loop of the sender until the consumer catches up or stops, in which case the responses
+            # of the requests in flight are dropped
+            while not closed.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+
+        def _on_done(response):
+            docs = response.docs
+            if len(docs) and not closed.is_set():
+                _put(convert(docs, get_positions(docs, positions)))
+
+        def _send():
+            try:
+                self._post(**payload)
+            except BaseException as ex:
+                _put(ex)
+            else:
+                _put(done)
+
+        def _until_closed(docs):
+            # no more requests are sent once the consumer stopped early
+            for doc in docs:
+                if closed.is_set():
+                    return
+                yield doc
+
+        payload.update(
+            inputs=_until_closed(record_positions(payload['inputs'], positions)),
+            on_done=_on_done,
+        )
+        # the requests are traced as children of the span of the call
+        context = contextvars.copy_context()
+
+        def _iter_results():
+            threading.Thread(target=context.run, args=(_send,), daemon=True).start()
+            try:
+                while (item := results.get()) is not done:
+                    if isinstance(item, BaseException):
+                        raise item
+                    yield item
+            finally:
+                closed.set()
+
+        return _iter_results()
+
+    @trace('build_payload')
     def _get_enocde_payload(self, **kwargs):
         payload = get_base_payload('/encode', self.token, **kwargs)
         is_list = False
@@ -252,17 +625,24 @@ class EncodeMixin:
         payload.update(show_progress=kwargs.pop('show_progress', False))
         return payload, content_type, is_list
 
+    @trace('unbox')
     def _unbox_encode_result(
         self,
         result: 'DocumentArray' = None,
         content_type: str = 'docarray',
         is_list: bool = False,
+        output_dtype: Optional[str] = None,
+        normalize: bool = False,
     ):
         if result is not None:
             if content_type == 'plain':
-                if is_list:
-                    return result.embeddings
-                else:
-                    return result[0].embedding
-            else:
-                return result
+                return convert_embeddings(
+                    result.embeddings if is_list else result[0].embedding,
+                    output_dtype=output_dtype,
+                    normalize=normalize,
+                )
+            if len(result) and (output_dtype is not None or normalize):
+                result.embeddings = convert_embeddings(
+                    result.embeddings, output_dtype=output_dtype, normalize=normalize
+                )
+            return result
@@ -1,7 +1,8 @@
-from typing import TYPE_CHECKING, List, Optional, Union, overload
+from typing import TYPE_CHECKING, Callable, List, Optional, Union, overload
 
 from docarray import Document, DocumentArray
 
+from ..tracing import trace
 from .helper import get_base_payload
 
 if TYPE_CHECKING:
@@ -15,6 +16,7 @@ class GenerationMixin:
 
     token: str
     client: 'Client'
+    _post: Callable
 
     @overload
     def generate(self, prompt: Union[str, List[str]], **kwargs):
@@ -72,6 +74,7 @@ class GenerationMixin:
         """
         ...
 
+    @trace('task')
     def generate(self, prompt: Union[str, List[str]], **kwargs):
         """Generate text from the given prompt.
 
@@ -82,15 +85,17 @@ class GenerationMixin:
         prompt = [prompt] if isinstance(prompt, str) else prompt
         payload = self._get_generate_payload(**kwargs)
         payload.update(
-            inputs=DocumentArray([Document(tags={'prompt': p}) for p in prompt])
+            inputs=DocumentArray([Document(tags={'prompt': p}) for p in prompt]),
+            results_in_order=True,
         )
-        result = self.client.post(**payload)
+        result = self._post(**payload)
         text_out = [
             r.tags.get('generated_text', '') or r.tags.get('response', '')
             for r in result
         ]
         return text_out if len(text_out) > 1 else text_out[0]
 
+    @trace('build_payload')
     def _get_generate_payload(self, **kwargs):
         """Get the payload for the generate endpoint.
 
@@ -1,6 +1,9 @@
-from typing import Callable, Optional
+import hashlib
+import json
+from concurrent.futures import Executor, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
 
-from docarray import Document
+from docarray import Document, DocumentArray
 
 
 def load_plain_into_document(content, mime_type: Optional[str] = None):
@@ -77,3 +80,168 @@ def get_base_payload(endpoint, token, **kwargs):
         parameters=parameters,
     )
     return payload
+
+
+def record_positions(
+    docs: Iterable['Document'], positions: Dict[str, int]
+) -> Iterator['Document']:
+    """
+    Record the position of each input document by its id as it is sent.
+
+    :param docs: the input documents.
+    :param positions: the dict the positions are recorded in.
+    :yield: the documents.
+    """
+    for doc in docs:
+        positions.setdefault(doc.id, len(positions))
+        yield doc
+
+
+def get_positions(docs: 'DocumentArray', positions: Dict[str, int]):
+    """
+    Get the positions of the inputs of the documents of a response.
+
+    :param docs: the documents of the response.
+    :param positions: the positions recorded with `record_positions`.
+    :return: the positions as an int64 array.
+    """
+    import numpy
+
+    ids = docs[:, 'id']
+    return numpy.fromiter(
+        (positions[i] for i in ids), dtype=numpy.int64, count=len(ids)
+    )
+
+
+def get_match_images(doc: 'Document') -> List[Any]:
+    """
+    Get the generated images of a document, stored as its matches.
+
+    :param doc: the document of the response.
+    :return: the blobs of the matches, or their tensors if they have no blobs.
+    """
+    matches = doc.matches
+    if len(matches) and len(matches[0].blob) > 0:
+        return [m.blob for m in matches]
+    elif len(matches) and matches[0].tensor is not None:
+        return [m.tensor for m in matches]
+    raise ValueError('No image found in the result.')
+
+
+def post_batches(
+    post: Callable,
+    payload: dict,
+    callback: Callable,
+    convert: Callable[['DocumentArray'], Any],
+    executor: Optional[Executor] = None,
+):
+    """
+    Send a payload and call a task-specific callback, e.g. `on_embeddings(indices, embeddings)`, with the positions of
+    the inputs of each response and their unboxed results as soon as the response arrives. The results are unboxed and
+    the callback is called on `executor`, so that a slow callback does not hold back the responses after it.
+
+    :param post: the method sending the payload, i.e. `Model._post`.
+    :param payload: the payload built by one of the task methods. Its `on_done` callback, if any, is still called with
+        each response.
+    :param callback: the callback, taking an int64 array of positions and the unboxed results of their inputs.
+    :param convert: the function unboxing the documents of a response.
+    :param executor: the executor running the callbacks. By default, a thread of its own runs them one at a time in
+        the order the responses arrive.
+    :raises: the first exception raised by a callback, once all of them are done.
+    """
+    positions = {}
+    futures = []
+    pool = executor or ThreadPoolExecutor(
+        max_workers=1, thread_name_prefix='inference-client-callback'
+    )
+    on_done = payload.get('on_done')
+
+    def _call(indices, docs):
+        callback(indices, convert(docs))
+
+    def _on_done(response):
+        if on_done is not None:
+            on_done(response)
+        docs = response.docs
+        if len(docs):
+            futures.append(pool.submit(_call, get_positions(docs, positions), docs))
+
+    # the positions are passed to the callback, the responses do not need to be put back in order
+    payload.pop('results_in_order', None)
+    payload.update(
+        inputs=record_positions(payload['inputs'], positions), on_done=_on_done
+    )
+    try:
+        post(**payload)
+    finally:
+        wait(futures)
+        if executor is None:
+            pool.shutdown()
+    for future in futures:
+        future.result()
+
+
+def _json_default(obj):
+    # array-like parameters, e.g. latents, are hashed by content, as their `str` is truncated
+    if hasattr(obj, '__array__'):
+        import numpy
+
+        array = numpy.ascontiguousarray(
+            obj.detach().cpu() if hasattr(obj, 'detach') else obj
+        )
+        digest = hashlib.blake2b(array.tobytes(), digest_size=16).hexdigest()
+        return f'array:{array.dtype.str}:{array.shape}:{digest}'
+    return str(obj)
+
+
+def _update_fingerprint(h, doc: 'Document'):
+    import numpy
+
+    h.update(b'text:' + doc.text.encode('utf-8') + b'\0')
+    h.update(b'blob:%d:' % len(doc.blob) + doc.blob)
+    h.update(b'uri:' + doc.uri.encode('utf-8') + b'\0')
+    if doc.tensor is not None:
+        tensor = numpy.ascontiguousarray(doc.tensor)
+        h.update(f'tensor:{tensor.dtype.str}:{tensor.shape}:'.encode())
+        h.update(tensor.tobytes())
+    h.update(b'tags:' + json.dumps(doc.tags, sort_keys=True, default=str).encode())
+    for field, docs in (('chunks', doc.chunks), ('matches', doc.matches)):
+        h.update(f'{field}:{len(docs)}:'.encode())
+        for d in docs:
+            _update_fingerprint(h, d)
+
+
+def get_doc_fingerprint(doc: 'Document') -> str:
+    """
+    Compute a hash of the content of a document, i.e. its text, blob, tensor, uri, tags, chunks and matches. Unlike
+    the document id, the fingerprint is equal for documents with equal content.
+
+    :param doc: the document to hash
+    :return: the hex digest of the content
+    """
+    h = hashlib.blake2b(digest_size=16)
+    _update_fingerprint(h, doc)
+    return h.hexdigest()
+
+
+def get_payload_fingerprint(payload: dict) -> Optional[str]:
+    """
+    Compute a hash of a request payload from its endpoint, parameters and the fingerprints of its input documents.
+
+    :param payload: the payload built by one of the task methods
+    :return: the hex digest of the payload, or None if the inputs are not a materialized DocumentArray, e.g. a lazy
+        generator of documents
+    """
+    inputs = payload.get('inputs')
+    if not isinstance(inputs, DocumentArray):
+        return None
+    h = hashlib.blake2b(digest_size=16)
+    h.update(payload.get('on', '').encode('utf-8') + b'\0')
+    h.update(
+        json.dumps(
+            payload.get('parameters', {}), sort_keys=True, default=_json_default
+        ).encode()
+    )
+    for doc in inputs:
+        _update_fingerprint(h, doc)
+    return h.hexdigest()
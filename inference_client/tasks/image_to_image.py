@@ -1,10 +1,27 @@
-from typing import TYPE_CHECKING, Iterable, Optional, Tuple, Union, overload
+from concurrent.futures import Executor
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    overload,
+)
 
 import numpy
 from docarray import Document, DocumentArray
 from jina import Client
 
-from .helper import get_base_payload, iter_doc, load_plain_into_document
+from ..tracing import trace
+from .helper import (
+    get_base_payload,
+    get_match_images,
+    iter_doc,
+    load_plain_into_document,
+    post_batches,
+)
 
 if TYPE_CHECKING:
     from docarray.typing import ArrayType
@@ -17,6 +34,7 @@ class ImageToImageMixin:
 
     token: str
     client: Client
+    _post: Callable
 
     @overload
     def image_to_image(
@@ -96,6 +114,8 @@ class ImageToImageMixin:
         target_size: Optional[Tuple[int]],
         aesthetic_score: Optional[float],
         negative_aesthetic_score: Optional[float],
+        on_images: Optional[Callable[[numpy.ndarray, List[list]], None]] = None,
+        callback_executor: Optional[Executor] = None,
         **kwargs,
     ):
         """
@@ -127,6 +147,11 @@ class ImageToImageMixin:
         :param target_size: Parameter used by Stable Diffusion XL.
         :param aesthetic_score: Parameter used by Stable Diffusion XL.
         :param negative_aesthetic_score: Parameter used by Stable Diffusion XL.
+        :param on_images: The callback function executed as soon as each response arrives, with the positions of its
+        documents as an int64 array and, for each of them, the list of its generated images. Nothing is returned when
+        it is set.
+        :param callback_executor: The executor running `on_images`, so that a slow callback does not hold back the
+        responses. By default, the callbacks run one at a time in a thread of their own.
         :param kwargs: Additional arguments to pass to the model.
         """
         ...
@@ -152,6 +177,8 @@ class ImageToImageMixin:
         aesthetic_score: Optional[float],
         negative_aesthetic_score: Optional[float],
         docs: Optional[Union[Iterable['Document'], 'DocumentArray']] = None,
+        on_images: Optional[Callable[[numpy.ndarray, List[list]], None]] = None,
+        callback_executor: Optional[Executor] = None,
         **kwargs,
     ):
         """
@@ -188,10 +215,16 @@ class ImageToImageMixin:
         :param negative_aesthetic_score: Parameter used by Stable Diffusion XL.
         :param docs: The documents containing base images and prompts and/or negative_prompt to guide the image
         generation.
+        :param on_images: The callback function executed as soon as each response arrives, with the positions of its
+        documents as an int64 array and, for each of them, the list of its generated images. Nothing is returned when
+        it is set.
+        :param callback_executor: The executor running `on_images`, so that a slow callback does not hold back the
+        responses. By default, the callbacks run one at a time in a thread of their own.
         :param kwargs: Additional arguments to pass to the model.
         """
         ...
 
+    @trace('task')
     def image_to_image(
         self, prompt: str = None, image: Union[str, bytes, 'ArrayType'] = None, **kwargs
     ):
@@ -204,12 +237,23 @@ class ImageToImageMixin:
 
         :return: The generated image.
         """
+        on_images = kwargs.pop('on_images', None)
+        callback_executor = kwargs.pop('callback_executor', None)
         payload, content_type = self._get_image_to_image_payload(
             prompt=prompt, image=image, **kwargs
         )
-        result = self.client.post(**payload)
+        if on_images is not None:
+            return post_batches(
+                self._post,
+                payload,
+                on_images,
+                lambda docs: [get_match_images(doc) for doc in docs],
+                executor=callback_executor,
+            )
+        result = self._post(**payload)
         return self._unbox_image_to_image_result(result, content_type)
 
+    @trace('build_payload')
     def _get_image_to_image_payload(self, **kwargs):
         payload = get_base_payload('/image-to-image', self.token, **kwargs)
 
@@ -243,15 +287,10 @@ class ImageToImageMixin:
 
         return payload, content_type
 
+    @trace('unbox')
     def _unbox_image_to_image_result(self, result, content_type):
         if content_type == 'plain':
-            matches = result[0].matches
-            if len(matches[0].blob) > 0:
-                output = [m.blob for m in matches]
-            elif matches[0].tensor is not None:
-                output = [m.tensor for m in matches]
-            else:
-                raise ValueError('No image found in the result.')
+            output = get_match_images(result[0])
             return output[0] if len(output) == 1 else output
         else:
             return result
@@ -1,9 +1,10 @@
-from typing import TYPE_CHECKING, Iterable, Optional, Union, overload
+from typing import TYPE_CHECKING, Callable, Iterable, Optional, Union, overload
 
 import numpy
 from docarray import Document, DocumentArray
 from jina import Client
 
+from ..tracing import trace
 from .helper import get_base_payload, iter_doc, load_plain_into_document
 
 if TYPE_CHECKING:
@@ -17,6 +18,7 @@ class RankMixin:
 
     token: str
     client: Client
+    _post: Callable
 
     @overload
     def rank(
@@ -83,6 +85,7 @@ class RankMixin:
         """
         ...
 
+    @trace('task')
     def rank(self, **kwargs):
         """
         Rank the documents using the model.
@@ -91,12 +94,13 @@ class RankMixin:
         :return: ranked content.
         """
         payload, content_type = self._get_rank_payload(**kwargs)
-        result = self.client.post(**payload)
+        result = self._post(**payload)
         return self._unbox_rank_result(
             result=result,
             content_type=content_type,
         )
 
+    @trace('build_payload')
     def _get_rank_payload(self, **kwargs):
         payload = get_base_payload('/rank', self.token, **kwargs)
 
@@ -163,6 +167,7 @@ class RankMixin:
 
         return payload, content_type
 
+    @trace('unbox')
     def _unbox_rank_result(
         self,
         result: 'DocumentArray' = None,
@@ -1,9 +1,21 @@
-from typing import TYPE_CHECKING, Iterable, Optional, Tuple, Union, overload
+from concurrent.futures import Executor
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    overload,
+)
 
+import numpy
 from docarray import Document, DocumentArray
 from jina import Client
 
-from .helper import get_base_payload, iter_doc
+from ..tracing import trace
+from .helper import get_base_payload, get_match_images, iter_doc, post_batches
 
 if TYPE_CHECKING:
     import torch
@@ -16,6 +28,7 @@ class TextToImageMixin:
 
     token: str
     client: Client
+    _post: Callable
 
     @overload
     def text_to_image(
@@ -89,6 +102,8 @@ class TextToImageMixin:
         original_size: Optional[Tuple[int]],
         crops_coords_top_left: Optional[Tuple[int]],
         target_size: Optional[Tuple[int]],
+        on_images: Optional[Callable[[numpy.ndarray, List[list]], None]] = None,
+        callback_executor: Optional[Executor] = None,
         **kwargs,
     ):
         """
@@ -116,6 +131,11 @@ class TextToImageMixin:
         :param original_size: Parameter used by Stable Diffusion XL.
         :param crops_coords_top_left: Parameter used by Stable Diffusion XL.
         :param target_size: Parameter used by Stable Diffusion XL.
+        :param on_images: The callback function executed as soon as each response arrives, with the positions of its
+        documents as an int64 array and, for each of them, the list of its generated images. Nothing is returned when
+        it is set.
+        :param callback_executor: The executor running `on_images`, so that a slow callback does not hold back the
+        responses. By default, the callbacks run one at a time in a thread of their own.
         :param kwargs: Additional arguments to pass to the model.
         """
         ...
@@ -140,6 +160,8 @@ class TextToImageMixin:
         crops_coords_top_left: Optional[Tuple[int]],
         target_size: Optional[Tuple[int]],
         docs: Optional[Union[Iterable['Document'], 'DocumentArray']] = None,
+        on_images: Optional[Callable[[numpy.ndarray, List[list]], None]] = None,
+        callback_executor: Optional[Executor] = None,
         **kwargs,
     ):
         """
@@ -170,10 +192,16 @@ class TextToImageMixin:
         :param crops_coords_top_left: Parameter used by Stable Diffusion XL.
         :param target_size: Parameter used by Stable Diffusion XL.
         :param docs: The documents containing prompts and/or negative_prompt to guide the image generation.
+        :param on_images: The callback function executed as soon as each response arrives, with the positions of its
+        documents as an int64 array and, for each of them, the list of its generated images. Nothing is returned when
+        it is set.
+        :param callback_executor: The executor running `on_images`, so that a slow callback does not hold back the
+        responses. By default, the callbacks run one at a time in a thread of their own.
         :param kwargs: Additional arguments to pass to the model.
         """
         ...
 
+    @trace('task')
     def text_to_image(self, prompt: str = None, **kwargs):
         """
         Generate an image from prompt or documents containing prompts.
@@ -183,10 +211,21 @@ class TextToImageMixin:
 
         :return: The generated image.
         """
+        on_images = kwargs.pop('on_images', None)
+        callback_executor = kwargs.pop('callback_executor', None)
         payload, content_type = self._get_text_to_image_payload(prompt=prompt, **kwargs)
-        result = self.client.post(**payload)
+        if on_images is not None:
+            return post_batches(
+                self._post,
+                payload,
+                on_images,
+                lambda docs: [get_match_images(doc) for doc in docs],
+                executor=callback_executor,
+            )
+        result = self._post(**payload)
         return self._unbox_text_to_image_result(result, content_type)
 
+    @trace('build_payload')
     def _get_text_to_image_payload(self, **kwargs):
         payload = get_base_payload('/text-to-image', self.token, **kwargs)
 
@@ -220,15 +259,10 @@ class TextToImageMixin:
 
         return payload, content_type
 
+    @trace('unbox')
     def _unbox_text_to_image_result(self, result, content_type):
         if content_type == 'plain':
-            matches = result[0].matches
-            if len(matches[0].blob) > 0:
-                output = [m.blob for m in matches]
-            elif matches[0].tensor is not None:
-                output = [m.tensor for m in matches]
-            else:
-                raise ValueError('No image found in the result.')
+            output = get_match_images(result[0])
             return output[0] if len(output) == 1 else output
         else:
             return result
@@ -0,0 +1,156 @@
+import io
+from typing import List, Tuple
+
+import numpy
+from PIL import Image
+
+Tile = Tuple[int, int, numpy.ndarray]
+
+
+def load_image_array(content) -> Tuple[numpy.ndarray, str]:
+    """
+    Load an image given as a path or uri, bytes or ndarray into an array of shape `(H, W, C)`.
+
+    :param content: the image.
+    :return: the image as an `uint8` array with 3 (RGB) or 4 (RGBA) channels, and the format of the input image,
+        `png` for ndarray inputs.
+    """
+    if isinstance(content, numpy.ndarray):
+        array = content.astype(numpy.uint8, copy=False)
+        if array.ndim == 2:
+            array = numpy.stack([array] * 3, axis=-1)
+        return array, 'png'
+
+    if isinstance(content, str):
+        from docarray import Document
+
+        content = Document(uri=content).load_uri_to_blob().blob
+    image = Image.open(io.BytesIO(content))
+    image_format = (image.format or 'png').lower()
+    image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+    return numpy.asarray(image), image_format
+
+
+def _tile_starts(length: int, tile_size: int, overlap: int) -> List[int]:
+    if length <= tile_size:
+        return [0]
+    step = tile_size - overlap
+    starts = list(range(0, length - tile_size, step))
+    # the last tile is aligned with the border, so it may overlap its neighbor by more than `overlap`
+    return starts + [length - tile_size]
+
+
+def split_tiles(image: numpy.ndarray, tile_size: int, overlap: int) -> List[Tile]:
+    """
+    Cut an image into overlapping square tiles covering it.
+
+    :param image: the image array of shape `(H, W, C)`.
+    :param tile_size: the maximum width and height of a tile.
+    :param overlap: the number of pixels shared by neighboring tiles.
+    :return: the tiles with the coordinates `(y, x)` of their top left corner.
+    """
+    if overlap < 0 or overlap >= tile_size:
+        raise ValueError('Tile overlap should be between 0 and the tile size.')
+    height, width = image.shape[:2]
+    return [
+        (y, x, image[y : y + tile_size, x : x + tile_size])
+        for y in _tile_starts(height, tile_size, overlap)
+        for x in _tile_starts(width, tile_size, overlap)
+    ]
+
+
+def get_tile_scale(tile: numpy.ndarray, upscaled: numpy.ndarray) -> int:
+    """
+    Get the upscaling factor of a tile.
+
+    :param tile: the input tile.
+    :param upscaled: the upscaled tile.
+    :return: the integer factor by which both the height and width of the tile were multiplied.
+    """
+    height, width = tile.shape[:2]
+    scale = upscaled.shape[0] // height
+    if scale < 1 or upscaled.shape[:2] != (height * scale, width * scale):
+        raise ValueError(
+            f'Tiled upscaling needs an integer scale, got tiles of {upscaled.shape[1]}x{upscaled.shape[0]} pixels '
+            f'for {width}x{height} pixels.'
+        )
+    return scale
+
+
+def _ramp(length: int) -> numpy.ndarray:
+    return (numpy.arange(length, dtype=numpy.float32) + 0.5) / length
+
+
+def _blend(
+    region: numpy.ndarray, tile: numpy.ndarray, alpha: numpy.ndarray
+) -> numpy.ndarray:
+    region = region.astype(numpy.float32)
+    blended = region + (tile.astype(numpy.float32) - region) * alpha[..., None]
+    return numpy.clip(numpy.rint(blended), 0, 255).astype(numpy.uint8)
+
+
+def blend_tiles(tiles: List[Tile], shape: Tuple[int, int], scale: int) -> numpy.ndarray:
+    """
+    Stitch upscaled tiles into one image, blending the seams with linear weights over the overlapping borders.
+
+    The tiles are written straight into the output image row by row, and only the strips they share with the tiles
+    written before them are blended, so that the memory used is about the size of the output image.
+
+    :param tiles: the upscaled tiles of :func:`split_tiles`, with the coordinates `(y, x)` of their top left corner in
+        the input image.
+    :param shape: the height and width of the input image.
+    :param scale: the upscaling factor of the tiles, see :func:`get_tile_scale`.
+    :return: the upscaled image as an `uint8` array.
+    """
+    height, width = shape
+    channels = tiles[0][2].shape[-1]
+    output = numpy.empty((height * scale, width * scale, channels), numpy.uint8)
+
+    # the bottom of the rows written so far and the right of the row being written, in output pixels
+    row, row_top, bottom, right = None, 0, 0, 0
+    for y, x, tile in sorted(tiles, key=lambda t: t[:2]):
+        if y != row:
+            row, row_top, right = y, bottom, 0
+        y0, x0 = y * scale, x * scale
+        tile_h, tile_w = tile.shape[:2]
+        top = min(max(row_top - y0, 0), tile_h)
+        left = min(max(right - x0, 0), tile_w)
+        target = output[y0 : y0 + tile_h, x0 : x0 + tile_w]
+
+        # the tile fades in over the strips already written by the tile above and the tile on its left
+        alpha_x = numpy.ones(tile_w, numpy.float32)
+        alpha_x[:left] = _ramp(left)
+        if top:
+            target[:top] = _blend(
+                target[:top], tile[:top], numpy.outer(_ramp(top), alpha_x)
+            )
+        if left:
+            target[top:, :left] = _blend(
+                target[top:, :left],
+                tile[top:, :left],
+                numpy.broadcast_to(alpha_x[:left], (tile_h - top, left)),
+            )
+        target[top:, left:] = tile[top:, left:]
+
+        bottom = max(bottom, y0 + tile_h)
+        right = x0 + tile_w
+    return output
+
+
+def encode_image(image: numpy.ndarray, image_format: str, quality=None) -> bytes:
+    """
+    Encode an image array to bytes.
+
+    :param image: the image array.
+    :param image_format: `jpeg` or `png`.
+    :param quality: the JPEG quality, ignored for PNG.
+    :return: the encoded image.
+    """
+    image_format = 'jpeg' if image_format in ('jpeg', 'jpg') else 'png'
+    pil_image = Image.fromarray(image)
+    if image_format == 'jpeg' and pil_image.mode == 'RGBA':
+        pil_image = pil_image.convert('RGB')
+    buffer = io.BytesIO()
+    kwargs = {'quality': int(quality)} if image_format == 'jpeg' and quality else {}
+    pil_image.save(buffer, format=image_format, **kwargs)
+    return buffer.getvalue()
@@ -1,16 +1,54 @@
 import os
-from typing import TYPE_CHECKING, Iterable, Optional, Union, overload
+from concurrent.futures import Executor
+from typing import TYPE_CHECKING, Callable, Iterable, List, Optional, Union, overload
 
 import numpy
 from docarray import Document, DocumentArray
 from jina import Client
 
-from .helper import get_base_payload, iter_doc, load_plain_into_document
+from ..tracing import trace
+from .helper import (
+    get_base_payload,
+    iter_doc,
+    load_plain_into_document,
+    post_batches,
+)
+from .tiling import (
+    blend_tiles,
+    encode_image,
+    get_tile_scale,
+    load_image_array,
+    split_tiles,
+)
 
 if TYPE_CHECKING:
     from docarray.typing import ArrayType
 
 
+def _save_outputs(docs: 'DocumentArray') -> 'DocumentArray':
+    for doc in docs:
+        if output_path := doc.tags.get('output_path'):
+            with open(output_path, 'wb') as f:
+                f.write(doc.blob)
+    return docs
+
+
+def _get_output_format(
+    output_path: Optional[str] = None, image_format: Optional[str] = None
+) -> Optional[str]:
+    # the extension of `output_path` wins over `image_format`
+    if output_path is not None:
+        image_format = os.path.splitext(output_path)[1].strip().lower()
+        if image_format not in ('.jpeg', '.jpg', '.png'):
+            raise ValueError('Output path should end with either `.jpeg` or `.png`.')
+        return image_format.split('.')[-1]
+    if image_format is not None:
+        image_format = image_format.lower()
+        if image_format not in ('jpeg', 'jpg', 'png'):
+            raise ValueError('Output format should be either jpeg or png.')
+    return image_format
+
+
 class UpscaleMixin:
     """
     Mixin class for up-scaling image.
@@ -18,6 +56,7 @@ class UpscaleMixin:
 
     token: str
     client: Client
+    _post: Callable
 
     @overload
     def upscale(
@@ -28,6 +67,9 @@ class UpscaleMixin:
         image_format: Optional[str] = None,
         output_path: Optional[str] = None,
         quality: Optional[int] = None,
+        tile_size: Optional[int] = None,
+        tile_overlap: Optional[int] = None,
+        prefetch: Optional[int] = None,
         **kwargs,
     ):
         """
@@ -52,6 +94,13 @@ class UpscaleMixin:
         :param quality: The image quality for JPEG output, on a scale from 0 (worst) to 95 (best). Values above 95
                 should be avoided; 100 disables portions of the JPEG compression algorithm, and results in large files
                 with hardly any gain in image quality. This parameter is ignored for PNG files. Default: None.
+        :param tile_size: if set, the image is cut into overlapping tiles of at most `tile_size` x `tile_size`
+                pixels, which are upscaled concurrently and blended back into one image. Use it for very large images.
+                `scale` is not supported in this mode. Default: None.
+        :param tile_overlap: the number of pixels shared by neighboring tiles, over which their seams are blended.
+                Default: a quarter of the tile size, at most 32.
+        :param prefetch: the number of tiles upscaled concurrently, only used with `tile_size`, as a single image is
+                sent in one request otherwise. Default: 8.
         :param kwargs: additional arguments to pass to the model.
         """
         ...
@@ -63,6 +112,9 @@ class UpscaleMixin:
         docs: Union[Iterable['Document'], 'DocumentArray'],
         scale: Optional[str] = None,
         quality: Optional[int] = None,
+        prefetch: Optional[int] = None,
+        on_images: Optional[Callable[[numpy.ndarray, List[bytes]], None]] = None,
+        callback_executor: Optional[Executor] = None,
         **kwargs,
     ):
         """
@@ -88,6 +140,13 @@ class UpscaleMixin:
         :param quality: The image quality for JPEG output, on a scale from 0 (worst) to 95 (best). Values above 95
                 should be avoided; 100 disables portions of the JPEG compression algorithm, and results in large files
                 with hardly any gain in image quality. This parameter is ignored for PNG files. Default: None.
+        :param prefetch: the number of in-flight requests made by the post() method. Default: None, the default of
+                the client is used.
+        :param on_images: the callback function executed as soon as each response arrives, with the positions of its
+                documents as an int64 array and their upscaled image bytes. Nothing is returned when it is set.
+                Default: None.
+        :param callback_executor: the executor running `on_images`, so that a slow callback does not hold back the
+                responses. By default, the callbacks run one at a time in a thread of their own. Default: None.
         :param kwargs: additional arguments to pass to the model
         """
         ...
@@ -102,6 +161,11 @@ class UpscaleMixin:
         image_format: Optional[str] = None,
         output_path: Optional[str] = None,
         quality: Optional[int] = None,
+        tile_size: Optional[int] = None,
+        tile_overlap: Optional[int] = None,
+        prefetch: Optional[int] = None,
+        on_images: Optional[Callable[[numpy.ndarray, List[bytes]], None]] = None,
+        callback_executor: Optional[Executor] = None,
         **kwargs,
     ):
         """
@@ -132,10 +196,24 @@ class UpscaleMixin:
         :param quality: The image quality for JPEG output, on a scale from 0 (worst) to 95 (best). Values above 95
                 should be avoided; 100 disables portions of the JPEG compression algorithm, and results in large files
                 with hardly any gain in image quality. This parameter is ignored for PNG files. Default: None.
+        :param tile_size: if set, the image is cut into overlapping tiles of at most `tile_size` x `tile_size`
+                pixels, which are upscaled concurrently and blended back into one image. Use it for very large images.
+                Only supported for `image` input, and `scale` is not supported in this mode. Default: None.
+        :param tile_overlap: the number of pixels shared by neighboring tiles, over which their seams are blended.
+                Default: a quarter of the tile size, at most 32.
+        :param prefetch: the number of in-flight requests made by the post() method. With `tile_size`, the number of
+                tiles upscaled concurrently. Default: None, 8 tiles with `tile_size` and the default of the client
+                otherwise.
+        :param on_images: the callback function executed as soon as each response arrives, with the positions of its
+                documents as an int64 array and their upscaled image bytes. Nothing is returned when it is set.
+                Default: None.
+        :param callback_executor: the executor running `on_images`, so that a slow callback does not hold back the
+                responses. By default, the callbacks run one at a time in a thread of their own. Default: None.
         :param kwargs: additional arguments to pass to the model.
         """
         ...
 
+    @trace('task')
     def upscale(self, **kwargs):
         """
         Upscale the image documents using the model.
@@ -143,15 +221,32 @@ class UpscaleMixin:
         :param kwargs: additional arguments to pass to the model.
         :return: upscaled image.
         """
+        on_images = kwargs.pop('on_images', None)
+        callback_executor = kwargs.pop('callback_executor', None)
+        if kwargs.get('tile_size') is not None:
+            if on_images is not None:
+                raise ValueError('Tiled upscaling does not support callbacks.')
+            return self._upscale_tiled(**kwargs)
         payload, content_type = self._get_upscale_payload(**kwargs)
-        result = self.client.post(**payload)
+        if on_images is not None:
+            return post_batches(
+                self._post,
+                payload,
+                on_images,
+                lambda docs: [doc.blob for doc in _save_outputs(docs)],
+                executor=callback_executor,
+            )
+        result = self._post(**payload)
         return self._unbox_upscale_result(
             result=result,
             content_type=content_type,
         )
 
+    @trace('build_payload')
     def _get_upscale_payload(self, **kwargs):
         payload = get_base_payload('/upscale', self.token, **kwargs)
+        if (prefetch := kwargs.pop('prefetch', None)) is not None:
+            payload.update(prefetch=prefetch)
 
         if kwargs.get('docs', None) is not None:
             if kwargs.get('image', None) is not None:
@@ -173,19 +268,13 @@ class UpscaleMixin:
             if isinstance(image_content, (str, bytes, numpy.ndarray)):
                 image_doc = load_plain_into_document(image_content, mime_type='image')
 
-                if kwargs.get('output_path', None) is not None:
-                    output_path = kwargs.pop('output_path')
-                    image_format = os.path.splitext(output_path)[1].strip().lower()
-                    if image_format not in ('.jpeg', '.jpg', '.png'):
-                        raise ValueError(
-                            'Output path should end with either `.jpeg` or `.png`.'
-                        )
+                output_path = kwargs.pop('output_path', None)
+                image_format = _get_output_format(
+                    output_path, kwargs.pop('image_format', None)
+                )
+                if output_path is not None:
                     image_doc.tags['output_path'] = output_path
-                    image_doc.tags['image_format'] = image_format.split('.')[-1]
-                elif kwargs.get('image_format', None) is not None:
-                    image_format = kwargs.pop('image_format').lower()
-                    if image_format not in ('jpeg', 'jpg', 'png'):
-                        raise ValueError('Output format should be either jpeg or png.')
+                if image_format is not None:
                     image_doc.tags['image_format'] = image_format
 
                 payload.update(inputs=DocumentArray([image_doc]))
@@ -214,16 +303,69 @@ class UpscaleMixin:
 
         return payload, content_type
 
+    def _upscale_tiled(
+        self,
+        tile_size: int,
+        tile_overlap: Optional[int] = None,
+        prefetch: Optional[int] = None,
+        image=None,
+        image_format: Optional[str] = None,
+        output_path: Optional[str] = None,
+        quality: Optional[int] = None,
+        **kwargs,
+    ):
+        if kwargs.get('docs') is not None or image is None:
+            raise ValueError('Tiled upscaling only supports a single image input.')
+        if kwargs.pop('scale', None) is not None:
+            raise ValueError('Scale is not supported with tiled upscaling.')
+        image_format = _get_output_format(output_path, image_format)
+
+        if tile_overlap is None:
+            tile_overlap = min(32, tile_size // 4)
+
+        array, input_format = load_image_array(image)
+        tiles = split_tiles(array, tile_size, tile_overlap)
+        # the tiles travel as PNG both ways, so that no compression artifacts show at the seams
+        docs = DocumentArray(
+            [
+                Document(blob=encode_image(tile, 'png'), tags={'image_format': 'png'})
+                for _, _, tile in tiles
+            ]
+        )
+        payload = get_base_payload('/upscale', self.token, **kwargs)
+        payload.update(
+            inputs=docs,
+            request_size=1,
+            total_docs=len(docs),
+            prefetch=prefetch if prefetch is not None else 8,
+        )
+        result = self._post(**payload)
+
+        upscaled = [
+            (y, x, load_image_array(result[doc.id].blob)[0])
+            for (y, x, _), doc in zip(tiles, docs)
+        ]
+        scales = {
+            get_tile_scale(tile, up)
+            for (_, _, tile), (_, _, up) in zip(tiles, upscaled)
+        }
+        if len(scales) > 1:
+            raise ValueError('The tiles were upscaled by different factors.')
+        blended = blend_tiles(upscaled, array.shape[:2], scales.pop())
+        output = encode_image(blended, image_format or input_format, quality)
+
+        if output_path is not None:
+            with open(output_path, 'wb') as f:
+                f.write(output)
+        return output
+
+    @trace('unbox')
     def _unbox_upscale_result(
         self,
         result: 'DocumentArray' = None,
         content_type: str = 'docarray',
     ):
-        for doc in result:
-            if output_path := doc.tags.get('output_path'):
-                with open(output_path, 'wb') as f:
-                    f.write(doc.blob)
-
+        _save_outputs(result)
         if content_type == 'plain':
             return result[0].blob
         else:
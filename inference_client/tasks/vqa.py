@@ -1,10 +1,17 @@
-from typing import TYPE_CHECKING, Iterable, Optional, Union, overload
+from concurrent.futures import Executor
+from typing import TYPE_CHECKING, Callable, Iterable, List, Optional, Union, overload
 
 import numpy
 from docarray import Document, DocumentArray
 from jina import Client
 
-from .helper import get_base_payload, iter_doc, load_plain_into_document
+from ..tracing import trace
+from .helper import (
+    get_base_payload,
+    iter_doc,
+    load_plain_into_document,
+    post_batches,
+)
 
 if TYPE_CHECKING:
     from docarray.typing import ArrayType
@@ -17,6 +24,7 @@ class VQAMixin:
 
     token: str
     client: Client
+    _post: Callable
 
     @overload
     def vqa(self, *, image: Union[str, bytes, 'ArrayType'], question: str, **kwargs):
@@ -30,11 +38,22 @@ class VQAMixin:
         ...
 
     @overload
-    def vqa(self, *, docs: Union[Iterable['Document'], 'DocumentArray'], **kwargs):
+    def vqa(
+        self,
+        *,
+        docs: Union[Iterable['Document'], 'DocumentArray'],
+        on_answers: Optional[Callable[[numpy.ndarray, List[str]], None]] = None,
+        callback_executor: Optional[Executor] = None,
+        **kwargs,
+    ):
         """
         Answer the question using the model.
 
         :param docs: the documents to be answered with image as root and question stored in the tags.
+        :param on_answers: the callback function executed as soon as each response arrives, with the positions of its
+            documents as an int64 array and their answers. Nothing is returned when it is set.
+        :param callback_executor: the executor running `on_answers`, so that a slow callback does not hold back the
+            responses. By default, the callbacks run one at a time in a thread of their own.
         :param kwargs: additional arguments to pass to the model.
         """
         ...
@@ -46,6 +65,8 @@ class VQAMixin:
         docs: Optional[Union[Iterable['Document'], 'DocumentArray']] = None,
         image: Optional[Union[str, bytes, 'ArrayType']] = None,
         question: Optional[str] = None,
+        on_answers: Optional[Callable[[numpy.ndarray, List[str]], None]] = None,
+        callback_executor: Optional[Executor] = None,
         **kwargs,
     ):
         """
@@ -54,10 +75,15 @@ class VQAMixin:
         :param docs: the documents to be answered with image as root and question stored in the tags. Default: None.
         :param image: the image that the question is about. Default: None.
         :param question: the question to be answered. Default: None.
+        :param on_answers: the callback function executed as soon as each response arrives, with the positions of its
+            documents as an int64 array and their answers. Nothing is returned when it is set.
+        :param callback_executor: the executor running `on_answers`, so that a slow callback does not hold back the
+            responses. By default, the callbacks run one at a time in a thread of their own.
         :param kwargs: additional arguments to pass to the model.
         """
         ...
 
+    @trace('task')
     def vqa(self, **kwargs):
         """
         Answer the question using the model.
@@ -65,13 +91,24 @@ class VQAMixin:
         :param kwargs: additional arguments to pass to the model.
         :return: answered content.
         """
+        on_answers = kwargs.pop('on_answers', None)
+        callback_executor = kwargs.pop('callback_executor', None)
         payload, content_type = self._get_vqa_payload(**kwargs)
-        result = self.client.post(**payload)
+        if on_answers is not None:
+            return post_batches(
+                self._post,
+                payload,
+                on_answers,
+                lambda docs: [doc.tags['response'] for doc in docs],
+                executor=callback_executor,
+            )
+        result = self._post(**payload)
         return self._unbox_vqa_result(
             result=result,
             content_type=content_type,
         )
 
+    @trace('build_payload')
     def _get_vqa_payload(self, **kwargs):
         payload = get_base_payload('/vqa', self.token, **kwargs)
 
@@ -107,6 +144,7 @@ class VQAMixin:
 
         return payload, content_type
 
+    @trace('unbox')
     def _unbox_vqa_result(
         self,
         result: 'DocumentArray' = None,
@@ -0,0 +1,152 @@
+import asyncio
+import threading
+import time
+from typing import TYPE_CHECKING, Optional
+
+from docarray import DocumentArray
+
+if TYPE_CHECKING:
+    from jina import Client
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket. Tokens refill continuously at `rate` per second up to `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Initializes the bucket full.
+
+        :param rate: the number of tokens added per second.
+        :param capacity: the maximum number of tokens the bucket holds, i.e. the allowed burst. Defaults to `rate`.
+        """
+        if rate <= 0:
+            raise ValueError('Rate should be a positive number.')
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1) -> float:
+        """
+        Take `amount` tokens from the bucket, going into debt if there are not enough of them.
+
+        :param amount: the number of tokens to take.
+        :return: the number of seconds the caller should wait before using the tokens.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            self._tokens -= amount
+            return max(0.0, -self._tokens / self.rate)
+
+
+class RateLimiter:
+    """
+    Client-side rate limiter and in-flight request governor.
+
+    A single instance can be shared by several models, e.g. by attaching it to the `Client` that hands them out, so
+    that the limits apply to the aggregate traffic of all task calls from all threads.
+    """
+
+    def __init__(
+        self,
+        *,
+        requests_per_second: Optional[float] = None,
+        bytes_per_second: Optional[float] = None,
+        max_in_flight: Optional[int] = None,
+        burst: Optional[float] = None,
+    ):
+        """
+        Initializes the rate limiter. Limits that are not set are not enforced.
+
+        :param requests_per_second: the maximum number of requests (batches) sent per second.
+        :param bytes_per_second: the maximum number of serialized document bytes sent per second.
+        :param max_in_flight: the maximum number of requests awaiting a response at any time.
+        :param burst: the number of seconds worth of requests and bytes that may be sent at once after being idle.
+            Default: 1 second.
+        """
+        burst = burst or 1
+        self._requests = (
+            TokenBucket(requests_per_second, requests_per_second * burst)
+            if requests_per_second
+            else None
+        )
+        self._bytes = (
+            TokenBucket(bytes_per_second, bytes_per_second * burst)
+            if bytes_per_second
+            else None
+        )
+        self._in_flight = (
+            threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+        )
+
+    async def _acquire_request(self):
+        if self._requests is not None:
+            await asyncio.sleep(self._requests.reserve())
+        if self._in_flight is not None:
+            # polling keeps the event loop free to process the responses that release the permits
+            while not self._in_flight.acquire(blocking=False):
+                await asyncio.sleep(0.005)
+
+    async def _acquire_bytes(self, doc):
+        if self._bytes is not None:
+            await asyncio.sleep(self._bytes.reserve(doc.to_protobuf().ByteSize()))
+
+    def post(self, client: 'Client', **payload):
+        """
+        Send the payload through the client, holding back requests to stay within the limits.
+
+        :param client: the client to send the requests with.
+        :param payload: the arguments of `client.post`.
+        :return: the result of `client.post`.
+        """
+        inputs = payload.pop('inputs', None)
+        request_size = payload.get('request_size', 1)
+        acquired, released = 0, 0
+
+        async def _throttled():
+            nonlocal acquired
+            for i, doc in enumerate(inputs):
+                batch_start = i == 0 if request_size <= 0 else i % request_size == 0
+                if batch_start:
+                    await self._acquire_request()
+                    acquired += 1
+                await self._acquire_bytes(doc)
+                yield doc
+
+        on_done = payload.pop('on_done', None)
+        on_error = payload.pop('on_error', None)
+        on_always = payload.pop('on_always', None)
+        return_results = on_done is None and on_error is None and on_always is None
+        results = DocumentArray()
+
+        def _on_always(response):
+            nonlocal released
+            if self._in_flight is not None:
+                self._in_flight.release()
+                released += 1
+            if return_results:
+                results.extend(response.docs)
+            elif on_always:
+                on_always(response)
+
+        try:
+            client.post(
+                inputs=_throttled() if inputs is not None else None,
+                on_done=on_done,
+                on_error=on_error,
+                on_always=_on_always,
+                **payload,
+            )
+        finally:
+            if self._in_flight is not None:
+                for _ in range(acquired - released):
+                    self._in_flight.release()
+
+        return results if return_results else None
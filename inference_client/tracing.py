@@ -0,0 +1,170 @@
+import functools
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+from docarray import Document, DocumentArray
+
+from .compression import _approx_size
+from .profiling import profile_call
+
+TRACER_NAME = 'inference_client'
+PHASES = ('task', 'build_payload', 'unbox')
+
+
+class _NonRecordingSpan:
+    """Stands in for the spans of OpenTelemetry when it is not installed."""
+
+    def is_recording(self) -> bool:
+        return False
+
+    def set_attribute(self, key: str, value):
+        pass
+
+    def set_attributes(self, attributes: dict):
+        pass
+
+
+def get_tracer():
+    """
+    Get the tracer of the client from the tracer provider configured by the application.
+
+    :return: the tracer, or None if OpenTelemetry is not installed.
+    """
+    try:
+        from opentelemetry import trace
+    except ImportError:
+        return None
+    return trace.get_tracer(TRACER_NAME)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Run a block of code in a span, child of the current span if any. Nothing is traced if OpenTelemetry is not
+    installed or no tracer provider is configured.
+
+    :param name: the name of the span, prefixed with `inference_client.`.
+    :param attributes: the attributes of the span, prefixed with `inference_client.`. None values are skipped.
+    :return: a context manager yielding the span.
+    """
+    tracer = get_tracer()
+    if tracer is None:
+        yield _NonRecordingSpan()
+        return
+    with tracer.start_as_current_span(
+        f'{TRACER_NAME}.{name}',
+        attributes={
+            f'{TRACER_NAME}.{k}': v for k, v in attributes.items() if v is not None
+        },
+    ) as current:
+        yield current
+
+
+def set_attributes(current, **attributes):
+    """
+    Set attributes of a span, prefixed with `inference_client.`. None values are skipped.
+
+    :param current: the span.
+    :param attributes: the attributes.
+    """
+    current.set_attributes(
+        {f'{TRACER_NAME}.{k}': v for k, v in attributes.items() if v is not None}
+    )
+
+
+def inject_trace_context(
+    metadata: Sequence[Tuple[str, str]]
+) -> Tuple[Tuple[str, str], ...]:
+    """
+    Add the context of the current span, e.g. the W3C `traceparent` header, to the gRPC metadata of a request, so
+    that the spans of the server are correlated with the ones of the client.
+
+    :param metadata: the metadata of the request, e.g. the `authorization` entry.
+    :return: the metadata with the trace context, unchanged if OpenTelemetry is not installed or nothing is traced.
+    """
+    try:
+        from opentelemetry import propagate
+    except ImportError:
+        return tuple(metadata)
+    carrier = {}
+    propagate.inject(carrier)
+    return tuple(metadata) + tuple(carrier.items())
+
+
+def docs_size(docs: Iterable[Document]) -> int:
+    """
+    Estimate the number of bytes of documents from their contents, without serializing them.
+
+    :param docs: the documents.
+    :return: the sum of the sizes of the texts, blobs, tensors, embeddings and uris of the documents, and of their
+        chunks and matches.
+    """
+    return sum(_approx_size(doc) for doc in docs)
+
+
+def count_docs(docs: Iterable[Document], counts: List[int]) -> Iterator[Document]:
+    """
+    Count lazily fed documents and their bytes, estimated as by :func:`docs_size`, as they are consumed.
+
+    :param docs: the documents.
+    :param counts: a list of two counters, incremented with the number of documents and bytes.
+    :yield: the documents.
+    """
+    for doc in docs:
+        counts[0] += 1
+        counts[1] += _approx_size(doc)
+        yield doc
+
+
+def _payload_attributes(payload: dict) -> dict:
+    inputs = payload.get('inputs')
+    # the bytes are only counted by the send span, and lazily fed documents only when they are sent
+    return dict(
+        endpoint=payload.get('on'),
+        docs=len(inputs)
+        if isinstance(inputs, DocumentArray)
+        else payload.get('total_docs'),
+    )
+
+
+def trace(phase: str):
+    """
+    Decorate a method of the task mixins to run it in a span.
+
+    :param phase: `task` for the task methods themselves, whose span is named after the task and is the parent of the
+        other spans of the call, and which are profiled if the model is being profiled, `build_payload` for the
+        methods building the request payloads, or `unbox` for the methods turning the result into the return value of
+        the task.
+    :return: the decorator.
+    """
+    if phase not in PHASES:
+        raise ValueError(f'Phase should be one of {", ".join(PHASES)}, got `{phase}`.')
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            if phase == 'task':
+                with span(
+                    fn.__name__,
+                    model=getattr(self, 'model_name', None)
+                    or getattr(self, 'host', None),
+                ), profile_call(self, fn.__name__):
+                    return fn(self, *args, **kwargs)
+
+            with span(phase) as current:
+                value = fn(self, *args, **kwargs)
+                if current.is_recording():
+                    if phase == 'build_payload':
+                        payload = value[0] if isinstance(value, tuple) else value
+                        set_attributes(current, **_payload_attributes(payload))
+                    else:
+                        result = kwargs.get('result', args[0] if args else None)
+                        set_attributes(
+                            current,
+                            response_docs=len(result) if result is not None else None,
+                        )
+                return value
+
+        return wrapper
+
+    return decorator
@@ -108,6 +108,11 @@ class DummyExecutor(Executor):
         for doc in docs:
             doc.tags['response'] = 'Yes, it is a cat'
 
+    @requests(on='/generate')
+    def generate(self, docs, **kwargs):
+        for doc in docs:
+            doc.tags['generated_text'] = doc.tags['prompt'] + ' and so on'
+
 
 class ErrorExecutor(Executor):
     @requests
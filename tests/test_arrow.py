@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+from docarray import Document
+
+pa = pytest.importorskip('pyarrow')
+pq = pytest.importorskip('pyarrow.parquet')
+
+from inference_client.arrow import ParquetWriter, embeddings_to_record_batch
+from inference_client.embeddings import QuantizedEmbeddings
+
+
+def test_embeddings_to_record_batch():
+    embeddings = np.arange(12, dtype=np.float32).reshape(3, 4)
+    batch = embeddings_to_record_batch(embeddings, np.array([5, 6, 7]))
+    assert batch.schema.names == ['id', 'embedding']
+    assert batch.schema.field('embedding').type == pa.list_(pa.float32(), 4)
+    assert batch.column('id').to_pylist() == [5, 6, 7]
+    np.testing.assert_array_equal(
+        batch.column('embedding').flatten().to_numpy().reshape(3, 4), embeddings
+    )
+
+    quantized = QuantizedEmbeddings(
+        np.ones((2, 4), dtype=np.int8), np.array([0.5, 2], dtype=np.float32)
+    )
+    batch = embeddings_to_record_batch(quantized)
+    assert batch.schema.names == ['embedding', 'scale']
+    assert batch.schema.field('embedding').type == pa.list_(pa.int8(), 4)
+
+
+def test_encode_arrow_text(make_client):
+    texts = [f'hello {i}' for i in range(10)]
+    table = make_client.encode(text=texts, batch_size=3, output='arrow')
+    assert isinstance(table, pa.Table)
+    assert table.num_rows == 10
+    assert table.column('id').to_pylist() == list(range(10))
+    assert table.schema.field('embedding').type == pa.list_(pa.float64(), 512)
+
+    table = make_client.encode(
+        text=texts, batch_size=4, output='arrow', output_dtype='float16'
+    )
+    assert table.schema.field('embedding').type == pa.list_(pa.float16(), 512)
+
+
+def test_encode_arrow_docs(make_client):
+    docs = [Document(text=f'hello {i}') for i in range(5)]
+    table = make_client.encode(docs=docs, batch_size=2, output='arrow')
+    assert table.column('id').to_pylist() == [d.id for d in docs]
+
+
+def test_encode_arrow_chunked(make_client):
+    table = make_client.encode(
+        text=['a b c d e', 'f'], chunk_size=2, output='arrow', output_dtype='int8'
+    )
+    assert table.num_rows == 2
+    assert table.schema.names == ['id', 'embedding', 'scale']
+
+
+def test_encode_arrow_stream(make_client, tmp_path):
+    texts = [f'hello {i}' for i in range(10)]
+    reader = make_client.encode(text=texts, batch_size=3, output='arrow_stream')
+    assert isinstance(reader, pa.RecordBatchReader)
+    assert reader.schema.field('embedding').type == pa.list_(pa.float64(), 512)
+    batches = list(reader)
+    assert len(batches) == 4
+    assert sorted(i for b in batches for i in b.column('id').to_pylist()) == list(
+        range(10)
+    )
+
+    path = str(tmp_path / 'embeddings.parquet')
+    with ParquetWriter(path) as writer:
+        writer.write(
+            make_client.encode(text=texts, output='arrow_stream', output_dtype='int8')
+        )
+    table = pq.read_table(path)
+    assert table.num_rows == 10
+    assert table.schema.names == ['id', 'embedding', 'scale']
+
+
+def test_encode_arrow_empty(make_client):
+    table = make_client.encode(text=[], output='arrow', output_dtype='int8')
+    assert table.num_rows == 0
+    assert table.schema.names == ['id', 'embedding', 'scale']
+    assert table.schema.field('embedding').type == pa.list_(pa.int8(), 0)
+
+    reader = make_client.encode(text=[], output='arrow_stream')
+    assert reader.schema.field('embedding').type == pa.list_(pa.float32(), 0)
+    assert reader.read_all().num_rows == 0
+
+
+def test_encode_arrow_invalid(make_client):
+    with pytest.raises(ValueError):
+        make_client.encode(text=['a'], output='pandas')
+    with pytest.raises(ValueError):
+        make_client.encode(text=['a'], output='arrow', on_done=print)
+
+
+def test_parquet_writer(make_client, tmp_path):
+    path = str(tmp_path / 'embeddings.parquet')
+    with ParquetWriter(path) as writer:
+        for start in (0, 4):
+            texts = [f'hello {i}' for i in range(start, start + 4)]
+            writer.write(make_client.encode(text=texts, output='arrow'))
+        writer.write(
+            embeddings_to_record_batch(
+                np.zeros((1, 512)), np.array([0], dtype=np.int64)
+            )
+        )
+    assert writer.rows == 9
+    table = pq.read_table(path)
+    assert table.num_rows == 9
+    assert table.column('id').to_pylist() == [0, 1, 2, 3, 0, 1, 2, 3, 0]
@@ -0,0 +1,170 @@
+import asyncio
+
+import pytest
+from docarray import Document, DocumentArray
+from jina import Flow
+
+from inference_client import Client, RateLimiter
+from inference_client.balancer import LoadBalancer
+from inference_client.model import Model
+
+from .executor import DummyExecutor
+
+
+@pytest.fixture(scope='module')
+def make_second_flow(port_generator):
+    f = Flow(port=port_generator()).add(name='dummy', uses=DummyExecutor)
+    with f:
+        yield f
+
+
+@pytest.fixture
+def make_balanced_client(make_flow, make_second_flow):
+    def _make(endpoints=None, **kwargs):
+        endpoints = endpoints or [
+            f'grpc://0.0.0.0:{make_flow.port}',
+            f'grpc://0.0.0.0:{make_second_flow.port}',
+        ]
+        return Model(
+            model_name='dummy-model',
+            token='valid_token',
+            host=endpoints[0],
+            endpoints=endpoints,
+            **kwargs,
+        )
+
+    return _make
+
+
+def test_spread_across_replicas(make_balanced_client):
+    model = make_balanced_client()
+    res = model.encode(text=[f'hello {i}' for i in range(20)], batch_size=2)
+    assert res.shape == (20, 512)
+    stats = model.client.stats()
+    assert sum(s['requests'] for s in stats) == 10
+    assert sum(s['docs'] for s in stats) == 20
+    assert all(s['requests'] > 0 and s['latency'] > 0 for s in stats)
+
+
+def test_results_in_input_order(make_balanced_client):
+    model = make_balanced_client()
+    docs = DocumentArray([Document(text=f'hello {i}') for i in range(25)])
+    res = model.encode(docs=docs, batch_size=3)
+    assert [d.id for d in res] == [d.id for d in docs]
+    assert res.embeddings.shape == (25, 512)
+
+
+def test_eject_unhealthy_replica(make_flow, make_balanced_client, port_generator):
+    dead = f'grpc://0.0.0.0:{port_generator()}'
+    model = make_balanced_client(endpoints=[f'grpc://0.0.0.0:{make_flow.port}', dead])
+    model.client.max_failures = 1
+    # make the dead replica look faster, so that it is tried first
+    model.client.replicas[0].latency = 10
+    res = model.encode(text=[f'hello {i}' for i in range(10)], batch_size=1)
+    assert res.shape == (10, 512)
+
+    live_stats, dead_stats = model.client.stats()
+    assert live_stats['requests'] == 10
+    assert dead_stats['requests'] == 0
+    assert dead_stats['errors'] >= 1
+    assert not dead_stats['healthy']
+
+
+def test_all_replicas_down(port_generator):
+    balancer = LoadBalancer([f'grpc://0.0.0.0:{port_generator()}'])
+    with pytest.raises(ConnectionError):
+        balancer.post(on='/encode', inputs=DocumentArray([Document(text='hello')]))
+    assert balancer.stats()[0]['errors'] == 1
+
+
+def test_power_of_two_choices():
+    balancer = LoadBalancer(
+        ['grpc://0.0.0.0:1', 'grpc://0.0.0.0:2'], max_in_flight_per_replica=1000
+    )
+    fast, slow = balancer.replicas
+    fast.latency, slow.latency = 0.01, 1.0
+    assert all(balancer._choose() is fast for _ in range(10))
+    fast.in_flight = 200
+    assert balancer._choose() is slow
+    assert balancer._choose(exclude=[slow]) is fast
+
+
+def test_max_in_flight_per_replica():
+    balancer = LoadBalancer(['grpc://0.0.0.0:1', 'grpc://0.0.0.0:2'])
+    fast, slow = balancer.replicas
+    fast.latency, slow.latency = 0.01, 1.0
+    fast.in_flight = 2
+    assert balancer._choose() is slow
+    slow.in_flight = 2
+    assert balancer._choose() is None
+
+
+def test_balanced_in_flight(make_balanced_client, mocker):
+    model = make_balanced_client()
+    balancer = model.client
+    balancer.max_in_flight_per_replica = 1
+    # the first replica looks fastest, so that every batch would be sent to it without the limit
+    balancer.replicas[0].latency, balancer.replicas[1].latency = 0.001, 10
+    in_flight = []
+    record_success = balancer._record_success
+
+    def _record_success(replica, latency, docs):
+        in_flight.append(max(r.in_flight for r in balancer.replicas))
+        record_success(replica, latency, docs)
+
+    mocker.patch.object(balancer, '_record_success', _record_success)
+    res = model.encode(text=[f'hello {i}' for i in range(12)], batch_size=1)
+    assert res.shape == (12, 512)
+    assert max(in_flight) == 1
+    assert all(s['requests'] > 0 for s in balancer.stats())
+
+
+def test_failover_on_server_errors(make_flow, port_generator, mocker):
+    balancer = LoadBalancer(
+        [f'grpc://0.0.0.0:{make_flow.port}', f'grpc://0.0.0.0:{port_generator()}']
+    )
+    failing, live = balancer.replicas[1], balancer.replicas[0]
+    failing.latency, live.latency = 0.001, 10
+
+    async def _timeout(*args, **kwargs):
+        raise asyncio.TimeoutError()
+        yield
+
+    mocker.patch.object(failing.client, 'post', _timeout)
+    res = balancer.post(
+        on='/encode', inputs=DocumentArray([Document(text='hello')]), request_size=1
+    )
+    assert len(res) == 1
+    assert balancer.stats()[1]['errors'] == 1
+
+
+def test_balanced_callbacks(make_balanced_client, mocker):
+    on_done_mock = mocker.Mock()
+    model = make_balanced_client()
+    res = model.encode(text=['hello'] * 6, batch_size=2, on_done=on_done_mock)
+    assert res is None
+    assert on_done_mock.call_count == 3
+
+
+def test_balanced_with_rate_limiter(make_balanced_client):
+    model = make_balanced_client(rate_limiter=RateLimiter(max_in_flight=1))
+    docs = DocumentArray([Document(text=f'hello {i}') for i in range(8)])
+    res = model.encode(docs=docs, batch_size=2)
+    assert [d.id for d in res] == [d.id for d in docs]
+
+
+def test_get_model_endpoints(make_flow, make_second_flow):
+    client = Client()
+    endpoints = [
+        f'grpc://0.0.0.0:{make_flow.port}',
+        f'grpc://0.0.0.0:{make_second_flow.port}',
+    ]
+    model = client.get_model(endpoints=endpoints)
+    assert isinstance(model.client, LoadBalancer)
+    assert [r.host for r in model.client.replicas] == endpoints
+    assert model.client.max_in_flight_per_replica == 2
+    assert client.get_model(endpoints=list(endpoints)) is model
+
+    model = client.get_model(endpoints=endpoints, max_in_flight_per_replica=4)
+    assert model.client.max_in_flight_per_replica == 4
+    assert model.encode(text=['hello'] * 8, batch_size=1).shape == (8, 512)
@@ -0,0 +1,127 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from docarray import Document, DocumentArray
+
+from inference_client.batching import MicroBatcher
+from inference_client.model import Model
+
+
+@pytest.fixture
+def make_batching_client(make_flow):
+    return Model(
+        model_name='dummy-model',
+        token='valid_token',
+        host=f'grpc://0.0.0.0:{make_flow.port}',
+        max_batch_size=8,
+        max_batch_wait=0.05,
+    )
+
+
+def _echo(**payload):
+    sent.append(len(payload['inputs']))
+    docs = DocumentArray(payload['inputs'], copy=True)
+    for d in docs:
+        d.tags['response'] = d.text.upper()
+    return docs
+
+
+sent = []
+
+
+def test_micro_batcher_merges_calls():
+    sent.clear()
+    batcher = MicroBatcher(_echo, max_batch_size=4, max_wait=5)
+    with ThreadPoolExecutor(4) as pool:
+        results = list(
+            pool.map(
+                lambda t: batcher.submit(
+                    on='/caption', inputs=DocumentArray([Document(text=t)])
+                ),
+                ['a', 'b', 'c', 'd'],
+            )
+        )
+    assert sent == [4]
+    assert [r[0].tags['response'] for r in results] == ['A', 'B', 'C', 'D']
+    assert batcher.batches == 1 and batcher.items == 4
+
+
+def test_micro_batcher_groups_by_parameters():
+    sent.clear()
+    batcher = MicroBatcher(_echo, max_batch_size=2, max_wait=0.05)
+    with ThreadPoolExecutor(2) as pool:
+        list(
+            pool.map(
+                lambda p: batcher.submit(
+                    on='/caption',
+                    inputs=DocumentArray([Document(text='a')]),
+                    parameters={'p': p},
+                ),
+                [1, 2],
+            )
+        )
+    assert sent == [1, 1]
+
+
+def test_micro_batcher_groups_by_array_parameters():
+    sent.clear()
+    latents = np.zeros(2000)
+    other = latents.copy()
+    other[1000] = 1
+    # both arrays print as `[0. 0. 0. ... 0. 0. 0.]`
+    assert str(latents) == str(other)
+    batcher = MicroBatcher(_echo, max_batch_size=2, max_wait=0.05)
+    with ThreadPoolExecutor(2) as pool:
+        list(
+            pool.map(
+                lambda p: batcher.submit(
+                    on='/text-to-image',
+                    inputs=DocumentArray([Document(text='a')]),
+                    parameters={'latents': p},
+                ),
+                [latents, other],
+            )
+        )
+    assert sent == [1, 1]
+
+
+def test_results_reordered():
+    model = Model(model_name='dummy-model', token='valid_token', host='grpc://foo')
+    docs = DocumentArray([Document(text=str(i)) for i in range(5)])
+    payloads = []
+
+    def _post_unordered(**payload):
+        payloads.append(payload)
+        return DocumentArray(reversed(list(payload['inputs'])))
+
+    model._post_unordered = _post_unordered
+    for inputs in (docs, iter(docs)):
+        res = model._transmit(on='/encode', inputs=inputs, results_in_order=True)
+        assert res[:, 'id'] == docs[:, 'id']
+        assert 'results_in_order' not in payloads[-1]
+    res = model._transmit(on='/encode', inputs=docs)
+    assert res[:, 'id'] == docs[::-1][:, 'id']
+
+
+def test_micro_batcher_error():
+    def _fail(**payload):
+        raise ConnectionError
+
+    batcher = MicroBatcher(_fail, max_batch_size=2, max_wait=0.01)
+    with pytest.raises(ConnectionError):
+        batcher.submit(on='/encode', inputs=DocumentArray([Document(text='a')]))
+
+
+def test_batched_encode(make_batching_client):
+    with ThreadPoolExecutor(16) as pool:
+        results = list(
+            pool.map(
+                lambda i: make_batching_client.encode(text=f'hello {i}'), range(32)
+            )
+        )
+    assert all(r.shape == (512,) for r in results)
+    assert len({r.tobytes() for r in results}) == 32
+    assert make_batching_client._micro_batcher.items == 32
+    assert make_batching_client._micro_batcher.batches < 32
+    assert make_batching_client.encode(text=['a', 'b']).shape == (2, 512)
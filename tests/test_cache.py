@@ -0,0 +1,229 @@
+import os
+
+import numpy as np
+import pytest
+from docarray import Document, DocumentArray
+
+from inference_client.cache import ImageCache, ResponseCache
+from inference_client.model import Model
+
+
+@pytest.fixture
+def cached_model(make_flow, tmp_path):
+    return Model(
+        model_name='dummy-model',
+        token='valid_token',
+        host=f'grpc://0.0.0.0:{make_flow.port}',
+        image_cache=ImageCache(str(tmp_path)),
+    )
+
+
+def test_text_to_image_cache_hit(cached_model):
+    first = cached_model.text_to_image(prompt='a dog', seed=42)
+    second = cached_model.text_to_image(prompt='a dog', seed=42)
+    assert first == second
+    stats = cached_model.image_cache.stats()
+    assert stats['misses'] == 1 and stats['hits'] == 1
+    assert stats['entries'] == 1 and stats['bytes'] > 0
+
+    cached_model.text_to_image(prompt='a dog', seed=43)
+    cached_model.text_to_image(prompt='a cat', seed=42)
+    assert cached_model.image_cache.stats()['misses'] == 3
+
+
+def test_image_to_image_cache_hit(cached_model):
+    image = os.path.join(os.path.dirname(__file__), 'test.jpeg')
+    cached_model.image_to_image(prompt='a dog', image=image, seed=1)
+    cached_model.image_to_image(prompt='a dog', image=image, seed=1)
+    assert cached_model.image_cache.stats()['hits'] == 1
+
+
+def test_cache_bypassed_without_seed(cached_model):
+    cached_model.text_to_image(prompt='a dog')
+    cached_model.text_to_image(prompt='a dog')
+    stats = cached_model.image_cache.stats()
+    assert stats['hits'] == stats['misses'] == stats['entries'] == 0
+
+
+def test_cache_persists_on_disk(cached_model):
+    cached_model.text_to_image(prompt='a dog', seed=42)
+    cache = ImageCache(cached_model.image_cache.path)
+    assert cache.stats()['entries'] == 1
+    cached_model.image_cache = cache
+    cached_model.text_to_image(prompt='a dog', seed=42)
+    assert cache.hits == 1
+
+
+def test_cache_key():
+    cache_key = ImageCache.key
+
+    def _payload(on='/text-to-image', **parameters):
+        return dict(
+            on=on,
+            inputs=DocumentArray([Document(tags={'prompt': 'a dog'})]),
+            parameters=parameters,
+        )
+
+    cache = object.__new__(ImageCache)
+    assert cache_key(cache, 'm', _payload()) is None
+    assert cache_key(cache, 'm', _payload(seed=None)) is None
+    assert cache_key(cache, 'm', _payload(on='/caption', seed=1)) is None
+    assert cache_key(cache, 'm', _payload(seed=1)) == cache_key(
+        cache, 'm', _payload(seed=1)
+    )
+    assert cache_key(cache, 'm', _payload(seed=1)) != cache_key(
+        cache, 'other', _payload(seed=1)
+    )
+
+    latents = np.zeros((1, 4, 64, 64), dtype=np.float32)
+    other = latents.copy()
+    other[0, 0, 32, 32] = 1
+    assert cache_key(cache, 'm', _payload(latents=latents)) == cache_key(
+        cache, 'm', _payload(latents=latents.copy())
+    )
+    assert cache_key(cache, 'm', _payload(latents=latents)) != cache_key(
+        cache, 'm', _payload(latents=other)
+    )
+
+
+def test_cache_eviction(tmp_path):
+    docs = DocumentArray([Document(blob=b'x' * 1000)])
+    size = len(docs.to_bytes(protocol='protobuf', compress=None))
+    cache = ImageCache(str(tmp_path), max_bytes=size * 2)
+    cache.put('a', docs)
+    cache.put('b', docs)
+    os.utime(os.path.join(str(tmp_path), 'a.da'), (0, 0))
+    os.utime(os.path.join(str(tmp_path), 'b.da'), (1, 1))
+    assert cache.get('a') is not None
+    cache.put('c', docs)
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+    assert cache.stats()['evictions'] == 1
+    assert cache.size <= cache.max_bytes
+
+    cache.put('huge', DocumentArray([Document(blob=b'x' * size * 3)]))
+    assert cache.get('huge') is None
+
+    cache.clear()
+    assert cache.stats()['entries'] == 0
+    assert not [f for f in os.listdir(str(tmp_path)) if f.endswith('.da')]
+
+    with pytest.raises(ValueError):
+        ImageCache(str(tmp_path), max_bytes=0)
+
+
+@pytest.fixture
+def response_cached_model(make_flow):
+    return Model(
+        model_name='dummy-model',
+        token='valid_token',
+        host=f'grpc://0.0.0.0:{make_flow.port}',
+        response_cache=ResponseCache(max_entries=2),
+    )
+
+
+def test_response_cache_hit(response_cached_model):
+    image = os.path.join(os.path.dirname(__file__), 'test.jpeg')
+    cache = response_cached_model.response_cache
+    assert response_cached_model.caption(image=image) == response_cached_model.caption(
+        image=image
+    )
+    assert (
+        response_cached_model.vqa(image=image, question='a cat?') == 'Yes, it is a cat'
+    )
+    response_cached_model.vqa(image=image, question='a cat?')
+    stats = cache.stats()
+    assert stats['hits'] == 2 and stats['misses'] == 2
+
+    response_cached_model.vqa(image=image, question='a dog?')
+    assert cache.stats()['entries'] == 2
+
+
+def test_response_cache_bypassed_when_sampling(response_cached_model):
+    cache = response_cached_model.response_cache
+    assert response_cached_model.generate('a', do_sample=False) == 'a and so on'
+    assert response_cached_model.generate('a', do_sample=False) == 'a and so on'
+    assert cache.stats()['hits'] == 1
+
+    response_cached_model.generate('a')
+    response_cached_model.generate('a', do_sample=True, temperature=0.7)
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_response_cache_results_are_copies(response_cached_model):
+    docs = DocumentArray([Document(tags={'prompt': 'a'})])
+    cache = response_cached_model.response_cache
+    cache.put('key', docs)
+    cache.get('key')[0].tags['prompt'] = 'b'
+    docs[0].tags['prompt'] = 'c'
+    assert cache.get('key')[0].tags['prompt'] == 'a'
+
+
+def test_response_cache_ttl(monkeypatch):
+    import inference_client.cache
+
+    now = [1000.0]
+    monkeypatch.setattr(inference_client.cache.time, 'time', lambda: now[0])
+    cache = ResponseCache(ttl=10)
+    cache.put('key', DocumentArray([Document(text='a')]))
+    now[0] += 5
+    assert cache.get('key') is not None
+    now[0] += 10
+    assert cache.get('key') is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_response_cache_disk_ttl(monkeypatch, tmp_path):
+    import inference_client.cache
+
+    now = [1000.0]
+    monkeypatch.setattr(inference_client.cache.time, 'time', lambda: now[0])
+    path = str(tmp_path / 'responses.db')
+    ResponseCache(ttl=10, path=path).put('key', DocumentArray([Document(text='a')]))
+    cache = ResponseCache(ttl=10, path=path)
+    now[0] += 8
+    assert cache.get('key') is not None
+    assert cache.stats()['disk_hits'] == 1
+    # the response loaded from disk expires when it was stored to, not 10 seconds after it was loaded
+    now[0] += 4
+    assert cache.get('key') is None
+
+
+def test_response_cache_sqlite(tmp_path):
+    path = str(tmp_path / 'responses.db')
+    cache = ResponseCache(max_entries=1, path=path)
+    cache.put('a', DocumentArray([Document(text='a')]))
+    cache.put('b', DocumentArray([Document(text='b')]))
+    # evicted from memory, still on disk
+    assert cache.get('a')[0].text == 'a'
+    assert cache.stats()['disk_hits'] == 1
+
+    reopened = ResponseCache(path=path)
+    assert reopened.get('b')[0].text == 'b'
+    assert reopened.stats()['disk_hits'] == 1
+
+    reopened.clear()
+    assert ResponseCache(path=path).get('a') is None
+
+    with pytest.raises(ValueError):
+        ResponseCache(max_entries=0)
+
+
+def test_response_cache_key():
+    cache = ResponseCache()
+
+    def _payload(on, **parameters):
+        return dict(
+            on=on,
+            inputs=DocumentArray([Document(tags={'prompt': 'a'})]),
+            parameters=parameters,
+        )
+
+    assert cache.key('m', _payload('/caption')) is not None
+    assert cache.key('m', _payload('/caption', do_sample=True)) is None
+    assert cache.key('m', _payload('/generate')) is None
+    assert cache.key('m', _payload('/generate', do_sample=False)) is not None
+    assert cache.key('m', _payload('/encode')) is None
+    assert cache.key('m', _payload('/vqa')) != cache.key('m', _payload('/caption'))
+    assert cache.key('m', _payload('/vqa')) != cache.key('n', _payload('/vqa'))
@@ -0,0 +1,101 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy
+import pytest
+from docarray import Document
+
+from inference_client import Client
+from inference_client.embeddings import assemble_embeddings
+
+from .executor import DummyExecutor
+
+IMAGE = os.path.join(os.path.dirname(__file__), 'test.jpeg')
+
+
+@pytest.fixture
+def model():
+    return Client().get_model(executor=DummyExecutor())
+
+
+def test_on_embeddings(make_client):
+    batches = []
+    result = make_client.encode(
+        text=[f'hello {i}' for i in range(10)],
+        batch_size=3,
+        output_dtype='float16',
+        normalize=True,
+        on_embeddings=lambda indices, embeddings: batches.append((indices, embeddings)),
+    )
+    assert result is None
+    assert [len(indices) for indices, _ in batches] == [3, 3, 3, 1]
+    embeddings = assemble_embeddings(batches, total=10)
+    assert embeddings.dtype == numpy.float16 and embeddings.shape == (10, 512)
+    assert numpy.allclose(numpy.linalg.norm(embeddings, axis=1), 1, atol=1e-2)
+
+
+def test_on_embeddings_with_on_done(model):
+    responses, positions = [], []
+    model.encode(
+        docs=(Document(text=f'hello {i}') for i in range(5)),
+        batch_size=2,
+        on_done=responses.append,
+        on_embeddings=lambda indices, embeddings: positions.extend(indices),
+    )
+    assert len(responses) == 3
+    assert sorted(positions) == list(range(5))
+    with pytest.raises(ValueError):
+        model.encode(text=['hello world'], chunk_size=1, on_embeddings=print)
+
+
+def test_on_captions_and_answers(model):
+    captions, answers = {}, {}
+    model.caption(
+        docs=[Document(uri=IMAGE) for _ in range(3)],
+        request_size=2,
+        on_captions=lambda indices, values: captions.update(zip(indices, values)),
+    )
+    assert captions == {i: 'A image of something very nice' for i in range(3)}
+    model.vqa(
+        docs=[Document(uri=IMAGE, tags={'prompt': 'cat?'}) for _ in range(2)],
+        on_answers=lambda indices, values: answers.update(zip(indices, values)),
+    )
+    assert answers == {0: 'Yes, it is a cat', 1: 'Yes, it is a cat'}
+
+
+def test_on_images(model):
+    images = {}
+    model.text_to_image(
+        docs=[Document(tags={'prompt': f'a cat {i}'}) for i in range(2)],
+        num_images_per_prompt=2,
+        on_images=lambda indices, values: images.update(zip(indices, values)),
+    )
+    assert sorted(images) == [0, 1]
+    assert all(len(i) == 2 and isinstance(i[0], bytes) for i in images.values())
+
+
+def test_callback_executor(model):
+    threads, calls = set(), []
+
+    def _slow(indices, embeddings):
+        threads.add(threading.current_thread().name)
+        time.sleep(0.05)
+        calls.append(indices)
+
+    with ThreadPoolExecutor(2, thread_name_prefix='consumer') as pool:
+        model.encode(
+            text=[f'hello {i}' for i in range(6)],
+            batch_size=2,
+            on_embeddings=_slow,
+            callback_executor=pool,
+        )
+    assert len(calls) == 3
+    assert all(name.startswith('consumer') for name in threads)
+
+    def _fail(indices, embeddings):
+        raise RuntimeError('consumer failed')
+
+    with pytest.raises(RuntimeError, match='consumer failed'):
+        model.encode(text=['hello', 'world'], batch_size=1, on_embeddings=_fail)
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from inference_client.tasks.chunking import chunk_texts, pool_segments, split_text
+
+
+def test_split_text():
+    text = 'one two  three four\nfive six seven'
+    assert split_text(text, 10) == [(text, 7)]
+    assert split_text(text, 3) == [
+        ('one two  three', 3),
+        ('four\nfive six', 3),
+        ('seven', 1),
+    ]
+    assert split_text(text, 3, overlap=1) == [
+        ('one two  three', 3),
+        ('three four\nfive', 3),
+        ('five six seven', 3),
+    ]
+    assert split_text(text, 4, overlap=2) == [
+        ('one two  three four', 4),
+        ('three four\nfive six', 4),
+        ('five six seven', 3),
+    ]
+    assert split_text('', 3) == [('', 0)]
+
+    with pytest.raises(ValueError):
+        split_text(text, 0)
+    with pytest.raises(ValueError):
+        split_text(text, 3, overlap=3)
+
+
+def test_chunk_texts():
+    windows, offsets, weights = chunk_texts(['a b c d e', 'f', 'g h'], 2)
+    assert windows == ['a b', 'c d', 'e', 'f', 'g h']
+    assert offsets.tolist() == [0, 3, 4]
+    assert weights.tolist() == [2, 2, 1, 1, 2]
+
+
+@pytest.mark.parametrize('pooling', ['mean', 'max', 'weighted'])
+def test_pool_segments(pooling):
+    rng = np.random.default_rng(0)
+    embeddings = rng.random((6, 4), dtype=np.float32)
+    offsets = np.array([0, 3, 4])
+    weights = np.array([2, 2, 1, 0, 5, 1])
+
+    pooled = pool_segments(embeddings, offsets, weights, pooling)
+    assert pooled.shape == (3, 4)
+    for i, (start, end) in enumerate(zip(offsets, [3, 4, 6])):
+        rows = embeddings[start:end]
+        if pooling == 'mean':
+            expected = rows.mean(axis=0)
+        elif pooling == 'max':
+            expected = rows.max(axis=0)
+        else:
+            w = np.maximum(weights[start:end], 1)
+            expected = (rows * w[:, None]).sum(axis=0) / w.sum()
+        np.testing.assert_allclose(pooled[i], expected, rtol=1e-6)
+
+    with pytest.raises(ValueError):
+        pool_segments(embeddings, offsets, weights, 'sum')
+
+
+def test_encode_chunked(make_client, mocker):
+    spy = mocker.spy(make_client, '_post')
+    texts = [' '.join(f'word{i}' for i in range(50)), 'short text']
+    embeddings = make_client.encode(
+        text=texts, chunk_size=20, chunk_overlap=5, batch_size=2, normalize=True
+    )
+    assert embeddings.shape == (2, 512)
+    np.testing.assert_allclose(np.linalg.norm(embeddings, axis=1), 1, rtol=1e-5)
+    assert len(spy.call_args.kwargs['inputs']) == 4
+
+    single = make_client.encode(text=texts[0], chunk_size=20, pooling='max')
+    assert single.shape == (512,)
+
+
+def test_encode_chunked_invalid(make_client):
+    with pytest.raises(ValueError):
+        make_client.encode(image=['a.jpg'], chunk_size=20)
+    with pytest.raises(ValueError):
+        make_client.encode(text=['a'], chunk_size=20, on_done=print)
+    with pytest.raises(ValueError):
+        make_client.encode(text=['a'], chunk_size=20, pooling='sum')
@@ -0,0 +1,137 @@
+import csv
+import io
+import json
+import os
+
+import numpy as np
+import pytest
+
+from inference_client.cli import NpyWriter, main, read_records
+
+IMAGE = os.path.join(os.path.dirname(__file__), 'test.jpeg')
+
+
+@pytest.fixture
+def model_args(make_flow):
+    return ['--model', f'grpc://0.0.0.0:{make_flow.port}']
+
+
+def _write_jsonl(path, records):
+    with open(path, 'w') as f:
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+    return str(path)
+
+
+def _read_jsonl(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_read_records(tmp_path):
+    records = [{'text': f'hello {i}'} for i in range(5)]
+    path = _write_jsonl(tmp_path / 'in.jsonl', records)
+    assert list(read_records(path, 'jsonl', 2)) == [
+        records[:2],
+        records[2:4],
+        records[4:],
+    ]
+
+    csv_path = tmp_path / 'in.csv'
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['text'])
+        writer.writeheader()
+        writer.writerows(records)
+    assert list(read_records(str(csv_path), 'csv', 10)) == [records]
+
+    stdin = io.StringIO('{"text": "a"}\n\n{"text": "b"}\n')
+    assert list(read_records('-', 'jsonl', 10, stdin=stdin)) == [
+        [{'text': 'a'}, {'text': 'b'}]
+    ]
+
+
+def test_npy_writer(tmp_path):
+    path = str(tmp_path / 'out.npy')
+    writer = NpyWriter(path)
+    chunks = [np.random.random((n, 4)).astype(np.float32) for n in (3, 0, 2)]
+    for chunk in chunks:
+        writer.write([{}] * len(chunk), list(chunk))
+    writer.close()
+    np.testing.assert_array_equal(np.load(path), np.concatenate(chunks))
+
+
+def test_cli_encode_jsonl(model_args, tmp_path, capsys):
+    records = [{'id': i, 'text': f'hello {i}'} for i in range(10)]
+    records[3] = {'id': 3, 'image': IMAGE}
+    path = _write_jsonl(tmp_path / 'in.jsonl', records)
+    output = str(tmp_path / 'out.jsonl')
+    main(
+        ['encode', *model_args, '-i', path, '-o', output, '--chunk-size', '3']
+        + ['--concurrency', '2']
+    )
+    lines = _read_jsonl(output)
+    assert [line['id'] for line in lines] == list(range(10))
+    assert all(len(line['embedding']) == 512 for line in lines)
+    assert '10 records in' in capsys.readouterr().err
+
+
+def test_cli_encode_npy(model_args, tmp_path):
+    path = _write_jsonl(tmp_path / 'in.jsonl', [{'text': f'{i}'} for i in range(7)])
+    output = str(tmp_path / 'out.npy')
+    main(['encode', *model_args, '-i', path, '-o', output, '--chunk-size', '4'])
+    assert np.load(output).shape == (7, 512)
+
+
+def test_cli_caption_csv_stdin(model_args, monkeypatch, capsys):
+    monkeypatch.setattr('sys.stdin', io.StringIO(f'id,image\na,{IMAGE}\nb,{IMAGE}\n'))
+    main(['caption', *model_args, '--input-format', 'csv', '-p', 'show_progress=true'])
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert lines == [
+        {'id': 'a', 'response': 'A image of something very nice'},
+        {'id': 'b', 'response': 'A image of something very nice'},
+    ]
+
+
+def test_cli_vqa_and_generate(model_args, tmp_path):
+    path = _write_jsonl(tmp_path / 'vqa.jsonl', [{'image': IMAGE, 'question': 'a?'}])
+    output = str(tmp_path / 'vqa_out.jsonl')
+    main(['vqa', *model_args, '-i', path, '-o', output])
+    assert _read_jsonl(output) == [{'response': 'Yes, it is a cat'}]
+
+    prompts = [{'prompt': f'p{i}'} for i in range(5)]
+    path = _write_jsonl(tmp_path / 'generate.jsonl', prompts)
+    output = str(tmp_path / 'generate_out.jsonl')
+    main(['generate', *model_args, '-i', path, '-o', output, '-p', 'do_sample=false'])
+    assert [line['response'] for line in _read_jsonl(output)] == [
+        f'p{i} and so on' for i in range(5)
+    ]
+
+
+def test_cli_errors(model_args, tmp_path, capsys):
+    path = _write_jsonl(tmp_path / 'in.jsonl', [{'text': 'a'}])
+    with pytest.raises(SystemExit):
+        main(['caption', *model_args, '-i', path])
+    assert 'Record 0 has no `image` field.' in capsys.readouterr().err
+
+    with pytest.raises(SystemExit):
+        main(['caption', *model_args, '-i', path, '-o', str(tmp_path / 'out.npy')])
+    with pytest.raises(SystemExit):
+        main(['upscale', *model_args, '-i', path])
+    with pytest.raises(SystemExit):
+        main(['encode', *model_args, '-i', path, '-p', 'no-value'])
+
+
+def test_cli_parquet(model_args, tmp_path):
+    pa = pytest.importorskip('pyarrow')
+    import pyarrow.parquet as pq
+
+    path = str(tmp_path / 'in.parquet')
+    pq.write_table(pa.table({'id': [1, 2, 3], 'text': ['a', 'b', 'c']}), path)
+    output = str(tmp_path / 'out.parquet')
+    main(['encode', *model_args, '-i', path, '-o', output, '--chunk-size', '2'])
+    table = pq.read_table(output)
+    assert table.column('id').to_pylist() == [1, 2, 3]
+    assert np.stack(table.column('embedding').to_numpy(zero_copy_only=False)).shape == (
+        3,
+        512,
+    )
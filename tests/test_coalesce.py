@@ -0,0 +1,97 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from docarray import Document, DocumentArray
+
+from inference_client.coalesce import SingleFlight
+from inference_client.model import Model
+from inference_client.tasks.helper import get_doc_fingerprint, get_payload_fingerprint
+
+
+@pytest.fixture
+def make_coalescing_client(make_flow):
+    return Model(
+        model_name='dummy-model',
+        token='valid_token',
+        host=f'grpc://0.0.0.0:{make_flow.port}',
+        coalesce=True,
+    )
+
+
+def test_doc_fingerprint():
+    assert get_doc_fingerprint(Document(text='hello')) == get_doc_fingerprint(
+        Document(text='hello')
+    )
+    assert get_doc_fingerprint(Document(text='hello')) != get_doc_fingerprint(
+        Document(text='hello', tags={'prompt': 'what'})
+    )
+    assert get_doc_fingerprint(Document(tensor=np.zeros(3))) != get_doc_fingerprint(
+        Document(tensor=np.zeros((3, 1)))
+    )
+    assert get_doc_fingerprint(
+        Document(text='a', matches=[Document(text='b')])
+    ) == get_doc_fingerprint(Document(text='a', matches=[Document(text='b')]))
+
+
+def test_payload_fingerprint():
+    payload = dict(on='/caption', parameters={'a': 1, 'b': 2})
+    assert get_payload_fingerprint(
+        dict(payload, inputs=DocumentArray([Document(text='hello')]))
+    ) == get_payload_fingerprint(
+        dict(
+            on='/caption',
+            parameters={'b': 2, 'a': 1},
+            inputs=DocumentArray([Document(text='hello')]),
+        )
+    )
+    assert get_payload_fingerprint(
+        dict(payload, inputs=DocumentArray([Document(text='hello')]))
+    ) != get_payload_fingerprint(
+        dict(payload, on='/vqa', inputs=DocumentArray([Document(text='hello')]))
+    )
+    assert get_payload_fingerprint(dict(payload, inputs=iter([]))) is None
+
+
+def test_single_flight():
+    single_flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def _fn():
+        calls.append(1)
+        started.set()
+        release.wait()
+        return 'result'
+
+    with ThreadPoolExecutor(4) as pool:
+        leader = pool.submit(single_flight.do, 'key', _fn)
+        started.wait()
+        followers = [pool.submit(single_flight.do, 'key', _fn) for _ in range(3)]
+        while single_flight.coalesced < 3:
+            pass
+        release.set()
+
+    assert leader.result() == ('result', True)
+    assert [f.result() for f in followers] == [('result', False)] * 3
+    assert len(calls) == 1
+    assert single_flight.do('key', lambda: 'again') == ('again', True)
+
+
+def test_single_flight_error():
+    single_flight = SingleFlight()
+    with pytest.raises(ValueError):
+        single_flight.do('key', lambda: (_ for _ in ()).throw(ValueError()))
+    assert single_flight.do('key', lambda: 'ok') == ('ok', True)
+
+
+def test_coalesced_calls(make_coalescing_client):
+    image = f'{os.path.dirname(os.path.abspath(__file__))}/test.jpeg'
+    with ThreadPoolExecutor(8) as pool:
+        results = list(
+            pool.map(lambda _: make_coalescing_client.caption(image=image), range(16))
+        )
+    assert results == ['A image of something very nice'] * 16
+    assert make_coalescing_client.encode(text=['hello', 'world']).shape == (2, 512)
@@ -0,0 +1,114 @@
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import grpc
+import numpy as np
+import pytest
+from docarray import Document, DocumentArray
+from PIL import Image
+
+from inference_client.compression import (
+    CompressionClients,
+    Compressor,
+    compress_tensor,
+)
+from inference_client.model import Model
+
+IMAGE = f'{os.path.dirname(os.path.abspath(__file__))}/test.jpeg'
+
+
+@pytest.fixture
+def image_tensor():
+    return Document(uri=IMAGE).load_uri_to_image_tensor().tensor
+
+
+@pytest.fixture
+def make_compressed_client(make_flow):
+    def _make(**kwargs):
+        return Model(
+            model_name='dummy-model',
+            token='valid_token',
+            host=f'grpc://0.0.0.0:{make_flow.port}',
+            **kwargs,
+        )
+
+    return _make
+
+
+def test_compress_tensor_lossless(image_tensor):
+    doc = Document(tensor=image_tensor)
+    compressed = compress_tensor(doc)
+    assert compressed.id == doc.id
+    assert compressed.tensor is None
+    assert doc.tensor is image_tensor
+    np.testing.assert_array_equal(
+        np.asarray(Image.open(io.BytesIO(compressed.blob))), image_tensor
+    )
+
+
+@pytest.mark.parametrize(
+    'tensor',
+    [np.random.random((100, 100, 3)), np.zeros((100, 100, 2), dtype=np.uint8)],
+)
+def test_compress_tensor_skips_non_images(tensor):
+    doc = Document(tensor=tensor)
+    assert compress_tensor(doc) is doc
+
+
+def test_compress_tensor_threshold(image_tensor):
+    doc = Document(tensor=image_tensor)
+    assert compress_tensor(doc, threshold=image_tensor.nbytes + 1) is doc
+
+
+def test_threshold():
+    compressor = Compressor('gzip', threshold=1000)
+    small = compressor.apply(inputs=DocumentArray([Document(text='hello')]))
+    assert 'compression' not in small
+    large = compressor.apply(inputs=DocumentArray([Document(text='a' * 1000)]))
+    assert large['compression'] == 'Gzip'
+    docs = [Document(text='hello'), Document(text='a' * 1000)]
+    streamed = compressor.apply(inputs=iter(docs), request_size=1)
+    assert 'compression' not in streamed
+    assert list(streamed['inputs']) == docs
+    streamed = compressor.apply(inputs=iter(docs), request_size=2)
+    assert streamed['compression'] == 'Gzip'
+    assert list(streamed['inputs']) == docs
+
+
+def test_invalid_compression():
+    with pytest.raises(ValueError):
+        Compressor('zstd')
+
+
+@pytest.mark.parametrize('compression', ['gzip', 'deflate'])
+def test_compressed_encode(make_compressed_client, image_tensor, compression):
+    model = make_compressed_client(compression=compression)
+    assert model.encode(image=[image_tensor] * 4).shape == (4, 512)
+    assert model.encode(text='hello').shape == (512,)
+
+
+def test_compressed_upscale(make_compressed_client, image_tensor):
+    model = make_compressed_client(compression='gzip')
+    res = model.upscale(image=image_tensor)
+    assert Image.open(io.BytesIO(res)).size == (800, 800)
+
+
+def test_compression_clients(make_compressed_client, image_tensor):
+    model = make_compressed_client(compression='gzip', compression_threshold=1000)
+    assert isinstance(model.client, CompressionClients)
+    with ThreadPoolExecutor(4) as pool:
+        results = list(
+            pool.map(
+                lambda i: model.encode(image=image_tensor)
+                if i % 2
+                else model.encode(text='a'),
+                range(8),
+            )
+        )
+    assert all(r.shape == (512,) for r in results)
+    # the calls of each compression are sent by a client of their own
+    clients = model.client._clients
+    assert set(clients) == {'Gzip', None}
+    assert clients['Gzip'].compression == grpc.Compression.Gzip
+    assert clients[None].compression == grpc.Compression.NoCompression
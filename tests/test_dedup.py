@@ -0,0 +1,191 @@
+import io
+import os
+
+import numpy as np
+import pytest
+from docarray import Document, DocumentArray
+from PIL import Image
+
+from inference_client.dedup import (
+    Deduplicator,
+    PerceptualDeduplicator,
+    hamming_distances,
+    perceptual_hashes,
+)
+from inference_client.model import Model
+
+
+@pytest.fixture
+def counting_model(make_flow):
+    model = Model(
+        model_name='dummy-model',
+        token='valid_token',
+        host=f'grpc://0.0.0.0:{make_flow.port}',
+        deduplicate=True,
+    )
+    model.sent = []
+    post = model._coalesce
+
+    def _coalesce(**payload):
+        inputs = list(payload.pop('inputs'))
+        model.sent.extend(inputs)
+        return post(inputs=DocumentArray(inputs), **payload)
+
+    model._coalesce = _coalesce
+    return model
+
+
+def test_deduplicator():
+    docs = DocumentArray(
+        [Document(text='a'), Document(text='b'), Document(text='a'), Document(text='a')]
+    )
+    deduplicator = Deduplicator()
+    unique = DocumentArray(deduplicator.filter(docs))
+    assert unique.texts == ['a', 'b']
+    assert deduplicator.duplicates == 2
+
+    result = DocumentArray(
+        [Document(id=unique[1].id, text='B'), Document(id=unique[0].id, text='A')]
+    )
+    output = deduplicator.scatter(result)
+    assert output[:, 'id'] == docs[:, 'id']
+    assert output.texts == ['A', 'B', 'A', 'A']
+
+    output[2].text = 'changed'
+    assert output[0].text == output[3].text == 'A'
+
+
+def test_deduplicator_without_duplicates():
+    deduplicator = Deduplicator()
+    docs = DocumentArray([Document(text='a'), Document(text='b')])
+    assert list(deduplicator.filter(docs)) == list(docs)
+    assert deduplicator.scatter(docs) is docs
+
+
+def test_encode_text_duplicates(counting_model):
+    texts = ['a', 'b', 'a', 'c', 'b', 'a']
+    embeddings = counting_model.encode(text=texts, batch_size=2)
+    assert embeddings.shape == (6, 512)
+    assert len(counting_model.sent) == 3
+    # the dummy model returns random embeddings, so equal rows were computed once
+    np.testing.assert_array_equal(embeddings[0], embeddings[2])
+    np.testing.assert_array_equal(embeddings[0], embeddings[5])
+    np.testing.assert_array_equal(embeddings[1], embeddings[4])
+    assert not np.array_equal(embeddings[0], embeddings[1])
+
+
+def test_encode_docs_duplicates(counting_model):
+    docs = [Document(text='a'), Document(text='b'), Document(text='a')]
+    result = counting_model.encode(docs=docs)
+    assert len(counting_model.sent) == 2
+    assert result[:, 'id'] == [d.id for d in docs]
+    np.testing.assert_array_equal(result[0].embedding, result[2].embedding)
+
+
+def test_generate_duplicates(counting_model):
+    assert counting_model.generate(['a', 'b', 'a'], do_sample=False) == [
+        'a and so on',
+        'b and so on',
+        'a and so on',
+    ]
+    assert len(counting_model.sent) == 2
+
+
+def test_sampling_not_deduplicated(counting_model):
+    counting_model.generate(['a', 'a'], do_sample=True)
+    assert len(counting_model.sent) == 2
+    prompts = [Document(tags={'prompt': 'a cat'}) for _ in range(2)]
+    counting_model.text_to_image(docs=prompts)
+    assert len(counting_model.sent) == 4
+    counting_model.text_to_image(docs=prompts, seed=1)
+    assert len(counting_model.sent) == 5
+
+
+def test_deduplicate_disabled(make_flow, counting_model):
+    assert not Model(
+        'dummy-model', 'valid_token', f'grpc://0.0.0.0:{make_flow.port}'
+    ).deduplicate
+    counting_model.deduplicate = False
+    embeddings = counting_model.encode(text=['a', 'a'])
+    assert len(counting_model.sent) == 2
+    assert not np.array_equal(embeddings[0], embeddings[1])
+
+
+def _image_bytes(image, size=None, quality=90):
+    if size:
+        image = image.resize(size)
+    buffer = io.BytesIO()
+    image.save(buffer, format='jpeg', quality=quality)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def photos():
+    image = Image.open(os.path.join(os.path.dirname(__file__), 'test.jpeg'))
+    image = image.convert('RGB')
+    other = image.transpose(Image.ROTATE_90)
+    return [
+        _image_bytes(image),
+        _image_bytes(image, size=(image.width // 2, image.height // 2)),
+        _image_bytes(other),
+        _image_bytes(image, quality=40),
+    ]
+
+
+@pytest.mark.parametrize('method', ['ahash', 'phash'])
+def test_perceptual_hashes(photos, method):
+    deduplicator = PerceptualDeduplicator(threshold=6, method=method)
+    docs = DocumentArray([Document(blob=b) for b in photos])
+    unique = DocumentArray(deduplicator.filter(docs))
+    assert [d.id for d in unique] == [docs[0].id, docs[2].id]
+    assert deduplicator.sources == {docs[1].id: docs[0].id, docs[3].id: docs[0].id}
+
+
+def test_perceptual_deduplicator_context(photos):
+    deduplicator = PerceptualDeduplicator(threshold=6)
+    docs = DocumentArray(
+        [
+            Document(blob=photos[0], tags={'prompt': 'a cat?'}),
+            Document(blob=photos[1], tags={'prompt': 'a dog?'}),
+            Document(blob=photos[1], tags={'prompt': 'a cat?'}),
+            Document(text='a'),
+            Document(text='a'),
+        ]
+    )
+    unique = DocumentArray(deduplicator.filter(docs))
+    assert unique[:, 'id'] == docs[[0, 1, 3], 'id']
+
+    with pytest.raises(ValueError):
+        PerceptualDeduplicator(method='md5')
+
+
+def test_hamming_distances():
+    hashes = np.array([[0] * 8, [255] * 8, [1] + [0] * 7], dtype=np.uint8)
+    assert hamming_distances(hashes, hashes[0]).tolist() == [0, 64, 1]
+    assert perceptual_hashes(np.zeros((3, 32, 32))).shape == (3, 8)
+
+
+def test_encode_near_duplicates(counting_model, photos):
+    counting_model.near_duplicate_threshold = 6
+    embeddings = counting_model.encode(image=photos)
+    assert embeddings.shape == (4, 512)
+    assert len(counting_model.sent) == 2
+    np.testing.assert_array_equal(embeddings[0], embeddings[1])
+    np.testing.assert_array_equal(embeddings[0], embeddings[3])
+    assert not np.array_equal(embeddings[0], embeddings[2])
+
+
+def test_caption_near_duplicates(counting_model, photos):
+    counting_model.near_duplicate_threshold = 6
+    docs = [Document(blob=b) for b in photos]
+    result = counting_model.caption(docs=docs)
+    assert len(counting_model.sent) == 2
+    assert result[:, 'id'] == [d.id for d in docs]
+    assert set(result[:, 'tags__response']) == {'A image of something very nice'}
+
+
+def test_invalid_perceptual_hash():
+    with pytest.raises(ValueError):
+        Model(
+            model_name='m', token=None, host='grpc://0.0.0.0:1', perceptual_hash='md5'
+        )
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from inference_client.embeddings import (
+    QuantizedEmbeddings,
+    assemble_embeddings,
+    convert_embeddings,
+)
+
+
+@pytest.fixture
+def embeddings():
+    return np.random.default_rng(0).normal(size=(16, 64)).astype(np.float32)
+
+
+def test_convert_keeps_embeddings(embeddings):
+    assert convert_embeddings(embeddings) is embeddings
+
+
+@pytest.mark.parametrize('output_dtype', ['float32', 'float16'])
+def test_convert_float(embeddings, output_dtype):
+    res = convert_embeddings(embeddings, output_dtype=output_dtype)
+    assert res.dtype == output_dtype
+    np.testing.assert_allclose(res, embeddings, rtol=1e-3)
+
+
+def test_convert_normalize(embeddings):
+    res = convert_embeddings(embeddings, normalize=True)
+    np.testing.assert_allclose(np.linalg.norm(res, axis=1), 1, rtol=1e-5)
+
+
+def test_convert_int8(embeddings):
+    res = convert_embeddings(embeddings, output_dtype='int8', normalize=True)
+    assert isinstance(res, QuantizedEmbeddings)
+    assert res.codes.dtype == np.int8 and res.codes.shape == (16, 64)
+    assert res.scales.shape == (16,)
+    assert np.abs(res.codes).max() == 127
+    normalized = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    np.testing.assert_allclose(res.dequantize(), normalized, atol=res.scales.max())
+
+
+def test_convert_single(embeddings):
+    res = convert_embeddings(embeddings[0], output_dtype='int8')
+    assert res.codes.shape == (64,)
+    assert res.scales.shape == ()
+    assert convert_embeddings(embeddings[0], output_dtype='float16').shape == (64,)
+
+
+def test_convert_zero_vector():
+    res = convert_embeddings(np.zeros((2, 4)), output_dtype='int8', normalize=True)
+    assert not np.isnan(res.dequantize()).any()
+
+
+@pytest.mark.parametrize('output_dtype', [None, 'float16', 'int8'])
+def test_convert_leaves_input_unchanged(embeddings, output_dtype):
+    original = embeddings.copy()
+    convert_embeddings(embeddings, output_dtype=output_dtype, normalize=True)
+    np.testing.assert_array_equal(embeddings, original)
+    integers = np.array([[3, 4]])
+    convert_embeddings(integers, output_dtype='int8', normalize=True)
+    np.testing.assert_array_equal(integers, [[3, 4]])
+
+
+def test_convert_invalid_dtype(embeddings):
+    with pytest.raises(ValueError):
+        convert_embeddings(embeddings, output_dtype='int4')
+
+
+def test_assemble(embeddings):
+    batches = [(np.array([4, 5]), embeddings[4:6]), (np.arange(4), embeddings[:4])]
+    res = assemble_embeddings(batches, total=6)
+    np.testing.assert_array_equal(res, embeddings[:6])
+    assert res.dtype == embeddings.dtype
+
+    out = np.zeros((8, 64), dtype=np.float32)
+    assert assemble_embeddings(batches, out=out) is out
+    np.testing.assert_array_equal(out[:6], embeddings[:6])
+
+    assert assemble_embeddings([], total=3).shape == (3, 0)
+    with pytest.raises(ValueError):
+        assemble_embeddings(batches)
+
+
+def test_assemble_quantized(embeddings):
+    quantized = convert_embeddings(embeddings, output_dtype='int8')
+    batches = [
+        (
+            np.arange(8, 16),
+            QuantizedEmbeddings(quantized.codes[8:], quantized.scales[8:]),
+        ),
+        (np.arange(8), QuantizedEmbeddings(quantized.codes[:8], quantized.scales[:8])),
+    ]
+    res = assemble_embeddings(batches, total=16)
+    assert isinstance(res, QuantizedEmbeddings)
+    np.testing.assert_array_equal(res.codes, quantized.codes)
+    np.testing.assert_array_equal(res.scales, quantized.scales)
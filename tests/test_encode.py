@@ -1,6 +1,8 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import Mock, patch
 
+import numpy as np
 import pytest
 from docarray import Document, DocumentArray
 
@@ -101,6 +103,40 @@ def test_encode_plain_image_list(make_client, inputs):
     assert res[1].shape == (512,)
 
 
+@pytest.mark.parametrize('output_dtype', ['float32', 'float16'])
+def test_encode_output_dtype(make_client, output_dtype):
+    res = make_client.encode(
+        text=['hello world', 'hello jina'], output_dtype=output_dtype, normalize=True
+    )
+    assert res.dtype == output_dtype
+    assert res.shape == (2, 512)
+    np.testing.assert_allclose(np.linalg.norm(res, axis=1), 1, rtol=1e-3)
+
+
+def test_encode_output_int8(make_client):
+    res = make_client.encode(text='hello world', output_dtype='int8')
+    assert res.codes.dtype == np.int8
+    assert res.codes.shape == (512,)
+    assert res.dequantize().shape == (512,)
+
+
+def test_encode_docs_output_dtype(make_client):
+    docs = DocumentArray([Document(text='hello world'), Document(text='hello jina')])
+    res = make_client.encode(docs=docs, output_dtype='float16', normalize=True)
+    assert res.embeddings.dtype == np.float16
+    np.testing.assert_allclose(np.linalg.norm(res.embeddings, axis=1), 1, rtol=1e-3)
+
+    with pytest.raises(ValueError, match='int8'):
+        make_client.encode(docs=docs, output_dtype='int8')
+
+
+def test_encode_invalid_output_dtype(make_client):
+    with pytest.raises(ValueError, match='got `uint8`'):
+        make_client.encode(text='hello world', output_dtype='uint8')
+    with pytest.raises(ValueError, match='got `uint8`'):
+        make_client.encode_unordered(text=['hello world'], output_dtype='uint8')
+
+
 @pytest.mark.slow
 def test_custom_on_done(make_client, mocker):
     on_done_mock = mocker.Mock()
@@ -135,3 +171,15 @@ def test_custom_on_error(make_error_client, mocker):
     on_done_mock.assert_not_called()
     on_error_mock.assert_called_once()
     on_always_mock.assert_called_once()
+
+
+def test_encode_concurrent_results_in_order(make_client):
+    def _encode(i):
+        payload, _, _ = make_client._get_enocde_payload(
+            text=[f'hello {i} {j}' for j in range(5)], batch_size=2
+        )
+        return [d.id for d in payload['inputs']], make_client._post(**payload)
+
+    with ThreadPoolExecutor(8) as pool:
+        for ids, res in pool.map(_encode, range(32)):
+            assert [d.id for d in res] == ids
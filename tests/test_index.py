@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from inference_client import EmbeddingIndex
+from inference_client.embeddings import convert_embeddings
+
+
+@pytest.fixture
+def embeddings():
+    return np.random.default_rng(0).normal(size=(100, 16)).astype(np.float32)
+
+
+def _brute_force(embeddings, queries, top_k):
+    x = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    q = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    return np.argsort(-(q @ x.T), axis=1)[:, :top_k]
+
+
+@pytest.mark.parametrize('chunk_size', [7, 100, 1000])
+def test_top_k(embeddings, chunk_size):
+    index = EmbeddingIndex(embeddings, chunk_size=chunk_size)
+    queries = embeddings[:3] + 0.01
+    scores, indices = index.top_k(queries, top_k=5)
+    assert scores.shape == indices.shape == (3, 5)
+    np.testing.assert_array_equal(indices, _brute_force(embeddings, queries, 5))
+    assert (np.diff(scores, axis=1) <= 0).all()
+
+
+def test_search_ids(embeddings):
+    ids = [f'doc-{i}' for i in range(len(embeddings))]
+    index = EmbeddingIndex(embeddings, ids=ids)
+    res = index.search(embeddings[42], top_k=3)
+    assert len(res) == 3
+    assert res[0][0] == 'doc-42'
+    assert res[0][1] == pytest.approx(1, abs=1e-5)
+
+    res = index.search(embeddings[:2], top_k=20)
+    assert [r[0][0] for r in res] == ['doc-0', 'doc-1']
+    assert all(len(r) == 20 for r in res)
+
+
+def test_top_k_larger_than_index(embeddings):
+    index = EmbeddingIndex(embeddings[:4], chunk_size=3)
+    _, indices = index.top_k(embeddings[0], top_k=10)
+    assert sorted(indices[0]) == [0, 1, 2, 3]
+
+
+def test_inputs_unchanged(embeddings):
+    original = embeddings.copy()
+    index = EmbeddingIndex(embeddings)
+    index.top_k(embeddings[0], top_k=3)
+    np.testing.assert_array_equal(embeddings, original)
+    with pytest.raises(ValueError):
+        index.top_k(embeddings[0], top_k=0)
+
+
+def test_quantized(embeddings):
+    index = EmbeddingIndex(convert_embeddings(embeddings, output_dtype='int8'))
+    scores, indices = index.top_k(embeddings[:5], top_k=1)
+    assert list(indices[:, 0]) == list(range(5))
+    np.testing.assert_allclose(scores[:, 0], 1, atol=1e-2)
+
+
+def test_invalid_ids(embeddings):
+    with pytest.raises(ValueError):
+        EmbeddingIndex(embeddings, ids=['a'])
+
+
+@pytest.mark.parametrize('output_dtype', [None, 'int8'])
+def test_save_load_mmap(embeddings, tmp_path, output_dtype):
+    index = EmbeddingIndex(
+        convert_embeddings(embeddings, output_dtype=output_dtype),
+        ids=list(range(100, 200)),
+    )
+    index.save(str(tmp_path))
+    loaded = EmbeddingIndex.load(str(tmp_path), mmap=True, chunk_size=13)
+    assert isinstance(loaded._embeddings, np.memmap)
+    expected_scores, expected_indices = index.top_k(embeddings[:4], top_k=5)
+    scores, indices = loaded.top_k(embeddings[:4], top_k=5)
+    np.testing.assert_array_equal(indices, expected_indices)
+    np.testing.assert_allclose(scores, expected_scores, rtol=1e-5)
+    assert loaded.search(embeddings[0], top_k=1)[0][0] == 100
+
+
+def test_encode_and_search(make_flow):
+    from inference_client.model import Model
+
+    model = Model(
+        model_name='dummy-model',
+        token='valid_token',
+        host=f'grpc://0.0.0.0:{make_flow.port}',
+    )
+    texts = [f'hello {i}' for i in range(10)]
+    index = EmbeddingIndex(model.encode(text=texts), ids=texts)
+    res = index.search(model.encode(text='hello'), top_k=3)
+    assert len(res) == 3
+    assert all(r[0] in texts for r in res)
@@ -0,0 +1,84 @@
+import os
+
+import numpy as np
+import pytest
+from docarray import Document, DocumentArray
+from jina import Executor, requests
+
+from inference_client import Client
+from inference_client.local import LocalTransport
+
+from .executor import DummyExecutor, ErrorExecutor
+
+IMAGE = os.path.join(os.path.dirname(__file__), 'test.jpeg')
+
+
+class AsyncExecutor(Executor):
+    @requests(on='/caption')
+    async def caption(self, docs, **kwargs):
+        return DocumentArray(
+            Document(id=d.id, tags={'response': d.text.upper()}) for d in docs
+        )
+
+
+@pytest.fixture
+def local_model():
+    return Client().get_model(executor=DummyExecutor())
+
+
+def test_local_model(local_model):
+    assert isinstance(local_model.client, LocalTransport)
+    assert local_model.host == 'local'
+    assert Client().get_model('my-model', executor=DummyExecutor).host == 'my-model'
+
+    embeddings = local_model.encode(text=[f'hello {i}' for i in range(5)], batch_size=2)
+    assert embeddings.shape == (5, 512)
+    assert local_model.caption(image=IMAGE) == 'A image of something very nice'
+    assert local_model.vqa(image=IMAGE, question='Is it a cat?') == 'Yes, it is a cat'
+    assert local_model.generate(prompt='once', do_sample=False) == 'once and so on'
+    assert len(local_model.text_to_image(prompt='a cat', num_images_per_prompt=2)) == 2
+
+
+def test_local_inputs_unchanged(local_model):
+    docs = DocumentArray([Document(uri=IMAGE).load_uri_to_blob() for _ in range(3)])
+    result = local_model.caption(docs=docs, batch_size=2)
+    assert result[:, 'id'] == docs[:, 'id']
+    assert all(d.tags['response'] for d in result)
+    assert all(d.blob and 'response' not in d.tags for d in docs)
+
+
+def test_local_callbacks(local_model):
+    sizes = []
+    local_model.encode(
+        text=[f'hello {i}' for i in range(5)],
+        batch_size=2,
+        on_done=lambda r: sizes.append(len(r.docs)),
+    )
+    assert sizes == [2, 2, 1]
+
+
+def test_local_async_executor():
+    model = Client().get_model(executor=AsyncExecutor())
+    docs = DocumentArray([Document(text='a', uri=IMAGE), Document(text='b', uri=IMAGE)])
+    assert model.caption(docs=docs)[:, 'tags__response'] == ['A', 'B']
+
+
+def test_local_errors():
+    model = Client().get_model(executor=ErrorExecutor())
+    with pytest.raises(NotImplementedError):
+        model.encode(text=['a'])
+
+    errors = []
+    model.encode(text=['a', 'b'], batch_size=1, on_error=errors.append)
+    assert len(errors) == 2
+    assert errors[0].status.exception.name == 'NotImplementedError'
+
+    model = Client().get_model(executor=AsyncExecutor())
+    with pytest.raises(ValueError, match='no `/encode` endpoint'):
+        model.encode(text=['a'])
+
+
+def test_local_ignores_compression():
+    model = Client().get_model(executor=DummyExecutor(), compression='gzip')
+    image = np.random.randint(0, 255, (32, 32, 3), dtype=np.uint8)
+    assert model.encode(image=[image]).shape == (1, 512)
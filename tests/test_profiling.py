@@ -0,0 +1,66 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from docarray import Document
+
+from inference_client import Client
+from inference_client.config import Settings
+from inference_client.model import Model
+from inference_client import profiling
+from inference_client.profiling import CATEGORIES, Profiler
+
+from .executor import DummyExecutor
+
+IMAGE = os.path.join(os.path.dirname(__file__), 'test.jpeg')
+
+
+def test_profile_calls(make_client):
+    with make_client.profile(top=5) as profiler:
+        make_client.caption(docs=[Document(uri=IMAGE) for _ in range(3)])
+        make_client.encode(text=[f'hello {i}' for i in range(8)])
+    make_client.encode(text=['not profiled'])
+
+    assert [call['task'] for call in profiler.calls] == ['caption', 'encode']
+    caption, encode = profiler.calls
+    assert caption['wall_time'] >= caption['cpu_time'] > 0
+    assert caption['peak_memory'] > 0
+    assert set(caption['categories']) == {category for category, _ in CATEGORIES}
+    assert caption['categories']['input loading'] > 0
+    assert caption['categories']['serialization'] > 0
+    assert encode['categories']['result unboxing'] > 0
+    assert len(caption['hot_spots']) == 5
+    assert all(a['size'] > 0 for a in caption['allocations'])
+
+    report = profiler.report()
+    assert report.startswith('caption: ')
+    assert 'serialization' in report and 'encode: ' in report
+
+
+def test_profile_threads():
+    model = Client().get_model(executor=DummyExecutor())
+    with model.profile() as profiler:
+        with ThreadPoolExecutor(4) as pool:
+            list(pool.map(lambda i: model.encode(text=[f'hello {i}']), range(8)))
+    assert len(profiler.calls) == 8
+    assert model._profiler is None
+
+    # a call of another thread holds the CPU profiler
+    with profiling._cprofile_lock, model.profile() as profiler:
+        model.generate(prompt='once', do_sample=False)
+    (call,) = profiler.calls
+    assert not call['cpu_profiled'] and call['hot_spots'] == []
+    assert call['wall_time'] > 0
+    assert 'no CPU profile' in profiler.report()
+
+
+def test_profile_setting(monkeypatch, caplog):
+    monkeypatch.setenv('INFERENCE_CLIENT_PROFILE', '1')
+    settings = Settings()
+    assert settings.profile
+    monkeypatch.setattr('inference_client.model.settings', settings)
+
+    model = Model('dummy-model', 'token', 'local', executor=DummyExecutor())
+    assert isinstance(model._profiler, Profiler)
+    with caplog.at_level('INFO', logger='inference-client'):
+        model.generate(prompt='once', do_sample=False)
+    assert 'generate: ' in caplog.text
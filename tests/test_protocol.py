@@ -0,0 +1,153 @@
+from unittest.mock import Mock, patch
+
+import pytest
+from docarray import Document, DocumentArray
+from jina import Flow
+
+from inference_client import Client
+from inference_client.model import Model
+from inference_client.protocol import PROTOCOLS, ProtocolSelector, get_protocol
+
+from .executor import DummyExecutor
+
+
+@pytest.fixture(scope='module')
+def make_multi_protocol_flow(port_generator):
+    ports = [port_generator() for _ in PROTOCOLS]
+    f = Flow(protocol=list(PROTOCOLS), port=ports).add(name='dummy', uses=DummyExecutor)
+    with f:
+        yield {p: f'{p}://0.0.0.0:{port}' for p, port in zip(PROTOCOLS, ports)}
+
+
+def test_probe(make_multi_protocol_flow):
+    selector = ProtocolSelector(make_multi_protocol_flow, probes=2)
+    timings = selector.probe()
+    assert set(timings) == set(PROTOCOLS)
+    assert all(t > 0 for t in timings.values())
+    assert selector.protocol == min(timings, key=timings.get)
+
+
+@pytest.mark.parametrize('protocol', PROTOCOLS)
+def test_encode_with_protocol(make_multi_protocol_flow, protocol):
+    model = Model(
+        model_name='dummy-model',
+        token='valid_token',
+        host=make_multi_protocol_flow['grpc'],
+        protocols={protocol: make_multi_protocol_flow[protocol]},
+    )
+    assert model.client.protocol == protocol
+    res = model.encode(text=['hello', 'world'])
+    assert res.shape == (2, 512)
+
+
+def test_unreachable_endpoint_last(make_multi_protocol_flow, port_generator):
+    selector = ProtocolSelector(
+        {
+            'grpc': f'grpc://0.0.0.0:{port_generator()}',
+            'http': make_multi_protocol_flow['http'],
+        },
+        probes=1,
+    )
+    assert selector.probe()['grpc'] is None
+    assert selector.protocol == 'http'
+
+
+def test_fallback(make_multi_protocol_flow, port_generator):
+    selector = ProtocolSelector(
+        {
+            'grpc': f'grpc://0.0.0.0:{port_generator()}',
+            'websocket': make_multi_protocol_flow['websocket'],
+        }
+    )
+    # pretend the gRPC endpoint went down after probing
+    selector.timings = {'grpc': 0.001, 'websocket': 0.01}
+    selector._order = ['grpc', 'websocket']
+
+    res = selector.post(
+        on='/encode',
+        inputs=DocumentArray([Document(text='hello')]),
+        metadata=(('authorization', 'valid_token'),),
+    )
+    assert len(res) == 1
+    assert selector.fallbacks == 1
+    assert selector.protocol == 'websocket'
+
+
+def test_no_endpoint():
+    with pytest.raises(ValueError):
+        ProtocolSelector({'foo': 'bar://0.0.0.0:1234'})
+
+
+def test_get_model_auto(make_multi_protocol_flow):
+    with patch(
+        'inference_client.client.get_model_spec',
+        Mock(return_value={'endpoints': dict(make_multi_protocol_flow)}),
+    ):
+        model = Client().get_model('dummy-model', protocol='auto')
+    assert isinstance(model.client, ProtocolSelector)
+    assert model.client.endpoints == make_multi_protocol_flow
+    assert model.encode(text='hello').shape == (512,)
+    assert model.client.protocol in PROTOCOLS
+
+
+def test_get_model_protocol(make_multi_protocol_flow):
+    with patch(
+        'inference_client.client.get_model_spec',
+        Mock(return_value={'endpoints': {'grpc': make_multi_protocol_flow['grpc']}}),
+    ):
+        client = Client()
+        assert client.get_model('dummy-model').host == make_multi_protocol_flow['grpc']
+        with pytest.raises(ValueError):
+            client.get_model('dummy-model', protocol='http')
+    with pytest.raises(ValueError):
+        client.get_model('dummy-model', protocol='foo')
+
+
+@pytest.mark.parametrize('protocol', ['http', 'websocket'])
+def test_no_token_headers(make_multi_protocol_flow, protocol):
+    model = Model(
+        model_name='dummy-model',
+        token=None,
+        host=make_multi_protocol_flow['grpc'],
+        protocols={protocol: make_multi_protocol_flow[protocol]},
+    )
+    assert model.encode(text='hello').shape == (512,)
+
+
+@pytest.mark.parametrize(
+    'host, protocol',
+    [
+        ('grpcs://foo:443', 'grpc'),
+        ('foo:443', 'grpc'),
+        ('https://foo', 'http'),
+        ('ws://foo:80', 'websocket'),
+    ],
+)
+def test_get_protocol(host, protocol):
+    assert get_protocol(host) == protocol
+
+
+@pytest.mark.parametrize('protocol', ['http', 'websocket'])
+def test_token_headers(make_multi_protocol_flow, protocol):
+    model = Model(
+        model_name='dummy-model',
+        token='valid_token',
+        host=make_multi_protocol_flow[protocol],
+        compression='gzip',
+    )
+    with patch.object(model.client, 'post', wraps=model.client.post) as post:
+        assert model.encode(text='hello').shape == (512,)
+    payload = post.call_args.kwargs
+    assert payload['headers'] == {'authorization': 'valid_token'}
+    assert 'metadata' not in payload and 'compression' not in payload
+
+
+def test_auto_without_grpc_endpoint(make_multi_protocol_flow):
+    model = Model(
+        model_name='dummy-model',
+        token='valid_token',
+        host=None,
+        protocols={'http': make_multi_protocol_flow['http']},
+        compression='gzip',
+    )
+    assert model.encode(text='hello').shape == (512,)
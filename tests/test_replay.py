@@ -0,0 +1,100 @@
+import json
+import os
+import time
+
+import numpy as np
+import pytest
+from docarray import Document, DocumentArray
+
+from inference_client import Client
+from inference_client.model import Model
+from inference_client.replay import RecordingTransport, ReplayTransport
+from inference_client.tasks.helper import get_payload_fingerprint
+
+
+@pytest.fixture
+def recording(make_flow, tmp_path):
+    path = str(tmp_path / 'recording')
+    model = Model(
+        model_name='dummy-model',
+        token='valid_token',
+        host=f'grpc://0.0.0.0:{make_flow.port}',
+        record=path,
+    )
+    texts = [f'hello {i}' for i in range(6)]
+    embeddings = model.encode(text=texts, batch_size=2)
+    caption = model.caption(image=os.path.join(os.path.dirname(__file__), 'test.jpeg'))
+    return path, texts, embeddings, caption
+
+
+def test_record(recording):
+    path, _, _, _ = recording
+    assert isinstance(
+        Model('dummy-model', 'valid_token', 'grpc://0.0.0.0:1', record=path).client,
+        RecordingTransport,
+    )
+    with open(os.path.join(path, 'index.jsonl')) as f:
+        entries = [json.loads(line) for line in f]
+    assert [(e['on'], e['docs'], e['requests']) for e in entries] == [
+        ('/encode', 6, 3),
+        ('/caption', 1, 1),
+    ]
+    assert all(e['latency'] > 0 for e in entries)
+    assert all(os.path.isfile(os.path.join(path, f'{e["key"]}.da')) for e in entries)
+
+
+def test_replay(recording):
+    path, texts, embeddings, caption = recording
+    model = Client().get_model('dummy-model', replay=path, replay_latency_scale=0)
+    assert isinstance(model.client, ReplayTransport)
+    np.testing.assert_array_equal(model.encode(text=texts, batch_size=2), embeddings)
+    assert (
+        model.caption(image=os.path.join(os.path.dirname(__file__), 'test.jpeg'))
+        == caption
+    )
+
+    docs = DocumentArray([Document(text=t) for t in texts])
+    result = model.encode(docs=docs, batch_size=2)
+    assert result[:, 'id'] == docs[:, 'id']
+
+    with pytest.raises(ValueError, match='No recorded response'):
+        model.encode(text=['not recorded'])
+    with pytest.raises(ValueError, match='No recorded response'):
+        model.encode(text=texts, batch_size=2, parameters={'other': True})
+
+
+def test_replay_callbacks(recording):
+    path, texts, embeddings, _ = recording
+    model = Model('dummy-model', 'valid_token', 'replay', replay=path)
+    model.client.latency_scale = 0
+    batches = []
+    model.encode(
+        text=texts, batch_size=2, on_done=lambda r: batches.append(r.docs.embeddings)
+    )
+    assert [len(b) for b in batches] == [2, 2, 2]
+    np.testing.assert_array_equal(np.concatenate(batches), embeddings)
+
+
+def test_replay_latency(tmp_path):
+    recording = RecordingTransport(None, str(tmp_path))
+    docs = DocumentArray([Document(text='a')])
+    payload = dict(on='/encode', inputs=docs, request_size=1)
+    key = get_payload_fingerprint(payload)
+    recording._write(key, payload, docs, docs, 0.2)
+    recording._write(key, payload, docs, docs, 0.4)
+
+    replay = ReplayTransport(str(tmp_path), latency_scale=0.5)
+    assert len(replay) == 1
+    durations = []
+    for _ in range(2):
+        start = time.perf_counter()
+        replay.post(on='/encode', inputs=[Document(text='a')])
+        durations.append(time.perf_counter() - start)
+    assert 0.1 <= durations[0] < 0.2 <= durations[1] < 0.3
+
+
+def test_replay_invalid(tmp_path):
+    with pytest.raises(ValueError):
+        ReplayTransport(str(tmp_path))
+    with pytest.raises(ValueError):
+        ReplayTransport(str(tmp_path), latency_scale=-1)
@@ -0,0 +1,113 @@
+import pytest
+from docarray import Document, DocumentArray
+
+from inference_client.model import Model
+from inference_client.splitting import pack_requests, post_within_budget
+
+
+def _doc(size):
+    return Document(blob=b'\x00' * size)
+
+
+def _sized(docs):
+    return [(d, len(d.blob)) for d in docs]
+
+
+def test_pack_requests():
+    docs = [_doc(100), _doc(100), _doc(1000), _doc(10), _doc(10), _doc(10)]
+    requests = list(pack_requests(_sized(docs), request_size=2, max_bytes=300))
+    assert [[d.id for d in r] for r in requests] == [
+        [docs[0].id, docs[1].id],
+        [docs[2].id],
+        [docs[3].id, docs[4].id],
+        [docs[5].id],
+    ]
+
+
+def _record_send(calls):
+    def _send(inputs, request_size, **kwargs):
+        docs = DocumentArray(inputs)
+        calls.append((len(docs), request_size))
+        return docs
+
+    return _send
+
+
+def test_post_within_budget():
+    calls = []
+    docs = DocumentArray(
+        [_doc(10) for _ in range(4)]
+        + [_doc(300), _doc(300)]
+        + [_doc(10) for _ in range(3)]
+    )
+    res = post_within_budget(
+        _record_send(calls),
+        400,
+        inputs=docs,
+        request_size=2,
+        on='/encode',
+        total_docs=9,
+    )
+    assert [d.id for d in res] == [d.id for d in docs]
+    # each run of requests of the same size is streamed in one call, the second large document shares its request
+    # with the first small one
+    assert calls == [(4, 2), (1, 1), (4, 2)]
+
+
+def test_post_within_budget_streams_split_batches():
+    calls = []
+    docs = DocumentArray([_doc(300) for _ in range(6)])
+    res = post_within_budget(
+        _record_send(calls), 700, inputs=iter(docs), request_size=4
+    )
+    assert [d.id for d in res] == [d.id for d in docs]
+    # the batches of 4 documents are split into requests of 2 sent in a single stream
+    assert calls == [(6, 2)]
+
+
+def test_post_within_budget_merges_remainders():
+    calls = []
+    docs = DocumentArray(
+        [_doc(300), _doc(300), _doc(300)] + [_doc(10) for _ in range(5)]
+    )
+    post_within_budget(_record_send(calls), 400, inputs=docs, request_size=3)
+    # the remainder of the split batch is sent with the documents that follow
+    assert calls == [(2, 1), (6, 3)]
+
+
+def test_post_within_budget_no_inputs():
+    assert post_within_budget(lambda **kwargs: kwargs, 10, on='/foo') == {'on': '/foo'}
+
+
+@pytest.fixture
+def make_split_client(make_flow):
+    return Model(
+        model_name='dummy-model',
+        token='valid_token',
+        host=f'grpc://0.0.0.0:{make_flow.port}',
+        max_request_bytes=5000,
+    )
+
+
+def test_split_encode(make_split_client, mocker):
+    spy = mocker.spy(make_split_client, '_transmit')
+    docs = DocumentArray([Document(text=f'hello {i}') for i in range(6)])
+    docs[2].blob = b'\x00' * 4000
+    docs[3].blob = b'\x01' * 4000
+    res = make_split_client.encode(docs=docs, batch_size=4)
+    assert sorted(d.id for d in res) == sorted(d.id for d in docs)
+    assert res.embeddings.shape == (6, 512)
+    # two requests of three documents streamed together
+    assert spy.call_count == 1
+    assert spy.call_args.kwargs['request_size'] == 3
+    texts = [f'hello {i}' * (1000 if i in (2, 3) else 1) for i in range(6)]
+    embeddings = make_split_client.encode(text=texts, batch_size=4)
+    assert embeddings.shape == (6, 512)
+
+
+def test_split_callbacks(make_split_client, mocker):
+    on_done_mock = mocker.Mock()
+    docs = DocumentArray([Document(blob=b'\x00' * 3000) for _ in range(4)])
+    res = make_split_client.encode(docs=docs, batch_size=4, on_done=on_done_mock)
+    assert res is None
+    assert on_done_mock.call_count == 4
@@ -0,0 +1,141 @@
+import time
+
+import numpy as np
+
+import pytest
+
+from inference_client import Client, RateLimiter
+from inference_client.model import Model
+from inference_client.throttle import TokenBucket
+
+from .executor import DummyExecutor
+
+
+@pytest.fixture
+def make_throttled_client(make_flow):
+    def _make(**kwargs):
+        return Model(
+            model_name='dummy-model',
+            token='valid_token',
+            host=f'grpc://0.0.0.0:{make_flow.port}',
+            rate_limiter=RateLimiter(**kwargs),
+        )
+
+    return _make
+
+
+def test_token_bucket_reserve():
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.02)
+    assert bucket.reserve(5) == pytest.approx(0.6, abs=0.02)
+
+
+def test_token_bucket_invalid_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_requests_per_second(make_throttled_client):
+    model = make_throttled_client(requests_per_second=10, burst=0.1)
+    start = time.perf_counter()
+    res = model.encode(text=[f'hello {i}' for i in range(6)], batch_size=1)
+    assert time.perf_counter() - start >= 0.4
+    assert res.shape == (6, 512)
+
+
+@pytest.mark.parametrize('max_in_flight', [1, 2])
+def test_max_in_flight(make_throttled_client, mocker, max_in_flight):
+    model = make_throttled_client(max_in_flight=max_in_flight)
+    post = model.client.post
+    in_flight, peak = 0, 0
+
+    def _counting_post(inputs, request_size, on_always, **kwargs):
+        # a request is in flight from the moment its first document is read until its response is handled
+        async def _inputs():
+            nonlocal in_flight, peak
+            i = 0
+            async for doc in inputs:
+                if i % request_size == 0:
+                    in_flight += 1
+                    peak = max(peak, in_flight)
+                i += 1
+                yield doc
+
+        def _on_always(response):
+            nonlocal in_flight
+            in_flight -= 1
+            on_always(response)
+
+        return post(
+            inputs=_inputs(), request_size=request_size, on_always=_on_always, **kwargs
+        )
+
+    mocker.patch.object(model.client, 'post', _counting_post)
+    res = model.encode(text=['hello'] * 10, batch_size=2)
+    assert res.shape == (10, 512)
+    assert in_flight == 0
+    assert 1 <= peak <= max_in_flight
+    for _ in range(max_in_flight):
+        assert model.rate_limiter._in_flight.acquire(blocking=False)
+
+
+def test_throttled_results_in_order(make_throttled_client):
+    model = make_throttled_client(max_in_flight=3)
+    payload, _, _ = model._get_enocde_payload(
+        text=[f'hello {i}' for i in range(20)], batch_size=1
+    )
+    ids = [d.id for d in payload['inputs']]
+    res = model._post(**payload)
+    assert [d.id for d in res] == ids
+
+
+def test_bytes_per_second(make_throttled_client):
+    model = make_throttled_client(bytes_per_second=10_000_000)
+    assert model.caption(image=b'\x00' * 100) == 'A image of something very nice'
+
+
+def test_throttled_callbacks(make_throttled_client, mocker):
+    on_done_mock = mocker.Mock()
+    on_always_mock = mocker.Mock()
+
+    model = make_throttled_client(max_in_flight=1)
+    res = model.encode(
+        text=['hello'] * 4,
+        batch_size=2,
+        on_done=on_done_mock,
+        on_always=on_always_mock,
+    )
+    assert res is None
+    assert on_done_mock.call_count == 2
+    assert on_always_mock.call_count == 2
+
+
+def test_local_not_throttled():
+    client = Client(rate_limiter=RateLimiter(max_in_flight=1, requests_per_second=100))
+    model = client.get_model(executor=DummyExecutor())
+    assert model.rate_limiter is None
+    assert model.encode(text=['a', 'b', 'c'], batch_size=1).shape == (3, 512)
+
+
+def test_record_and_replay_throttled(make_flow, tmp_path):
+    path = str(tmp_path / 'recording')
+    limiter = RateLimiter(max_in_flight=1, requests_per_second=100)
+    texts = [f'hello {i}' for i in range(4)]
+    model = Model(
+        model_name='dummy-model',
+        token='valid_token',
+        host=f'grpc://0.0.0.0:{make_flow.port}',
+        rate_limiter=limiter,
+        record=path,
+    )
+    embeddings = model.encode(text=texts, batch_size=2)
+    assert limiter._in_flight.acquire(blocking=False)
+    limiter._in_flight.release()
+
+    model = Client(rate_limiter=limiter).get_model(
+        'dummy-model', replay=path, replay_latency_scale=0
+    )
+    assert model.rate_limiter is None
+    np.testing.assert_array_equal(model.encode(text=texts, batch_size=2), embeddings)
@@ -0,0 +1,134 @@
+import io
+import os
+
+import numpy as np
+import pytest
+from docarray import Document
+from PIL import Image
+
+from inference_client.tasks.tiling import (
+    blend_tiles,
+    get_tile_scale,
+    load_image_array,
+    split_tiles,
+)
+
+IMAGE = f'{os.path.dirname(os.path.abspath(__file__))}/test.jpeg'
+
+
+@pytest.mark.parametrize('shape', [(100, 100), (100, 37), (20, 20)])
+def test_split_tiles_cover_image(shape):
+    image = np.random.randint(0, 255, (*shape, 3), dtype=np.uint8)
+    tiles = split_tiles(image, tile_size=32, overlap=8)
+    covered = np.zeros(shape, dtype=bool)
+    for y, x, tile in tiles:
+        assert tile.shape[0] <= 32 and tile.shape[1] <= 32
+        np.testing.assert_array_equal(
+            tile, image[y : y + tile.shape[0], x : x + tile.shape[1]]
+        )
+        covered[y : y + tile.shape[0], x : x + tile.shape[1]] = True
+    assert covered.all()
+
+
+def test_invalid_overlap():
+    with pytest.raises(ValueError):
+        split_tiles(np.zeros((10, 10, 3), dtype=np.uint8), tile_size=8, overlap=8)
+
+
+def test_blend_tiles_identity():
+    image = np.random.randint(0, 255, (90, 70, 3), dtype=np.uint8)
+    tiles = split_tiles(image, tile_size=32, overlap=8)
+    # upscale every tile by 2 with nearest neighbor, the blended result is exact
+    upscaled = [
+        (y, x, tile.repeat(2, axis=0).repeat(2, axis=1)) for y, x, tile in tiles
+    ]
+    res = blend_tiles(upscaled, image.shape[:2], scale=2)
+    np.testing.assert_array_equal(res, image.repeat(2, axis=0).repeat(2, axis=1))
+
+
+def test_blend_tiles_seams():
+    tiles = split_tiles(np.zeros((40, 40, 3), dtype=np.uint8), tile_size=24, overlap=8)
+    # tiles of alternating colors fade into each other over their overlap
+    colored = [
+        (y, x, np.full((48, 48, 3), 200 * ((y + x) // 16 % 2), dtype=np.uint8))
+        for y, x, _ in tiles
+    ]
+    res = blend_tiles(colored, (40, 40), scale=2)
+    assert res[0, 0, 0] == 0 and res[0, -1, 0] == 200
+    row = res[0, :, 0].astype(int)
+    # the seam is a monotonic ramp instead of a step
+    assert np.all(np.diff(row[16:48]) >= 0) and len(np.unique(row)) > 10
+
+
+def test_blend_tiles_memory():
+    import tracemalloc
+
+    image = np.zeros((256, 256, 3), dtype=np.uint8)
+    upscaled = [
+        (y, x, np.zeros((tile.shape[0] * 4, tile.shape[1] * 4, 3), dtype=np.uint8))
+        for y, x, tile in split_tiles(image, tile_size=64, overlap=16)
+    ]
+    tracemalloc.start()
+    try:
+        res = blend_tiles(upscaled, image.shape[:2], scale=4)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    # a float32 canvas and weight map alone would take about 5 times the output
+    assert peak < 1.5 * res.nbytes
+
+
+def test_tile_scale():
+    tile = np.zeros((10, 12, 3), dtype=np.uint8)
+    assert get_tile_scale(tile, np.zeros((40, 48, 3), dtype=np.uint8)) == 4
+    with pytest.raises(ValueError):
+        get_tile_scale(tile, np.zeros((25, 30, 3), dtype=np.uint8))
+
+
+def test_tiled_upscale(make_client, tmp_path):
+    output_path = str(tmp_path / 'out.png')
+    res = make_client.upscale(
+        image=IMAGE, tile_size=48, tile_overlap=8, output_path=output_path
+    )
+    tiled = np.asarray(Image.open(io.BytesIO(res)))
+    assert tiled.shape == (800, 800, 3)
+    with open(output_path, 'rb') as f:
+        assert f.read() == res
+
+    whole = np.asarray(Image.open(IMAGE).resize((800, 800))).astype(np.float32)
+    assert np.abs(tiled.astype(np.float32) - whole).mean() < 5
+
+
+def test_tiled_upscale_ndarray(make_client):
+    image = np.full((60, 90, 3), 120, dtype=np.uint8)
+    res = make_client.upscale(image=image, tile_size=32, image_format='jpeg')
+    assert Image.open(io.BytesIO(res)).format == 'JPEG'
+    upscaled, _ = load_image_array(res)
+    assert upscaled.shape == (480, 720, 3)
+
+
+@pytest.mark.parametrize(
+    'kwargs', [dict(scale='100:100'), dict(docs=[]), dict(image=IMAGE, tile_overlap=64)]
+)
+def test_tiled_upscale_invalid(make_client, kwargs):
+    kwargs.setdefault('image', IMAGE)
+    with pytest.raises(ValueError):
+        make_client.upscale(tile_size=64, **kwargs)
+
+
+@pytest.mark.parametrize(
+    'kwargs', [dict(output_path='out.gif'), dict(image_format='bmp')]
+)
+@pytest.mark.parametrize('tile_size', [None, 64])
+def test_upscale_invalid_output(make_client, kwargs, tile_size):
+    with pytest.raises(ValueError):
+        make_client.upscale(image=IMAGE, tile_size=tile_size, **kwargs)
+
+
+def test_upscale_prefetch(make_client):
+    payload, _ = make_client._get_upscale_payload(
+        docs=[Document(uri=IMAGE)], prefetch=2
+    )
+    assert payload['prefetch'] == 2
+    payload, _ = make_client._get_upscale_payload(image=IMAGE)
+    assert 'prefetch' not in payload
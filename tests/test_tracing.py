@@ -0,0 +1,94 @@
+import os
+
+import pytest
+from docarray import Document
+
+from inference_client import Client
+from inference_client.tracing import inject_trace_context, span, trace
+
+from .executor import DummyExecutor
+
+IMAGE = os.path.join(os.path.dirname(__file__), 'test.jpeg')
+
+sdk_trace = pytest.importorskip('opentelemetry.sdk.trace')
+in_memory = pytest.importorskip(
+    'opentelemetry.sdk.trace.export.in_memory_span_exporter'
+)
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+
+    exporter = in_memory.InMemorySpanExporter()
+    provider = sdk_trace.TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    monkeypatch.setattr(
+        'inference_client.tracing.get_tracer', lambda: provider.get_tracer('test')
+    )
+    return exporter
+
+
+def _spans(exporter):
+    return {s.name: s for s in exporter.get_finished_spans()}
+
+
+def test_task_spans(exporter):
+    model = Client().get_model('dummy-model', executor=DummyExecutor())
+    assert model.caption(image=IMAGE) == 'A image of something very nice'
+
+    spans = _spans(exporter)
+    assert set(spans) == {
+        'inference_client.caption',
+        'inference_client.build_payload',
+        'inference_client.send',
+        'inference_client.unbox',
+    }
+    root = spans['inference_client.caption']
+    assert root.attributes['inference_client.model'] == 'dummy-model'
+    for name in ('build_payload', 'send', 'unbox'):
+        assert spans[f'inference_client.{name}'].parent.span_id == root.context.span_id
+
+    send = spans['inference_client.send'].attributes
+    assert send['inference_client.endpoint'] == '/caption'
+    assert send['inference_client.docs'] == 1
+    assert send['inference_client.request_bytes'] > 1000
+    assert send['inference_client.response_docs'] == 1
+    assert send['inference_client.response_bytes'] > 0
+    build = spans['inference_client.build_payload'].attributes
+    assert build['inference_client.docs'] == 1
+    assert 'inference_client.request_bytes' not in build
+
+
+def test_lazy_inputs_counted(exporter):
+    model = Client().get_model(executor=DummyExecutor())
+    model.encode(docs=(Document(text=f'hello {i}') for i in range(5)), batch_size=2)
+    send = _spans(exporter)['inference_client.send'].attributes
+    assert send['inference_client.docs'] == 5
+    assert send['inference_client.response_docs'] == 5
+
+
+def test_trace_context_in_metadata(exporter, make_client, mocker):
+    spy = mocker.spy(make_client.client, 'post')
+    make_client.encode(text=['hello'])
+    metadata = dict(spy.call_args.kwargs['metadata'])
+    assert metadata['authorization'] == 'valid_token'
+    trace_id = _spans(exporter)['inference_client.encode'].context.trace_id
+    assert metadata['traceparent'].split('-')[1] == f'{trace_id:032x}'
+
+
+def test_untraced():
+    metadata = (('authorization', 'token'),)
+    assert inject_trace_context(metadata) == metadata
+    with span('send') as current:
+        assert not current.is_recording()
+    with pytest.raises(ValueError):
+        trace('other')
+
+
+def test_unordered_spans(exporter):
+    model = Client().get_model(executor=DummyExecutor())
+    assert len(list(model.encode_unordered(text=['a', 'b'], batch_size=1))) == 2
+    spans = _spans(exporter)
+    root = spans['inference_client.encode_unordered']
+    assert spans['inference_client.send'].parent.span_id == root.context.span_id
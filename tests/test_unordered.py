@@ -0,0 +1,95 @@
+import time
+
+import numpy as np
+import pytest
+from docarray import Document
+from jina import Executor, requests
+from jina.excepts import BadServer
+
+from inference_client import Client
+from inference_client.embeddings import QuantizedEmbeddings, assemble_embeddings
+
+
+class IndexExecutor(Executor):
+    @requests(on='/encode')
+    def encode(self, docs, **kwargs):
+        docs.embeddings = np.array(
+            [[float(d.text.split()[-1]), 1.0] for d in docs], dtype=np.float32
+        )
+
+
+@pytest.fixture
+def index_model():
+    return Client().get_model(executor=IndexExecutor())
+
+
+def test_encode_unordered(index_model):
+    texts = [f'hello {i}' for i in range(10)]
+    batches = list(index_model.encode_unordered(text=texts, batch_size=3))
+    assert [len(indices) for indices, _ in batches] == [3, 3, 3, 1]
+    for indices, embeddings in batches:
+        assert indices.dtype == np.int64
+        np.testing.assert_array_equal(embeddings[:, 0], indices)
+
+    embeddings = assemble_embeddings(
+        index_model.encode_unordered(text=texts, batch_size=4), total=len(texts)
+    )
+    np.testing.assert_array_equal(embeddings[:, 0], np.arange(10))
+
+
+def test_encode_unordered_docs_and_dtype(index_model):
+    docs = [Document(text=f'doc {i}') for i in range(5)]
+    result = assemble_embeddings(
+        index_model.encode_unordered(docs=docs, batch_size=2, output_dtype='int8'),
+        total=len(docs),
+    )
+    assert isinstance(result, QuantizedEmbeddings)
+    np.testing.assert_allclose(result.dequantize()[:, 0], np.arange(5), atol=0.05)
+
+
+def test_encode_unordered_flow(make_client):
+    texts = [f'hello {i}' for i in range(20)]
+    indices = []
+    for batch_indices, embeddings in make_client.encode_unordered(
+        text=texts, batch_size=4, prefetch=2
+    ):
+        assert embeddings.shape == (len(batch_indices), 512)
+        indices.extend(batch_indices)
+    assert sorted(indices) == list(range(20))
+
+
+def test_encode_unordered_early_stop(make_client):
+    results = make_client.encode_unordered(
+        text=[f'hello {i}' for i in range(100)], batch_size=2, prefetch=1
+    )
+    indices, _ = next(results)
+    assert len(indices) == 2
+    results.close()
+    # the sender thread gives up on the remaining responses
+    start = time.perf_counter()
+    assert make_client.encode(text='still usable').shape == (512,)
+    assert time.perf_counter() - start < 10
+
+
+def test_encode_unordered_stops_sending(index_model):
+    sent = []
+
+    def _docs():
+        for i in range(100):
+            sent.append(i)
+            yield Document(text=f'doc {i}')
+
+    results = index_model.encode_unordered(docs=_docs(), batch_size=2, prefetch=1)
+    next(results)
+    results.close()
+    time.sleep(0.5)
+    assert len(sent) < 20
+
+
+def test_encode_unordered_errors(make_error_client, index_model):
+    with pytest.raises(BadServer):
+        list(make_error_client.encode_unordered(text=['a', 'b']))
+    with pytest.raises(ValueError):
+        index_model.encode_unordered(text=['a'], on_done=print)
+    with pytest.raises(ValueError):
+        index_model.encode_unordered(text=['a'], output_dtype='int4')